@@ -1,25 +1,11 @@
-from fastapi import FastAPI
+"""
+Entrada alternativa (uvicorn api.app:app).
 
-from api.routes import reportes
+La aplicación se arma en UN solo lugar (main.create_app): mismo
+lifespan (pool Mongo, cierre del monitor de explains), middlewares,
+métricas, health y rutas. Este módulo solo la re-exporta.
+"""
 
+from main import app, create_app, lifespan
 
-def create_app() -> FastAPI:
-    app = FastAPI(
-        title="ReporteSurtido · Reportes",
-        version="2.0.0",
-    )
-
-    # ─────────────────────────────────────────
-    # ÚNICA RUTA DE LA APLICACIÓN
-    # ─────────────────────────────────────────
-    app.include_router(
-        reportes.router,
-        prefix="/reportes",
-        tags=["Reportes"],
-    )
-
-    return app
-
-
-# 👇 ESTO ES LO QUE Uvicorn NECESITA
-app = create_app()
+__all__ = ["app", "create_app", "lifespan"]
@@ -2,8 +2,8 @@
 Dependencias de la API (SOLO REPORTES).
 
 RESPONSABILIDAD:
-- Proveer acceso a MongoDB (solo lectura)
-- Inyectar el MongoClientProvider correcto
+- Proveer acceso a MongoDB o al backend en memoria (solo lectura)
+- Inyectar el provider correcto (DB_BACKEND)
 - Construir Queries analíticas
 - Inyectar el Service de reportes
 
@@ -15,18 +15,28 @@ NO HACE:
 
 GRAFO CORRECTO:
 MongoClientProvider → ReportesQueries → ReportesService
+MemoriaProvider     → ReportesAccessMemoria → ReportesService
 """
 
 # ─────────────────────────────────────────
 # DB PROVIDER (SOLO LECTURA)
 # ─────────────────────────────────────────
-from db.factory import get_db
+from typing import TYPE_CHECKING
+
+from db.factory import DB_BACKEND, get_db
 from db.mongo.client import MongoClientProvider
 
+# db.memoria (generador sintético) solo se importa con DB_BACKEND=memoria
+if TYPE_CHECKING:
+    from db.memoria import MemoriaProvider, ReportesAccessMemoria
+
 
-def get_database() -> MongoClientProvider:
+def get_database() -> "MongoClientProvider | MemoriaProvider":
     """
-    Devuelve el proveedor Mongo en modo SOLO LECTURA.
+    Devuelve el proveedor de datos en modo SOLO LECTURA.
+
+    El provider es compartido por el proceso (creado en el
+    lifespan de la app); NO se cierra por request.
     """
     return get_db()
 
@@ -34,26 +44,151 @@ def get_database() -> MongoClientProvider:
 # ─────────────────────────────────────────
 # QUERIES ANALÍTICAS
 # ─────────────────────────────────────────
+import os
+
 from db.mongo.reportes.access import ReportesAccess
+from db.mongo.reportes.explain import MonitorConsultas
+from db.mongo.reportes.ingesta import LOTE_DEFAULT
+
+# Ingesta columnar: documentos por batch y lectura como RawBSONDocument
+REPORTES_INGESTA_LOTE = int(os.getenv("REPORTES_INGESTA_LOTE", str(LOTE_DEFAULT)))
+REPORTES_INGESTA_RAW_BSON = os.getenv("REPORTES_INGESTA_RAW_BSON", "0") == "1"
+
+# Diagnóstico de pipelines (ver db/mongo/reportes/explain.py):
+# - REPORTES_EXPLAIN=1: explain("executionStats") de CADA aggregate
+# - REPORTES_CONSULTA_LENTA_MS > 0: log + explain de los que tarden más
+# - REPORTES_EXPLAIN_COLA: explains pendientes como máximo (el resto
+#   se descarta y se cuenta en /api/admin/consultas)
+# Ambos apagados → sin monitor (cero costo)
+_explain_todas = os.getenv("REPORTES_EXPLAIN", "0") == "1"
+_consulta_lenta_ms = float(os.getenv("REPORTES_CONSULTA_LENTA_MS", "0"))
+
+_monitor = (
+    MonitorConsultas(
+        explain_todas=_explain_todas,
+        umbral_ms=_consulta_lenta_ms,
+        max_entradas=int(os.getenv("REPORTES_EXPLAIN_MAX", "200")),
+        max_cola=int(os.getenv("REPORTES_EXPLAIN_COLA", "20")),
+    )
+    if _explain_todas or _consulta_lenta_ms > 0
+    else None
+)
+
+
+def get_monitor_consultas() -> MonitorConsultas | None:
+    """
+    Monitor de explains / consultas lentas (None si está apagado).
+    """
+    return _monitor
 
 
-def get_reportes_queries() -> ReportesAccess:
+def get_reportes_queries() -> "ReportesAccess | ReportesAccessMemoria":
     """
     Construye las queries analíticas de reportes.
 
     ⚠️ CLAVE:
-    - Se inyecta el MongoClientProvider COMPLETO
+    - Se inyecta el provider COMPLETO
     - NO se pasa una colección suelta
+    - Backend en memoria → ReportesAccessMemoria (mismas consultas)
     """
     provider = get_database()
-    return ReportesAccess(provider)
+
+    if DB_BACKEND == "memoria":
+        from db.memoria import ReportesAccessMemoria
+
+        return ReportesAccessMemoria(provider)
+
+    return ReportesAccess(
+        provider,
+        lote=REPORTES_INGESTA_LOTE,
+        raw_bson=REPORTES_INGESTA_RAW_BSON,
+        monitor=_monitor,
+    )
 
 
 # ─────────────────────────────────────────
 # SERVICE (ORQUESTADOR)
 # ─────────────────────────────────────────
+from services.reportes.cache import CacheReportes
+from services.reportes.data.cache_dias import CacheDias
+from services.reportes.data.dimensiones import CacheDimensiones
 from services.reportes.service import ReportesService
 
+# "detalle" | "rollup" | "materializado" (ver ReportesService.MODOS)
+REPORTES_MODO = os.getenv("REPORTES_MODO", "detalle")
+
+# Cache de resultados (compartido por el proceso).
+# REPORTES_CACHE_MAX=0 lo desactiva.
+_cache_max = int(os.getenv("REPORTES_CACHE_MAX", "128"))
+
+_reportes_cache = (
+    CacheReportes(
+        max_entradas=_cache_max,
+        ttl=float(os.getenv("REPORTES_CACHE_TTL", "60")),
+        stale=float(os.getenv("REPORTES_CACHE_STALE", "300")),
+    )
+    if _cache_max > 0
+    else None
+)
+
+
+# Cache de agregados por día (compartido por el proceso).
+# REPORTES_CACHE_DIAS=0 lo desactiva.
+_cache_dias_max = int(os.getenv("REPORTES_CACHE_DIAS", "400"))
+
+_cache_dias = (
+    CacheDias(max_dias=_cache_dias_max)
+    if _cache_dias_max > 0
+    else None
+)
+
+
+# Cache versionado de personal / asignaciones (compartido por el proceso)
+_dimensiones = CacheDimensiones(
+    ttl_version=float(os.getenv("REPORTES_DIMENSIONES_TTL", "30")),
+    ttl_max=float(os.getenv("REPORTES_DIMENSIONES_TTL_MAX", "3600")),
+)
+
+
+# Cache corto de marcas de agua por rango (sin Mongo dentro del TTL;
+# un back-fill se ve a lo sumo REPORTES_MARCA_TTL segundos tarde).
+# REPORTES_MARCA_TTL=0 lo desactiva.
+_marca_ttl = float(os.getenv("REPORTES_MARCA_TTL", "5"))
+
+_marcas = (
+    CacheReportes(max_entradas=256, ttl=_marca_ttl, stale=0, workers=1)
+    if _marca_ttl > 0
+    else None
+)
+
+
+def get_reportes_cache() -> CacheReportes | None:
+    """
+    Cache de resultados de reportes (None si está desactivado).
+    """
+    return _reportes_cache
+
+
+def get_cache_dias() -> CacheDias | None:
+    """
+    Cache de agregados diarios (None si está desactivado).
+    """
+    return _cache_dias
+
+
+def get_cache_marcas() -> CacheReportes | None:
+    """
+    Cache de marcas de agua por rango (None si está desactivado).
+    """
+    return _marcas
+
+
+def get_dimensiones() -> CacheDimensiones:
+    """
+    Cache versionado de dimensiones (personal / asignaciones).
+    """
+    return _dimensiones
+
 
 def get_reportes_service() -> ReportesService:
     """
@@ -61,6 +196,16 @@ def get_reportes_service() -> ReportesService:
 
     Inyecta:
     - ReportesQueries (lectura Mongo)
+    - Modo de carga (REPORTES_MODO)
+    - Caches compartidos (resultados, agregados diarios, dimensiones,
+      marcas de agua)
     """
     queries = get_reportes_queries()
-    return ReportesService(reportes_queries=queries)
\ No newline at end of file
+    return ReportesService(
+        reportes_queries=queries,
+        modo=REPORTES_MODO,
+        cache=get_reportes_cache(),
+        cache_dias=get_cache_dias(),
+        dimensiones=get_dimensiones(),
+        marcas=get_cache_marcas(),
+    )
\ No newline at end of file
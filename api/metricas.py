@@ -0,0 +1,188 @@
+"""
+Métricas HTTP y endpoint /api/metrics (formato texto de Prometheus).
+
+RESPONSABILIDAD:
+- Medir cada request HTTP (latencia, bytes de respuesta, en curso)
+  sin tocar las rutas
+- Publicar al momento del scrape las estadísticas que ya llevan
+  los caches y el pool de la base
+
+NO HACE:
+- Agregar ni persistir series (eso es de Prometheus)
+
+ETIQUETAS:
+- endpoint: nombre de la función de la ruta ("generar_reportes"),
+  nunca el path crudo; requests sin ruta → "sin_ruta" (acota la
+  cardinalidad)
+- agrupar: la que fije la ruta en request.state.agrupar ("" si no)
+"""
+
+import time
+
+from fastapi.responses import PlainTextResponse
+
+from api.dependencies import get_cache_dias, get_dimensiones, get_reportes_cache
+from db.factory import get_db
+from services.reportes.utils.metricas import BUCKETS_BYTES, REGISTRO, muestras
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_HTTP_SEGUNDOS = REGISTRO.histograma(
+    "reportes_http_segundos",
+    "Latencia de requests HTTP por endpoint y agrupación",
+    ("metodo", "endpoint", "estado", "agrupar"),
+)
+_HTTP_BYTES = REGISTRO.histograma(
+    "reportes_http_respuesta_bytes",
+    "Tamaño del cuerpo de respuesta por endpoint",
+    ("endpoint",),
+    buckets=BUCKETS_BYTES,
+)
+_HTTP_EN_CURSO = REGISTRO.indicador(
+    "reportes_http_en_curso",
+    "Requests HTTP en curso",
+)
+
+
+# ─────────────────────────────
+# MIDDLEWARE (ASGI PURO)
+# ─────────────────────────────
+class MetricasMiddleware:
+    """
+    Middleware ASGI: cuenta bytes enviados (incluye streaming)
+    y mide hasta el último fragmento del cuerpo.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        inicio = time.perf_counter()
+        estado = {"codigo": 500, "bytes": 0}
+
+        async def enviar(mensaje):
+            if mensaje["type"] == "http.response.start":
+                estado["codigo"] = mensaje["status"]
+            elif mensaje["type"] == "http.response.body":
+                estado["bytes"] += len(mensaje.get("body", b""))
+            await send(mensaje)
+
+        _HTTP_EN_CURSO.inc()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _HTTP_EN_CURSO.dec()
+
+            endpoint = getattr(scope.get("endpoint"), "__name__", "sin_ruta")
+
+            _HTTP_SEGUNDOS.observe(
+                time.perf_counter() - inicio,
+                metodo=scope["method"],
+                endpoint=endpoint,
+                estado=estado["codigo"],
+                agrupar=scope.get("state", {}).get("agrupar", ""),
+            )
+            _HTTP_BYTES.observe(estado["bytes"], endpoint=endpoint)
+
+
+# ─────────────────────────────
+# RECOLECTORES (AL MOMENTO DEL SCRAPE)
+# ─────────────────────────────
+def _metricas_caches():
+    consultas = []
+    ratios = []
+    lineas = []
+
+    cache = get_reportes_cache()
+    if cache is not None:
+        s = cache.stats()
+        consultas += [
+            ({"cache": "resultados", "tipo": "hit"}, s["hits"]),
+            ({"cache": "resultados", "tipo": "stale_hit"}, s["stale_hits"]),
+            ({"cache": "resultados", "tipo": "miss"}, s["misses"]),
+        ]
+        ratios.append(({"cache": "resultados"}, s["hit_ratio"]))
+        lineas += muestras(
+            "reportes_cache_entradas",
+            "gauge",
+            "Entradas vivas en el cache de resultados",
+            [({}, s["entradas"])],
+        )
+
+    cache_dias = get_cache_dias()
+    if cache_dias is not None:
+        s = cache_dias.stats()
+        total = s["hits_dia"] + s["misses_dia"]
+        consultas += [
+            ({"cache": "dias", "tipo": "hit"}, s["hits_dia"]),
+            ({"cache": "dias", "tipo": "miss"}, s["misses_dia"]),
+        ]
+        ratios.append(({"cache": "dias"}, s["hits_dia"] / total if total else 0.0))
+        lineas += muestras(
+            "reportes_cache_dias_guardados",
+            "gauge",
+            "Días agregados en memoria",
+            [({}, s["dias"])],
+        )
+
+    s = get_dimensiones().stats()
+    total = s["hits"] + s["probes"] + s["cargas"]
+    consultas += [
+        ({"cache": "dimensiones", "tipo": "hit"}, s["hits"]),
+        ({"cache": "dimensiones", "tipo": "probe"}, s["probes"]),
+        ({"cache": "dimensiones", "tipo": "carga"}, s["cargas"]),
+    ]
+    ratios.append(({"cache": "dimensiones"}, s["hits"] / total if total else 0.0))
+
+    return [
+        *muestras(
+            "reportes_cache_consultas_total",
+            "counter",
+            "Consultas a cada cache por resultado",
+            consultas,
+        ),
+        *muestras(
+            "reportes_cache_hit_ratio",
+            "gauge",
+            "Proporción de aciertos desde el arranque (resultados incluye stale)",
+            ratios,
+        ),
+        *lineas,
+    ]
+
+
+def _metricas_pool():
+    """
+    Valores numéricos de pool_stats() (Mongo o memoria).
+    """
+    stats = get_db().pool_stats()
+
+    return muestras(
+        "reportes_db_pool",
+        "gauge",
+        "Estadísticas del pool / backend de datos",
+        [
+            ({"stat": k}, v)
+            for k, v in stats.items()
+            if isinstance(v, (int, float)) and not isinstance(v, bool)
+        ],
+    )
+
+
+REGISTRO.recolector(_metricas_caches)
+REGISTRO.recolector(_metricas_pool)
+
+
+# ─────────────────────────────
+# ENDPOINT
+# ─────────────────────────────
+def metricas() -> PlainTextResponse:
+    """
+    Todas las métricas del proceso en formato Prometheus.
+    """
+    return PlainTextResponse(REGISTRO.exponer(), media_type=CONTENT_TYPE)
@@ -0,0 +1,100 @@
+"""
+Clases de respuesta HTTP para la API.
+
+RESPONSABILIDAD:
+- Serializar resultados de reportes a JSON en UNA sola pasada
+- JSON EQUIVALENTE a limpiar_json + JSONResponse (mismos valores),
+  pero NO byte a byte: orjson escribe exponentes sin '+' ni ceros
+  (1e-05 → 0.00001, 1e+16 → 1e16) y numpy float32 con su repr
+  corta (0.1, no 0.10000000149011612). El formato de floats queda
+  fijado en tests/test_responses.py (afecta ETag / hashes de cuerpo)
+- Serializar filas sueltas como NDJSON (streaming)
+
+Usa orjson si está instalado; si no, cae al camino legacy
+(limpiar_json + json estándar).
+"""
+
+import json
+from datetime import datetime, date
+from decimal import Decimal
+from typing import Any, Iterable, Iterator
+
+import numpy as np
+from fastapi.responses import JSONResponse
+
+from services.reportes.utils.json import limpiar_json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+
+_OPCIONES_ORJSON = (
+    orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    if orjson else 0
+)
+
+
+def _default(obj: Any) -> Any:
+    """
+    Tipos que orjson no serializa de forma nativa.
+
+    (float NaN / inf ya salen como null; numpy escalares,
+    date y datetime puros son nativos).
+    """
+    # pd.Timestamp / NaT son subclases de datetime
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+
+    if isinstance(obj, Decimal):
+        return float(obj)
+
+    if pd is not None and isinstance(obj, pd.Period):
+        return str(obj)
+
+    if isinstance(obj, np.generic):
+        return obj.item()
+
+    raise TypeError(f"Tipo no serializable a JSON: {type(obj).__name__}")
+
+
+def _dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=_OPCIONES_ORJSON,
+        )
+
+    return json.dumps(
+        limpiar_json(content),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def ndjson_lineas(filas: Iterable[Any]) -> Iterator[bytes]:
+    """
+    Convierte un iterable de filas en líneas NDJSON (una por fila).
+    """
+    for fila in filas:
+        yield _dumps(fila) + b"\n"
+
+
+class ReportesJSONResponse(JSONResponse):
+    """
+    JSONResponse para reportes: NO requiere limpiar_json previo.
+
+    Acepta numpy, pandas Timestamp / Period, Decimal y NaN / inf.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return _dumps(content)
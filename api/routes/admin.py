@@ -0,0 +1,76 @@
+"""
+Rutas de administración / diagnóstico.
+
+RESPONSABILIDAD:
+- Exponer el registro de explains y consultas lentas
+  (REPORTES_EXPLAIN / REPORTES_CONSULTA_LENTA_MS)
+- Permitir vaciarlo
+
+REGLAS:
+- Cerrado por default: sin REPORTES_ADMIN_TOKEN las rutas
+  responden 404
+- Con token, se exige en el header X-Admin-Token (401 si no coincide)
+- El registro incluye pipelines completos (filtros de fecha)
+"""
+
+import hmac
+import os
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+
+from api.dependencies import get_monitor_consultas
+
+
+REPORTES_ADMIN_TOKEN = os.getenv("REPORTES_ADMIN_TOKEN", "")
+
+
+def _verificar_token(x_admin_token: str | None = Header(None)):
+    if not REPORTES_ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    if not hmac.compare_digest(x_admin_token or "", REPORTES_ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Token de admin inválido")
+
+
+router = APIRouter(tags=["Admin"], dependencies=[Depends(_verificar_token)])
+
+
+# ─────────────────────────────
+# CONSULTAS (EXPLAIN / LENTAS)
+# ─────────────────────────────
+@router.get("/consultas", summary="Explains y consultas lentas recientes")
+def consultas(
+    limite: int = Query(50, ge=1, le=1000),
+    solo_lentas: bool = Query(False),
+):
+    """
+    Últimas entradas del monitor, la más reciente primero.
+
+    Cada entrada: consulta, colección, duración, filas, pipeline
+    y el resumen del explain (docs / claves examinados vs
+    devueltos, plan COLLSCAN / IXSCAN, índices usados).
+    """
+    monitor = get_monitor_consultas()
+
+    if monitor is None:
+        return {"activo": False, "config": None, "entradas": []}
+
+    entradas = monitor.entradas()
+    if solo_lentas:
+        entradas = [e for e in entradas if e["lenta"]]
+
+    return {
+        "activo": True,
+        "config": monitor.stats(),
+        "entradas": entradas[:limite],
+    }
+
+
+@router.delete("/consultas", summary="Vaciar el registro de consultas")
+def limpiar_consultas():
+    monitor = get_monitor_consultas()
+
+    if monitor is not None:
+        monitor.limpiar()
+
+    return {"activo": monitor is not None}
@@ -13,19 +13,37 @@ NO CONTIENE:
 - Pandas / numpy como dependencia lógica
 """
 
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
-from datetime import datetime, date
+import hashlib
+import json
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from datetime import datetime, date, timedelta
 from decimal import Decimal
+from typing import Literal
 
 from api.dependencies import get_reportes_service
-from api.schemas.reportes import ReportesFiltros
+from api.responses import ReportesJSONResponse, ndjson_lineas
+from api.schemas.reportes import ReportesFiltros, TablaFiltros, PaginaFiltros
 from services.reportes.service import ReportesService
-from services.reportes.utils.json import limpiar_json
+from services.reportes.utils.tiempos import colectar, etapa
 
 
 router = APIRouter(tags=["Reportes"])
 
+# max-age (s) para rangos con datos finales (ver REPORTES_DIAS_FINALES).
+# REPORTES_HTTP_MAX_AGE=0 desactiva el cache largo (solo ETag).
+REPORTES_HTTP_MAX_AGE = int(os.getenv("REPORTES_HTTP_MAX_AGE", "31536000"))
+
+# Días tras los cuales un día ya no recibe back-fills (datos finales).
+# 0 (default) = ningún día es final: siempre se revalida con ETag.
+REPORTES_DIAS_FINALES = int(os.getenv("REPORTES_DIAS_FINALES", "0"))
+
+# Header Server-Timing con tiempos / filas por etapa (devtools).
+# Apagado por default: sin él, medir cuesta una ContextVar por etapa.
+REPORTES_SERVER_TIMING = os.getenv("REPORTES_SERVER_TIMING", "0") == "1"
+
 
 # ─────────────────────────────
 # SERIALIZADOR SEGURO
@@ -46,12 +64,60 @@ def _serialize_data(data):
     return data
 
 
+# ─────────────────────────────
+# CACHE HTTP (ETag / Cache-Control)
+# ─────────────────────────────
+def _etag(filtros, formato: str, marca) -> str:
+    """
+    ETag fuerte: request canonicalizado + formato + marca de agua.
+    """
+    base = json.dumps(
+        [filtros.model_dump(mode="json"), formato, marca],
+        sort_keys=True,
+        default=str,
+    )
+    return '"' + hashlib.sha256(base.encode()).hexdigest()[:32] + '"'
+
+
+def _coincide_etag(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+
+    candidatos = [c.strip() for c in if_none_match.split(",")]
+
+    return "*" in candidatos or any(
+        c.removeprefix("W/") == etag for c in candidatos
+    )
+
+
+def _cache_control(hasta: date) -> str:
+    """
+    Rango con datos finales (hasta < hoy - REPORTES_DIAS_FINALES)
+    → cache largo inmutable.
+    Cualquier otro (aunque esté cerrado: puede recibir back-fills)
+    → revalidar siempre (ETag, que cambia con la marca de agua).
+    """
+    if (
+        REPORTES_DIAS_FINALES > 0
+        and REPORTES_HTTP_MAX_AGE > 0
+        and hasta < date.today() - timedelta(days=REPORTES_DIAS_FINALES)
+    ):
+        return f"public, max-age={REPORTES_HTTP_MAX_AGE}, immutable"
+    return "no-cache"
+
+
 # ─────────────────────────────
 # ENDPOINT
 # ─────────────────────────────
-@router.post("", summary="Generar reportes")
+@router.post(
+    "",
+    summary="Generar reportes",
+    response_class=ReportesJSONResponse,
+)
 def generar_reportes(
     filtros: ReportesFiltros,
+    request: Request,
+    formato: Literal["legacy", "columnar"] = Query("legacy", alias="format"),
     service: ReportesService = Depends(get_reportes_service),
 ):
     """
@@ -59,8 +125,40 @@ def generar_reportes(
     {
         "desde": "YYYY-MM-DD",
         "hasta": "YYYY-MM-DD",
-        "agrupar": "Dia | Semana | Mes | Anio"
+        "agrupar": "Dia | Semana | Mes | Anio",
+        "secciones": ["resumen", "general", ...],   (opcional)
+        "kpis": {"importe": true, ...}              (opcional)
     }
+
+    Query opcional:
+    - format=legacy (default): puntos con claves repetidas
+    - format=columnar: arreglos paralelos por serie, importes a centavos
+
+    Cache HTTP:
+    - ETag = request + formato + marca de agua de los datos
+    - If-None-Match coincidente → 304 sin recalcular
+    - Rangos con datos finales (REPORTES_DIAS_FINALES) → Cache-Control
+      de larga duración; el resto se revalida siempre
+
+    Con REPORTES_SERVER_TIMING=1 la respuesta incluye Server-Timing
+    (marca, cargas, dataframe, normalización, cubo, cada sección,
+    formato, json y total).
+    """
+    # Etiqueta 'agrupar' de las métricas HTTP (ver api/metricas.py)
+    request.state.agrupar = filtros.agrupar
+
+    with colectar(REPORTES_SERVER_TIMING) as tiempos:
+        respuesta = _generar_reportes(filtros, request, formato, service)
+
+    if tiempos is not None:
+        respuesta.headers["Server-Timing"] = tiempos.header()
+
+    return respuesta
+
+
+def _generar_reportes(filtros, request, formato, service) -> Response:
+    """
+    Cuerpo de generar_reportes (cada paso medido como etapa).
     """
 
     # ─────────────────────────
@@ -72,20 +170,154 @@ def generar_reportes(
             detail="La fecha 'desde' no puede ser mayor que 'hasta'",
         )
 
+    # ─────────────────────────
+    # Validación condicional (ETag)
+    # ─────────────────────────
+    # Marcas por día: una sola consulta por request (ETag + carga)
+    with etapa("marca"):
+        marcas = service.marcas_dias(filtros.desde, filtros.hasta)
+        marca = service.marca_agua(filtros.desde, filtros.hasta, marcas=marcas)
+
+    headers = {
+        "ETag": _etag(filtros, formato, marca),
+        "Cache-Control": _cache_control(filtros.hasta),
+    }
+
+    if _coincide_etag(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
     # ─────────────────────────
     # Delegar a Service
     # ─────────────────────────
-    resultado = service.generar(
+    with etapa("generar"):
+        resultado = service.generar(
+            desde=filtros.desde,
+            hasta=filtros.hasta,
+            agrupar=filtros.agrupar,
+            kpis=filtros.kpis.model_dump() if filtros.kpis else None,
+            marca=marca,
+            secciones=filtros.secciones,
+            formato=formato,
+            marcas=marcas,
+        )
+
+    # ─────────────────────────
+    # Respuesta serializada (una sola pasada)
+    # ─────────────────────────
+    with etapa("json"):
+        return ReportesJSONResponse(
+            content=resultado,
+            status_code=200,
+            headers=headers,
+        )
+
+
+# ─────────────────────────────
+# TABLA DETALLE (STREAMING NDJSON)
+# ─────────────────────────────
+@router.post("/tabla/stream", summary="Tabla detalle en streaming (NDJSON)")
+def tabla_stream(
+    filtros: TablaFiltros,
+    service: ReportesService = Depends(get_reportes_service),
+):
+    """
+    Devuelve la tabla detalle como NDJSON: una fila JSON por línea.
+
+    Body esperado:
+    {
+        "desde": "YYYY-MM-DD",
+        "hasta": "YYYY-MM-DD"
+    }
+    """
+    if filtros.desde > filtros.hasta:
+        raise HTTPException(
+            status_code=400,
+            detail="La fecha 'desde' no puede ser mayor que 'hasta'",
+        )
+
+    filas = service.generar_tabla(
         desde=filtros.desde,
         hasta=filtros.hasta,
-        agrupar=filtros.agrupar,
-        kpis=filtros.kpis if hasattr(filtros, "kpis") else None,
     )
 
-    # ─────────────────────────
-    # Respuesta serializada
-    # ─────────────────────────
-    return JSONResponse(
-        content=limpiar_json(resultado),
-        status_code=200
+    return StreamingResponse(
+        ndjson_lineas(filas),
+        media_type="application/x-ndjson",
     )
+
+
+# ─────────────────────────────
+# PAGINACIÓN KEYSET
+# ─────────────────────────────
+def _validar_pagina(filtros: PaginaFiltros):
+    if filtros.desde > filtros.hasta:
+        raise HTTPException(
+            status_code=400,
+            detail="La fecha 'desde' no puede ser mayor que 'hasta'",
+        )
+
+
+@router.post(
+    "/resumen",
+    summary="Resumen de devoluciones paginado",
+    response_class=ReportesJSONResponse,
+)
+def resumen_paginado(
+    filtros: PaginaFiltros,
+    service: ReportesService = Depends(get_reportes_service),
+):
+    """
+    Una página del resumen (una fila por devolución),
+    ordenada por fecha y folio descendentes.
+
+    Body esperado:
+    {
+        "desde": "YYYY-MM-DD",
+        "hasta": "YYYY-MM-DD",
+        "cursor": "<siguiente de la página anterior>" | null,
+        "limite": 50
+    }
+    """
+    _validar_pagina(filtros)
+
+    try:
+        pagina = service.resumen_pagina(
+            desde=filtros.desde,
+            hasta=filtros.hasta,
+            cursor=filtros.cursor,
+            limite=filtros.limite,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    return ReportesJSONResponse(content=pagina, status_code=200)
+
+
+@router.post(
+    "/tabla",
+    summary="Tabla detalle paginada",
+    response_class=ReportesJSONResponse,
+)
+def tabla_paginada(
+    filtros: PaginaFiltros,
+    service: ReportesService = Depends(get_reportes_service),
+):
+    """
+    Una página de la tabla detalle (día × zona × pasillo),
+    ordenada de forma ascendente.
+
+    Body: igual que /resumen.
+    """
+    _validar_pagina(filtros)
+
+    try:
+        pagina = service.tabla_pagina(
+            desde=filtros.desde,
+            hasta=filtros.hasta,
+            cursor=filtros.cursor,
+            limite=filtros.limite,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    return ReportesJSONResponse(content=pagina, status_code=200)
@@ -1,29 +1,66 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Dict, List, Optional, Any, Literal
 from datetime import date
 
 
+# ─────────────────────────────
+# CONFIGURACIÓN DE KPIs
+# ─────────────────────────────
+
+class KPIsConfig(BaseModel):
+    importe: bool = True
+    piezas: bool = True
+    devoluciones: bool = True
+
+
 # ─────────────────────────────
 # FILTROS DE ENTRADA
 # ─────────────────────────────
 
+Seccion = Literal[
+    "resumen",
+    "general",
+    "por_zona",
+    "por_pasillo",
+    "personas",
+    "por_persona",
+    "personas_series",
+    "tabla",
+]
+
+
 class ReportesFiltros(BaseModel):
     """
     Filtros enviados desde el frontend.
+
+    secciones: partes del reporte a calcular (None = todas)
+    kpis: KPIs activos (None = todos)
     """
     desde: date
     hasta: date
     agrupar: Literal["Dia", "Semana", "Mes", "Anio"]
+    secciones: Optional[List[Seccion]] = None
+    kpis: Optional[KPIsConfig] = None
 
 
-# ─────────────────────────────
-# CONFIGURACIÓN DE KPIs
-# ─────────────────────────────
+class TablaFiltros(BaseModel):
+    """
+    Filtros para la tabla de detalle en streaming.
+    """
+    desde: date
+    hasta: date
 
-class KPIsConfig(BaseModel):
-    importe: bool = True
-    piezas: bool = True
-    devoluciones: bool = True
+
+class PaginaFiltros(BaseModel):
+    """
+    Filtros para endpoints paginados (keyset).
+
+    cursor: valor 'siguiente' de la página anterior (None = primera)
+    """
+    desde: date
+    hasta: date
+    cursor: Optional[str] = None
+    limite: int = Field(default=50, ge=1, le=1000)
 
 
 # ─────────────────────────────
@@ -12,6 +12,8 @@ class BaseDB(ABC):
     - NO conoce MongoDB, SQLite ni detalles de infraestructura
     - SOLO expone métodos de lectura y agregación
     - Devuelve estructuras serializables (dict / list)
+    - El acceso crudo a colecciones (get_collection) NO es parte del
+      contrato: es propio de MongoClientProvider
     """
 
     # ─────────────────────────────
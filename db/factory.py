@@ -1,9 +1,16 @@
 import os
+import threading
+from datetime import date, timedelta
 from pathlib import Path
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
 
 from db.mongo.client import MongoClientProvider
 
+# db.memoria (generador sintético) solo se importa en crear_memoria
+if TYPE_CHECKING:
+    from db.memoria import MemoriaProvider
+
 
 # ─────────────────────────────────────────────
 # 🔑 CARGA EXPLÍCITA DEL .env (RUTA ABSOLUTA)
@@ -14,23 +21,153 @@ ENV_PATH = BASE_DIR / ".env"
 load_dotenv(dotenv_path=ENV_PATH)
 
 
+# ─────────────────────────────────────────────
+# CONFIGURACIÓN DEL POOL (ENV)
+# ─────────────────────────────────────────────
+# variable de entorno → (opción de MongoClient, tipo)
+_OPCIONES_POOL = {
+    "MONGO_MAX_POOL_SIZE": ("maxPoolSize", int),
+    "MONGO_MIN_POOL_SIZE": ("minPoolSize", int),
+    "MONGO_MAX_IDLE_TIME_MS": ("maxIdleTimeMS", int),
+    "MONGO_WAIT_QUEUE_TIMEOUT_MS": ("waitQueueTimeoutMS", int),
+    "MONGO_CONNECT_TIMEOUT_MS": ("connectTimeoutMS", int),
+    "MONGO_SOCKET_TIMEOUT_MS": ("socketTimeoutMS", int),
+    "MONGO_SERVER_SELECTION_TIMEOUT_MS": ("serverSelectionTimeoutMS", int),
+    "MONGO_COMPRESSORS": ("compressors", str),
+}
+
+_DEFAULTS_POOL = {
+    "maxPoolSize": 20,
+    "minPoolSize": 0,
+    "maxIdleTimeMS": 300_000,
+    "serverSelectionTimeoutMS": 5_000,
+    "connectTimeoutMS": 5_000,
+}
+
+
+def opciones_pool() -> dict:
+    """
+    Construye las opciones del MongoClient desde variables de entorno.
+
+    Los valores no definidos usan _DEFAULTS_POOL.
+    """
+    opciones = dict(_DEFAULTS_POOL)
+
+    for env, (opcion, tipo) in _OPCIONES_POOL.items():
+        valor = os.getenv(env)
+        if valor is None or not valor.strip():
+            continue
+        try:
+            opciones[opcion] = tipo(valor.strip())
+        except ValueError:
+            raise RuntimeError(
+                f"Valor inválido para {env}: {valor!r}"
+            )
+
+    return opciones
+
+
+# ─────────────────────────────────────────────
+# BACKEND (ENV)
+# ─────────────────────────────────────────────
+# "mongo" (default) | "memoria" (datos sintéticos, sin red)
+DB_BACKEND = os.getenv("DB_BACKEND", "mongo").strip().lower()
+
+BACKENDS = ("mongo", "memoria")
+
+
+def crear_memoria() -> "MemoriaProvider":
+    """
+    Proveedor en memoria con datos sintéticos.
+
+    MEMORIA_FILAS: artículos a generar (default 100_000)
+    MEMORIA_DIAS:  días de historia (default 365)
+    MEMORIA_DESDE: primer día (ISO); default: termina ayer
+    MEMORIA_SEED:  semilla (mismos datos entre arranques)
+    """
+    from db.memoria import MemoriaProvider
+
+    dias = int(os.getenv("MEMORIA_DIAS", "365"))
+    desde = os.getenv("MEMORIA_DESDE")
+
+    return MemoriaProvider.sintetico(
+        int(os.getenv("MEMORIA_FILAS", "100000")),
+        desde=(
+            date.fromisoformat(desde)
+            if desde
+            else date.today() - timedelta(days=dias)
+        ),
+        dias=dias,
+        seed=int(os.getenv("MEMORIA_SEED", "7")),
+    )
+
+
+# ─────────────────────────────────────────────
+# PROVIDER COMPARTIDO (UNO POR PROCESO)
+# ─────────────────────────────────────────────
+_provider: "MongoClientProvider | MemoriaProvider | None" = None
+_lock = threading.Lock()
+
+
+def init_db() -> "MongoClientProvider | MemoriaProvider":
+    """
+    Crea el proveedor compartido si no existe (según DB_BACKEND).
+
+    Se invoca desde el lifespan de FastAPI al arrancar.
+    """
+    global _provider
+
+    with _lock:
+        if _provider is None:
+            if DB_BACKEND not in BACKENDS:
+                raise RuntimeError(
+                    f"DB_BACKEND inválido: {DB_BACKEND!r} "
+                    f"(usar {', '.join(BACKENDS)})"
+                )
+
+            if DB_BACKEND == "memoria":
+                _provider = crear_memoria()
+                return _provider
+
+            uri = os.getenv("MONGO_URI")
+            db_name = os.getenv("MONGO_DB")
+
+            if not uri or not db_name:
+                raise RuntimeError(
+                    "Variables de entorno MONGO_URI y MONGO_DB no definidas"
+                )
+
+            _provider = MongoClientProvider(uri, db_name, **opciones_pool())
+
+        return _provider
+
+
+def close_db() -> None:
+    """
+    Cierra el proveedor compartido (shutdown de la app).
+    """
+    global _provider
+
+    with _lock:
+        if _provider is not None:
+            _provider.close()
+            _provider = None
+
+
 # ─────────────────────────────────────────────
 # DB PROVIDER (SOLO LECTURA)
 # ─────────────────────────────────────────────
-def get_db() -> MongoClientProvider:
+def get_db() -> "MongoClientProvider | MemoriaProvider":
     """
-    Devuelve el proveedor Mongo para consultas de REPORTES.
+    Devuelve el proveedor de datos para consultas de REPORTES
+    (Mongo o memoria, según DB_BACKEND).
     
     ❌ No expone repos
     ❌ No permite escritura
     ✅ Solo acceso a colecciones
+    ✅ Reutiliza el pool del proceso (no crea un cliente por llamada)
     """
-    uri = os.getenv("MONGO_URI")
-    db_name = os.getenv("MONGO_DB")
-
-    if not uri or not db_name:
-        raise RuntimeError(
-            "Variables de entorno MONGO_URI y MONGO_DB no definidas"
-        )
+    if _provider is not None:
+        return _provider
 
-    return MongoClientProvider(uri, db_name)
+    return init_db()
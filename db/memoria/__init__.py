@@ -0,0 +1,3 @@
+from .provider import MemoriaProvider
+from .access import ReportesAccessMemoria
+from .sinteticos import generar_datos
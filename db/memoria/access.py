@@ -0,0 +1,355 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+
+from db.mongo.reportes.access import COLUMNAS_RESUMEN
+from db.mongo.reportes.pipelines import MEDIDAS
+
+from .provider import MemoriaProvider
+
+
+COLUMNAS_ARTICULOS = ["nombre", "codigo", "pasillo", "cantidad", "unitario"]
+
+
+class ReportesAccessMemoria:
+    """
+    Mismas consultas que ReportesAccess, resueltas sobre los
+    arreglos de MemoriaProvider (sin Mongo ni red).
+
+    RESPONSABILIDAD:
+    - Devolver los MISMOS DataFrames / estructuras que ReportesAccess
+      (columnas, dtypes y orden)
+    - Cada DataFrame entregado es propio (el service lo modifica
+      en sitio)
+
+    NO HACE:
+    - Lógica de negocio
+    - Agrupaciones analíticas finales
+    """
+
+    # ─────────────────────────────
+    # INIT
+    # ─────────────────────────────
+    def __init__(self, provider: MemoriaProvider):
+        self.provider = provider
+
+    # ─────────────────────────────
+    # DEVOLUCIONES (BASE ANALÍTICA)
+    # ─────────────────────────────
+    def devoluciones_detalle(
+        self,
+        filtros: Dict,
+        medidas: tuple | None = None,
+    ) -> pd.DataFrame:
+        """
+        Eventos base (UNA FILA POR ARTÍCULO).
+
+        medidas: medidas a incluir (None = todas).
+        """
+        p = self.provider
+        articulos = p.articulos(p.rango(filtros.get("fecha")))
+
+        return self._tomar(p.detalle, articulos, self._columnas(medidas))
+
+    # ─────────────────────────────
+    # DEVOLUCIONES (ROLLUP)
+    # ─────────────────────────────
+    def devoluciones_rollup(
+        self,
+        filtros: Dict,
+        medidas: tuple | None = None,
+    ) -> pd.DataFrame:
+        """
+        Cubo agrupado (UNA FILA POR DÍA × ZONA × PASILLO),
+        ordenado por fecha, zona, pasillo.
+        """
+        p = self.provider
+        columnas = self._columnas(medidas)
+
+        df = self._tomar(
+            p.detalle, p.articulos(p.rango(filtros.get("fecha"))), columnas
+        )
+
+        rollup = (
+            df.groupby(
+                [df["fecha"].dt.floor("D"), "zona", "pasillo"],
+                observed=True,
+                sort=True,
+            )[[c for c in columnas if c in MEDIDAS]]
+            .sum()
+            .reset_index()
+        )
+
+        return self._tomar(rollup, slice(None), columnas)
+
+    def devoluciones_rollup_diario(self, filtros: Dict) -> pd.DataFrame:
+        """
+        Equivale al rollup materializado: el detalle en memoria
+        siempre está al día.
+        """
+        return self.devoluciones_rollup(filtros)
+
+    def marcas_rollup_diario(self, filtros: Dict) -> Dict[date, tuple]:
+        """
+        Todo día está "construido" con la marca actual
+        (ver devoluciones_rollup_diario).
+        """
+        return self.marcas_por_dia(filtros)
+
+    def _columnas(self, medidas) -> List[str]:
+        return [
+            c for c in self.provider.detalle.columns
+            if c not in MEDIDAS or medidas is None or c in medidas
+            or c == "devoluciones"
+        ]
+
+    def _tomar(self, df: pd.DataFrame, filas, columnas) -> pd.DataFrame:
+        """
+        DataFrame PROPIO (copia) con 'filas' × 'columnas' de 'df'.
+
+        Las categóricas conservan solo las categorías presentes,
+        como la ingesta columnar (que arma el diccionario con lo
+        que llega del cursor).
+        """
+        datos = {}
+        for col in columnas:
+            valores = df[col].array[filas]
+            if isinstance(valores, pd.Categorical):
+                valores = valores.remove_unused_categories()
+            datos[col] = valores
+
+        return pd.DataFrame(datos, copy=True)
+
+    # ─────────────────────────────
+    # RESUMEN ADMINISTRATIVO
+    # ─────────────────────────────
+    def devoluciones_resumen(self, filtros: Dict) -> pd.DataFrame:
+        """
+        Resumen (UNA FILA POR DEVOLUCIÓN), fecha DESC.
+        """
+        rango = self.provider.rango(filtros.get("fecha"))
+        posiciones = np.arange(rango.start, rango.stop)[::-1]
+        return self._resumen(posiciones)
+
+    # ─────────────────────────────
+    # RESUMEN PAGINADO (KEYSET)
+    # ─────────────────────────────
+    def devoluciones_resumen_pagina(
+        self,
+        filtros: Dict,
+        cursor: Dict | None = None,
+        limite: int = 50,
+    ) -> pd.DataFrame:
+        """
+        Una página del resumen ordenada por (fecha, folio) DESC.
+
+        Solo ordena una ventana al final del rango (ampliada hasta
+        juntar 'limite' filas), no el rango completo.
+        """
+        p = self.provider
+        fecha = p.fecha
+        folio = p.devoluciones["folio"]
+
+        rango = p.rango(filtros.get("fecha"))
+        inicio, fin = rango.start, rango.stop
+
+        if cursor:
+            corte = np.datetime64(cursor["fecha"], "ms")
+            fin = min(fin, int(np.searchsorted(fecha, corte, "right")))
+
+        tam = max(limite, 1)
+        while True:
+            desde = max(inicio, fin - tam)
+            if desde < fin:
+                # Empates de fecha completos dentro de la ventana
+                desde = max(inicio, int(np.searchsorted(fecha, fecha[desde], "left")))
+
+            posiciones = np.arange(desde, fin)
+
+            if cursor:
+                posiciones = posiciones[
+                    (fecha[posiciones] < corte)
+                    | (
+                        (fecha[posiciones] == corte)
+                        & (folio[posiciones] < cursor["folio"])
+                    )
+                ]
+
+            if len(posiciones) >= limite or desde <= inicio:
+                break
+            tam *= 2
+
+        orden = np.lexsort((folio[posiciones], fecha[posiciones]))[::-1]
+        return self._resumen(posiciones[orden[:limite]])
+
+    def _resumen(self, posiciones: np.ndarray) -> pd.DataFrame:
+        """
+        Filas del resumen para 'posiciones' (en ese orden).
+        Misma forma que el pipeline de resumen.
+        """
+        if not len(posiciones):
+            return pd.DataFrame(columns=COLUMNAS_RESUMEN)
+
+        p = self.provider
+        dev = p.devoluciones
+        items = p.items
+
+        return pd.DataFrame({
+            "fecha": p.fecha[posiciones],
+            "folio": dev["folio"][posiciones],
+            "cliente": p.valores("cliente", posiciones),
+            "zona": p.valores("zona", posiciones),
+            "motivo": p.valores("motivo", posiciones),
+            "estatus": p.valores("estatus", posiciones),
+            "pasillos": self._pasillos(posiciones, dev, items),
+            "total": dev["total"][posiciones].astype(np.float64),
+        })
+
+    def _pasillos(self, posiciones, dev, items) -> np.ndarray:
+        """
+        Pasillos distintos de cada devolución, unidos por ', '.
+        """
+        inicio = dev["item_inicio"][posiciones]
+        fin = dev["item_fin"][posiciones]
+        por_dev = fin - inicio
+
+        # Artículos de cada devolución, en el orden de 'posiciones'
+        fila = np.repeat(np.arange(len(posiciones)), por_dev)
+        desplazamiento = np.arange(por_dev.sum()) - np.repeat(
+            np.cumsum(por_dev) - por_dev, por_dev
+        )
+        articulo = np.repeat(inicio, por_dev) + desplazamiento
+
+        pasillo = items["pasillo"][articulo]
+        validos = pasillo >= 0
+
+        pares = pd.DataFrame({
+            "fila": fila[validos],
+            "pasillo": items["pasillo_categorias"][pasillo[validos]],
+        }).drop_duplicates().sort_values(["fila", "pasillo"])
+
+        unidos = pares.groupby("fila")["pasillo"].agg(", ".join)
+
+        return unidos.reindex(np.arange(len(posiciones)), fill_value="").to_numpy()
+
+    # ─────────────────────────────
+    # TABLA PAGINADA (KEYSET)
+    # ─────────────────────────────
+    def devoluciones_tabla_pagina(
+        self,
+        filtros: Dict,
+        cursor: Dict | None = None,
+        limite: int = 200,
+    ) -> pd.DataFrame:
+        """
+        Una página del cubo día × zona × pasillo ordenada ASC.
+        Mismas columnas que devoluciones_detalle.
+        """
+        filtro_fecha = dict(filtros.get("fecha", {}))
+
+        if cursor:
+            inicio = filtro_fecha.get("$gte")
+            if inicio is None or cursor["fecha"] > inicio:
+                filtro_fecha["$gte"] = cursor["fecha"]
+
+        rollup = self.devoluciones_rollup({**filtros, "fecha": filtro_fecha})
+        filas = slice(0, limite)
+
+        if cursor and not rollup.empty:
+            fecha = rollup["fecha"].to_numpy()
+            zona = rollup["zona"].astype(object).to_numpy()
+            pasillo = rollup["pasillo"].astype(object).to_numpy()
+
+            corte = np.datetime64(cursor["fecha"], "ms")
+            mismo_dia = fecha == corte
+            misma_zona = mismo_dia & (zona == cursor["zona"])
+
+            filas = np.flatnonzero(
+                (fecha > corte)
+                | (mismo_dia & (zona > cursor["zona"]))
+                | (misma_zona & (pasillo > cursor["pasillo"]))
+            )[:limite]
+
+        return self._tomar(rollup, filas, rollup.columns)
+
+    # ─────────────────────────────
+    # ARTÍCULOS POR DEVOLUCIÓN
+    # ─────────────────────────────
+    def devolucion_articulos(self, devolucion_id: str) -> pd.DataFrame:
+        """
+        Devuelve artículos de una devolución específica.
+        """
+        doc = self.provider.get_devolucion_completa(devolucion_id)
+
+        if not doc or not doc["items"]:
+            return pd.DataFrame(columns=COLUMNAS_ARTICULOS)
+
+        return pd.DataFrame([
+            {
+                "nombre": i.get("descripcion") or "",
+                "codigo": i.get("clave") or "",
+                "pasillo": i.get("pasillo") or "—",
+                "cantidad": int(i.get("cantidad") or 0),
+                "unitario": float(i.get("precio") or 0),
+            }
+            for i in doc["items"]
+        ])
+
+    # ─────────────────────────────
+    # PERSONAS / ASIGNACIONES (DIMENSIONES)
+    # ─────────────────────────────
+    def personas_activas(self) -> Dict[str, str]:
+        """
+        { persona_id: nombre } de personas activas.
+        """
+        return {
+            str(p["_id"]): p["nombre"]
+            for p in self.provider.listar_personal(solo_activos=True)
+        }
+
+    def asignaciones_personal(self) -> List[Dict]:
+        """
+        TODAS las asignaciones (SIN lógica temporal).
+        """
+        campos = ("pasillo", "persona_id", "fecha_desde", "fecha_hasta")
+        return [
+            {c: a[c] for c in campos if c in a}
+            for a in self.provider.listar_asignaciones()
+        ]
+
+    # ─────────────────────────────
+    # VERSIONES / MARCA DE AGUA
+    # ─────────────────────────────
+    def version_personas(self) -> tuple:
+        """
+        Misma huella que ReportesAccess: (activos, total, max _id).
+        """
+        personal = self.provider.personal
+        return (
+            sum(1 for p in personal if p.get("activo")),
+            *self._huella([p["_id"] for p in personal]),
+        )
+
+    def version_asignaciones(self) -> tuple:
+        return self._huella([a["_id"] for a in self.provider.asignaciones])
+
+    def marcas_por_dia(self, filtros: Dict) -> Dict[date, tuple]:
+        """
+        { día: (total, max _id) } de devoluciones en el rango.
+        """
+        rango = self.provider.rango(filtros.get("fecha"))
+        marcas = (
+            pd.Series(self.provider.ids[rango])
+            .groupby(self.provider.fecha[rango].astype("datetime64[D]"))
+            .agg(["size", "max"])
+        )
+
+        return {
+            dia.date(): (int(n), str(ultimo))
+            for dia, n, ultimo in zip(marcas.index, marcas["size"], marcas["max"])
+        }
+
+    def _huella(self, ids) -> tuple:
+        return (len(ids), str(max(ids)) if len(ids) else None)
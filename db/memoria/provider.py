@@ -0,0 +1,396 @@
+"""
+Backend de datos EN MEMORIA (SOLO LECTURA).
+
+RESPONSABILIDAD:
+- Guardar devoluciones, artículos, personal y asignaciones en
+  arreglos columnares (numpy), sin Mongo ni red
+- Implementar el contrato BaseDB sobre esos arreglos
+  (aggregate_devoluciones: solo $match / $project / $sort /
+  $skip / $limit, ver ahí)
+- Precalcular UNA vez el detalle tipado (una fila por artículo)
+  que consume ReportesAccessMemoria
+
+USO:
+- Pruebas de carga, profiling y demos (DB_BACKEND=memoria)
+- Benchmarks (scripts/benchmark_reportes.py)
+
+REGLAS:
+- devoluciones ordenadas por fecha (los rangos se resuelven con
+  búsqueda binaria)
+- artículos contiguos por devolución (item_inicio / item_fin)
+- Formato de entrada: el de db.memoria.sinteticos.generar_datos
+- Sin get_collection (no es parte de BaseDB): ReportesAccess y los
+  scripts que escriben en Mongo requieren MongoClientProvider
+  (las consultas de reportes van por ReportesAccessMemoria)
+"""
+
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from db.base import BaseDB
+
+from .sinteticos import generar_datos
+
+
+# Pasillo de artículos sin pasillo (igual que el pipeline de detalle)
+SIN_PASILLO = "—"
+
+# Campos de devolución guardados como códigos + "<campo>_categorias"
+_CATEGORICOS = ("zona", "cliente", "estatus", "motivo")
+
+
+def _categoria(codigos: np.ndarray, categorias) -> pd.Categorical:
+    """
+    Categórica con categorías ORDENADAS (el orden de los códigos
+    coincide con el orden de los textos, como el $sort de Mongo).
+    """
+    categorias = np.asarray(categorias, dtype=object)
+    orden = np.argsort(categorias, kind="stable")
+
+    nuevo = np.empty(len(orden), dtype=np.int32)
+    nuevo[orden] = np.arange(len(orden), dtype=np.int32)
+
+    return pd.Categorical.from_codes(
+        np.where(codigos >= 0, nuevo[codigos], -1),
+        categories=pd.Index(categorias[orden], dtype=object),
+    )
+
+
+def _proyectar(doc: Dict[str, Any], proyeccion: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    $project de inclusión (campo: 1) o exclusión (campo: 0) sobre
+    campos de primer nivel; _id se incluye salvo "_id": 0.
+    """
+    if any(not isinstance(v, (int, bool)) for v in proyeccion.values()):
+        raise ValueError(
+            "$project en memoria: solo inclusión / exclusión de campos"
+        )
+
+    incluir = {c for c, v in proyeccion.items() if v and c != "_id"}
+
+    if not incluir:
+        return {c: v for c, v in doc.items() if proyeccion.get(c, 1)}
+
+    return {
+        c: v
+        for c, v in doc.items()
+        if c in incluir or (c == "_id" and proyeccion.get("_id", 1))
+    }
+
+
+class MemoriaProvider(BaseDB):
+    """
+    Proveedor en memoria con la misma interfaz de lectura que
+    MongoClientProvider.
+
+    Se crea UNA vez por proceso (ver db.factory); los DataFrames
+    que entrega ReportesAccessMemoria son copias.
+    """
+
+    # ─────────────────────────────
+    # INIT
+    # ─────────────────────────────
+    def __init__(self, datos: Dict[str, Any]):
+        """
+        datos: salida de generar_datos (o la misma forma).
+        """
+        self._creado = time.time()
+
+        self.devoluciones = dict(datos["devoluciones"])
+        self.items = dict(datos["items"])
+        self.personal = [dict(p) for p in datos["personal"]]
+        self.asignaciones = [dict(a) for a in datos["asignaciones"]]
+
+        fecha = self.devoluciones["fecha"].astype("datetime64[ms]")
+        if len(fecha) > 1 and (fecha[1:] < fecha[:-1]).any():
+            raise ValueError("Las devoluciones deben venir ordenadas por fecha")
+
+        self.fecha = fecha
+        self.ids = self.devoluciones["_id"]
+        self._posicion = {str(v): i for i, v in enumerate(self.ids)}
+
+        self.detalle = self._construir_detalle()
+
+    @classmethod
+    def sintetico(cls, filas: int, **kwargs) -> "MemoriaProvider":
+        """
+        Proveedor con ~'filas' artículos sintéticos
+        (kwargs: los de generar_datos).
+        """
+        return cls(generar_datos(filas, **kwargs))
+
+    def _construir_detalle(self) -> pd.DataFrame:
+        """
+        Detalle analítico (UNA FILA POR ARTÍCULO), mismas columnas y
+        dtypes que la ingesta columnar de ReportesAccess.
+
+        importe: prorrateo del total por piezas, como el pipeline.
+        """
+        dev = self.devoluciones
+        items = self.items
+
+        i = items["devolucion"]
+        cantidad = items["cantidad"].astype(np.int32)
+
+        total_piezas = np.bincount(i, weights=cantidad, minlength=len(self.fecha))[i]
+        importe = np.where(
+            total_piezas > 0,
+            cantidad / np.where(total_piezas > 0, total_piezas, 1) * dev["total"][i],
+            0.0,
+        )
+
+        pasillos = np.append(items["pasillo_categorias"], SIN_PASILLO)
+        pasillo = np.where(items["pasillo"] < 0, len(pasillos) - 1, items["pasillo"])
+
+        return pd.DataFrame({
+            "fecha": self.fecha[i],
+            "zona": _categoria(dev["zona"][i], dev["zona_categorias"]),
+            "pasillo": _categoria(pasillo, pasillos),
+            "piezas": cantidad,
+            "importe": importe.astype(np.float64),
+            "devoluciones": np.ones(len(i), dtype=np.int32),
+        })
+
+    # ─────────────────────────────
+    # RANGOS / BÚSQUEDA
+    # ─────────────────────────────
+    def rango(self, filtro_fecha: Optional[Dict] = None) -> slice:
+        """
+        Posiciones de devoluciones dentro de un filtro de fecha
+        ($gte / $gt / $lte / $lt); vacío → todas.
+        """
+        filtro_fecha = filtro_fecha or {}
+        fecha = self.fecha
+
+        inicio, fin = 0, len(fecha)
+
+        if "$gte" in filtro_fecha:
+            inicio = np.searchsorted(fecha, np.datetime64(filtro_fecha["$gte"], "ms"), "left")
+        elif "$gt" in filtro_fecha:
+            inicio = np.searchsorted(fecha, np.datetime64(filtro_fecha["$gt"], "ms"), "right")
+
+        if "$lte" in filtro_fecha:
+            fin = np.searchsorted(fecha, np.datetime64(filtro_fecha["$lte"], "ms"), "right")
+        elif "$lt" in filtro_fecha:
+            fin = np.searchsorted(fecha, np.datetime64(filtro_fecha["$lt"], "ms"), "left")
+
+        return slice(int(inicio), int(max(inicio, fin)))
+
+    def articulos(self, devoluciones: slice) -> slice:
+        """
+        Posiciones de los artículos de un rango contiguo de devoluciones.
+        """
+        if devoluciones.start >= devoluciones.stop:
+            return slice(0, 0)
+
+        return slice(
+            int(self.devoluciones["item_inicio"][devoluciones.start]),
+            int(self.devoluciones["item_fin"][devoluciones.stop - 1]),
+        )
+
+    def valores(self, campo: str, posiciones) -> np.ndarray:
+        """
+        Valores de un campo de devolución (texto para categóricos).
+        """
+        dev = self.devoluciones
+        valores = dev[campo][posiciones]
+
+        if campo in _CATEGORICOS:
+            categorias = np.append(dev[f"{campo}_categorias"], None)
+            return categorias[valores]
+
+        return valores
+
+    def buscar(
+        self,
+        filtro: Optional[Dict[str, Any]] = None,
+        limite: Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        Posiciones de devoluciones que cumplen 'filtro'.
+
+        Soporta 'fecha' como rango ($gte / $gt / $lte / $lt) y
+        igualdad sobre los demás campos guardados; un campo que
+        no existe en memoria no coincide con nada.
+        """
+        filtro = dict(filtro or {})
+        rango = self.rango(filtro.pop("fecha", None))
+        posiciones = np.arange(rango.start, rango.stop)
+
+        for campo, valor in filtro.items():
+            if campo not in self.devoluciones:
+                return posiciones[:0]
+
+            if campo == "_id":
+                valor = str(valor)
+
+            posiciones = posiciones[
+                self.valores(campo, posiciones) == valor
+            ]
+
+        return posiciones if limite is None else posiciones[:limite]
+
+    def documento(self, posicion: int) -> Dict[str, Any]:
+        """
+        Devolución completa con la forma del documento Mongo
+        (fecha como datetime, artículos en 'items').
+        """
+        dev = self.devoluciones
+        items = self.items
+
+        articulos = []
+        pasillos = items["pasillo_categorias"]
+
+        for j in range(dev["item_inicio"][posicion], dev["item_fin"][posicion]):
+            pasillo = items["pasillo"][j]
+            articulos.append({
+                "clave": str(items["codigo"][j]),
+                "descripcion": f"Artículo {items['codigo'][j]}",
+                "pasillo": pasillos[pasillo] if pasillo >= 0 else None,
+                "cantidad": int(items["cantidad"][j]),
+                "precio": float(items["unitario"][j]),
+            })
+
+        return {
+            "_id": str(dev["_id"][posicion]),
+            "folio": dev["folio"][posicion],
+            "fecha": pd.Timestamp(self.fecha[posicion]).to_pydatetime(),
+            **{
+                campo: self.valores(campo, posicion)
+                for campo in _CATEGORICOS
+            },
+            "total": float(dev["total"][posicion]),
+            "items": articulos,
+        }
+
+    # ─────────────────────────────
+    # DEVOLUCIONES (LECTURA)
+    # ─────────────────────────────
+    def find_devoluciones(
+        self,
+        *,
+        filtro: Dict[str, Any] | None = None,
+        desde=None,
+        hasta=None,
+        vendedor_id: str | None = None,
+        estatus: str | None = None,
+    ) -> List[Dict]:
+        """
+        Equivalente a MongoClientProvider.find_devoluciones.
+        """
+        query: Dict[str, Any] = dict(filtro or {})
+
+        if desde or hasta:
+            query["fecha"] = {}
+            if desde:
+                query["fecha"]["$gte"] = desde
+            if hasta:
+                query["fecha"]["$lte"] = hasta
+
+        if vendedor_id:
+            query["vendedor_id"] = vendedor_id
+
+        if estatus:
+            query["estatus"] = estatus
+
+        return [self.documento(i) for i in self.buscar(query)]
+
+    def aggregate_devoluciones(self, pipeline: List[Dict]) -> List[Dict]:
+        """
+        Subconjunto de aggregate sobre las devoluciones (documentos
+        con la forma de documento()):
+
+        - $match (solo como PRIMERA etapa): lo mismo que buscar()
+          (rango de 'fecha' e igualdad)
+        - $project de inclusión o exclusión de campos de primer nivel
+        - $sort / $skip / $limit
+
+        Cualquier otra etapa, operador o forma de $project →
+        ValueError: las agregaciones de reportes las resuelve
+        ReportesAccessMemoria directamente sobre arreglos.
+        """
+        etapas = list(pipeline)
+        filtro: Dict[str, Any] = {}
+
+        if etapas and "$match" in etapas[0]:
+            filtro = etapas.pop(0)["$match"]
+
+        operadores = [c for c in filtro if c.startswith("$")]
+        if operadores:
+            raise ValueError(
+                f"$match no soportado en memoria: {operadores}"
+            )
+
+        docs = [self.documento(i) for i in self.buscar(filtro)]
+
+        for etapa in etapas:
+            (operador, argumento), = etapa.items()
+
+            if operador == "$project":
+                docs = [_proyectar(d, argumento) for d in docs]
+            elif operador == "$sort":
+                for campo, sentido in reversed(list(argumento.items())):
+                    docs.sort(
+                        # null primero (como Mongo en ASC)
+                        key=lambda d: (
+                            (False, 0) if d.get(campo) is None
+                            else (True, d.get(campo))
+                        ),
+                        reverse=sentido < 0,
+                    )
+            elif operador == "$skip":
+                docs = docs[argumento:]
+            elif operador == "$limit":
+                docs = docs[:argumento]
+            else:
+                raise ValueError(
+                    f"Etapa no soportada en memoria: {operador}"
+                )
+
+        return docs
+
+    def get_devolucion_completa(self, devolucion_id) -> Dict | None:
+        posicion = self._posicion.get(str(devolucion_id))
+        if posicion is None:
+            return None
+        return self.documento(posicion)
+
+    # ─────────────────────────────
+    # PERSONAL / ASIGNACIONES / VENDEDORES
+    # ─────────────────────────────
+    def listar_personal(self, solo_activos: bool = True) -> List[Dict]:
+        return [
+            dict(p) for p in self.personal
+            if p.get("activo") or not solo_activos
+        ]
+
+    def listar_asignaciones(self) -> List[Dict]:
+        return [dict(a) for a in self.asignaciones]
+
+    def listar_vendedores(self, solo_activos: bool = True) -> List[Dict]:
+        return []
+
+    # ─────────────────────────────
+    # LIFECYCLE
+    # ─────────────────────────────
+    def pool_stats(self) -> Dict[str, Any]:
+        """
+        Mismo endpoint que el pool de Mongo: aquí solo tamaños.
+        """
+        return {
+            "backend": "memoria",
+            "uptime_s": round(time.time() - self._creado, 1),
+            "devoluciones": len(self.fecha),
+            "articulos": len(self.detalle),
+            "desde": str(pd.Timestamp(self.fecha[0]).date()) if len(self.fecha) else None,
+            "hasta": str(pd.Timestamp(self.fecha[-1]).date()) if len(self.fecha) else None,
+            "detalle_mib": round(
+                float(self.detalle.memory_usage(deep=False).sum()) / 2**20, 1
+            ),
+        }
+
+    def close(self) -> None:
+        pass
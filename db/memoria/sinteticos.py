@@ -0,0 +1,191 @@
+"""
+Generador de datos sintéticos para el backend en memoria
+(benchmarks, pruebas de carga y demos).
+
+Genera devoluciones con artículos, personal y asignaciones con
+distribuciones parecidas a producción, en formato COLUMNAR
+(arreglos numpy), para poder llegar a millones de artículos sin
+crear un dict por fila.
+
+FORMA:
+{
+    "devoluciones": { columna: ndarray }   (ordenadas por fecha)
+    "items":        { columna: ndarray }   (contiguos por devolución)
+    "personal":     [ {_id, nombre, activo} ]
+    "asignaciones": [ {_id, pasillo, persona_id, fecha_desde, fecha_hasta} ]
+}
+
+- items["devolucion"] es el índice de su devolución
+- devoluciones["item_inicio"] / ["item_fin"] delimitan sus artículos
+- zona / cliente / pasillo / estatus / motivo van como códigos +
+  "<col>_categorias" (código -1 = sin valor)
+- _id crece con la fecha (como un ObjectId insertado en orden)
+"""
+
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+
+ESTATUS = ["pendiente", "aprobada", "rechazada", "cerrada"]
+
+MOTIVOS = ["dañado", "caducado", "error de surtido", "cliente"]
+
+
+def _oid(rng, n: int) -> np.ndarray:
+    """
+    n ObjectId-like (24 hex) crecientes, como los de Mongo.
+    """
+    base = int(datetime(2024, 1, 1).timestamp())
+    segundos = base + np.arange(n, dtype=np.int64)
+    sufijos = rng.integers(0, 2**63 - 1, n, dtype=np.int64)
+    return np.array(
+        [f"{int(s):08x}{int(x):016x}" for s, x in zip(segundos, sufijos)],
+        dtype=object,
+    )
+
+
+def generar_datos(
+    filas_items: int,
+    *,
+    desde: date = date(2025, 1, 1),
+    dias: int = 365,
+    zonas: int = 8,
+    pasillos: int = 150,
+    personas: int = 40,
+    items_por_devolucion: float = 3.0,
+    seed: int = 7,
+) -> dict:
+    """
+    Genera ~filas_items artículos repartidos en devoluciones.
+
+    - Fechas con hora, sesgadas a días hábiles
+    - Pasillos con popularidad tipo Zipf (pocos pasillos concentran
+      la mayoría de artículos); ~1% de artículos sin pasillo
+    - Cada pasillo rota de responsable cada ~90 días; ~10% de
+      pasillos nunca tienen asignación
+    """
+    rng = np.random.default_rng(seed)
+
+    # ───────── Artículos por devolución (≥ 1)
+    n_dev = max(1, int(round(filas_items / items_por_devolucion)))
+    por_dev = 1 + rng.poisson(items_por_devolucion - 1, n_dev)
+
+    # Ajustar para llegar exacto a filas_items
+    diferencia = filas_items - int(por_dev.sum())
+    if diferencia > 0:
+        np.add.at(por_dev, rng.integers(0, n_dev, diferencia), 1)
+    elif diferencia < 0:
+        while diferencia < 0:
+            candidatos = np.flatnonzero(por_dev > 1)
+            quitar = min(-diferencia, len(candidatos))
+            por_dev[candidatos[:quitar]] -= 1
+            diferencia += quitar
+
+    fin = np.cumsum(por_dev)
+    inicio = fin - por_dev
+
+    # ───────── Fechas (ordenadas)
+    dia = rng.integers(0, dias, n_dev)
+    fin_de_semana = (
+        (np.datetime64(desde, "D") + dia).astype("datetime64[D]").view("int64") + 3
+    ) % 7 >= 5
+    dia = np.where(fin_de_semana & (rng.random(n_dev) < 0.6), dia - 2, dia)
+    dia = np.clip(dia, 0, dias - 1)
+
+    segundos = rng.integers(8 * 3600, 20 * 3600, n_dev)
+    fecha = (
+        np.datetime64(desde, "ms")
+        + dia.astype("timedelta64[D]")
+        + segundos.astype("timedelta64[s]")
+    ).astype("datetime64[ms]")
+
+    fecha = np.sort(fecha)
+
+    # ───────── Artículos
+    devolucion = np.repeat(np.arange(n_dev, dtype=np.int32), por_dev)
+
+    pesos = 1.0 / np.arange(1, pasillos + 1) ** 0.9
+    pesos /= pesos.sum()
+    pasillo = rng.choice(pasillos, filas_items, p=pesos).astype(np.int32)
+    pasillo[rng.random(filas_items) < 0.01] = -1
+
+    cantidad = rng.geometric(0.45, filas_items).astype(np.int32)
+    unitario = np.round(rng.lognormal(4.0, 0.8, filas_items), 2)
+
+    total = np.bincount(
+        devolucion, weights=cantidad * unitario, minlength=n_dev
+    )
+
+    clientes = max(1, n_dev // 20)
+
+    categorias_pasillo = np.array(
+        [f"P{i + 1:03d}" for i in range(pasillos)], dtype=object
+    )
+
+    devoluciones = {
+        "_id": _oid(rng, n_dev),
+        "folio": np.array([f"DEV-{i + 1:07d}" for i in range(n_dev)], dtype=object),
+        "fecha": fecha,
+        "zona": rng.integers(0, zonas, n_dev).astype(np.int32),
+        "zona_categorias": np.array([f"Z{i + 1}" for i in range(zonas)], dtype=object),
+        "cliente": rng.integers(0, clientes, n_dev).astype(np.int32),
+        "cliente_categorias": np.array(
+            [f"CLIENTE {i + 1:05d}" for i in range(clientes)], dtype=object
+        ),
+        "estatus": rng.choice(len(ESTATUS), n_dev, p=[0.2, 0.5, 0.1, 0.2]).astype(np.int32),
+        "estatus_categorias": np.array(ESTATUS, dtype=object),
+        "motivo": rng.integers(0, len(MOTIVOS), n_dev).astype(np.int32),
+        "motivo_categorias": np.array(MOTIVOS, dtype=object),
+        "total": np.round(total, 2),
+        "item_inicio": inicio.astype(np.int64),
+        "item_fin": fin.astype(np.int64),
+    }
+
+    items = {
+        "devolucion": devolucion,
+        "pasillo": pasillo,
+        "pasillo_categorias": categorias_pasillo,
+        "cantidad": cantidad,
+        "unitario": unitario,
+        "codigo": (rng.integers(100000, 999999, filas_items)).astype(np.int32),
+    }
+
+    # ───────── Personal
+    personal_ids = _oid(rng, personas)
+    personal = [
+        {
+            "_id": personal_ids[i],
+            "nombre": f"Persona {i + 1:02d}",
+            "activo": bool(rng.random() < 0.9),
+        }
+        for i in range(personas)
+    ]
+
+    # ───────── Asignaciones (rotación ~90 días)
+    asignaciones = []
+    inicio_periodo = datetime.combine(desde, datetime.min.time())
+    fin_periodo = inicio_periodo + timedelta(days=dias)
+
+    for p in range(pasillos):
+        if rng.random() < 0.10:
+            continue
+
+        cursor = inicio_periodo - timedelta(days=int(rng.integers(0, 60)))
+        while cursor < fin_periodo:
+            duracion = timedelta(days=int(rng.integers(60, 120)))
+            asignaciones.append({
+                "_id": f"asig-{len(asignaciones) + 1}",
+                "pasillo": categorias_pasillo[p],
+                "persona_id": personal_ids[int(rng.integers(0, personas))],
+                "fecha_desde": cursor,
+                "fecha_hasta": cursor + duracion - timedelta(days=1),
+            })
+            cursor += duracion
+
+    return {
+        "devoluciones": devoluciones,
+        "items": items,
+        "personal": personal,
+        "asignaciones": asignaciones,
+    }
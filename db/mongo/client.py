@@ -1,8 +1,101 @@
+import threading
+import time
+
 from pymongo import MongoClient
+from pymongo import monitoring
 from datetime import datetime
 from typing import Any, Dict, List
 
 
+class EstadisticasPool(monitoring.ConnectionPoolListener):
+    """
+    Listener de PyMongo que acumula estadísticas del pool de conexiones.
+
+    Se registra al crear el MongoClient y solo cuenta eventos
+    (sin I/O), por lo que su costo en la ruta caliente es mínimo.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checkouts = 0
+        self._checkins = 0
+        self._checkout_fallidos = 0
+        self._conexiones_creadas = 0
+        self._conexiones_cerradas = 0
+        self._espera_total = 0.0
+        self._espera_max = 0.0
+        self._limpiezas = 0
+
+    # ───────── Eventos de checkout
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_checked_out(self, event):
+        espera = float(getattr(event, "duration", 0.0) or 0.0)
+        with self._lock:
+            self._checkouts += 1
+            self._espera_total += espera
+            if espera > self._espera_max:
+                self._espera_max = espera
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self._checkout_fallidos += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self._checkins += 1
+
+    # ───────── Eventos de conexión
+    def connection_created(self, event):
+        with self._lock:
+            self._conexiones_creadas += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self._conexiones_cerradas += 1
+
+    # ───────── Eventos de pool
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self._limpiezas += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Devuelve una copia serializable de las estadísticas actuales.
+        """
+        with self._lock:
+            checkouts = self._checkouts
+            return {
+                "checkouts": checkouts,
+                "checkins": self._checkins,
+                "en_uso": checkouts - self._checkins,
+                "checkout_fallidos": self._checkout_fallidos,
+                "conexiones_abiertas": (
+                    self._conexiones_creadas - self._conexiones_cerradas
+                ),
+                "conexiones_creadas": self._conexiones_creadas,
+                "espera_promedio_ms": (
+                    round(self._espera_total / checkouts * 1000, 3)
+                    if checkouts else 0.0
+                ),
+                "espera_max_ms": round(self._espera_max * 1000, 3),
+                "limpiezas": self._limpiezas,
+            }
+
+
 class MongoClientProvider:
     """
     Proveedor de acceso a MongoDB (SOLO LECTURA).
@@ -13,14 +106,29 @@ class MongoClientProvider:
     - Ejecutar consultas find / aggregate
     - NO escribir datos
     - NO contener lógica de negocio
+
+    Se crea UNA vez por proceso (ver db.factory) y comparte
+    el pool de conexiones entre requests.
     """
 
     # ─────────────────────────────
     # INIT
     # ─────────────────────────────
-    def __init__(self, uri: str, db_name: str):
-        self._client = MongoClient(uri)
+    def __init__(self, uri: str, db_name: str, **opciones_cliente):
+        """
+        opciones_cliente: kwargs adicionales para MongoClient
+        (maxPoolSize, compressors, maxIdleTimeMS, timeouts, ...).
+        """
+        self._stats = EstadisticasPool()
+        self._creado = time.time()
+
+        self._client = MongoClient(
+            uri,
+            event_listeners=[self._stats],
+            **opciones_cliente,
+        )
         self._db = self._client[db_name]
+        self._opciones = dict(opciones_cliente)
 
     # ─────────────────────────────
     # ACCESO GENÉRICO
@@ -113,5 +221,15 @@ class MongoClientProvider:
     # ─────────────────────────────
     # LIFECYCLE
     # ─────────────────────────────
+    def pool_stats(self) -> Dict[str, Any]:
+        """
+        Estadísticas del pool de conexiones (checkout / espera).
+        """
+        return {
+            "opciones": dict(self._opciones),
+            "uptime_s": round(time.time() - self._creado, 1),
+            **self._stats.snapshot(),
+        }
+
     def close(self):
         self._client.close()
@@ -4,3 +4,5 @@ PERSONAL = "personal"
 VENDEDORES = "vendedores"
 ASIGNACIONES = "asignaciones_pasillo"
 PRODUCTOS = "productos"
+ROLLUP_DIARIO = "devoluciones_rollup_diario"
+ROLLUP_ESTADO = "devoluciones_rollup_estado"
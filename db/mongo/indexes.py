@@ -5,6 +5,7 @@ from .collections import (
     VENDEDORES,
     ASIGNACIONES,
     PRODUCTOS,
+    ROLLUP_DIARIO,
 )
 
 
@@ -17,12 +18,20 @@ def ensure_indexes(db: Database):
     # ───────── DEVOLUCIONES ─────────
     col = db[DEVOLUCIONES]
     col.create_index("fecha")
+    col.create_index("fecha_dt", sparse=True)
+    col.create_index([("fecha", -1), ("folio", -1)])
+    col.create_index([("fecha", 1), ("_id", 1)])     # marcas por día (cubierto)
     col.create_index("folio", unique=True)
     col.create_index("zona")
     col.create_index("vendedor_id")
     col.create_index("estatus")
     col.create_index("articulos.pasillo")
 
+    # ───────── ROLLUP DIARIO (MATERIALIZADO) ─────────
+    col = db[ROLLUP_DIARIO]
+    col.create_index("fecha")
+    col.create_index("actualizado")
+
     # ───────── PERSONAL ─────────
     db[PERSONAL].create_index("activo")
 
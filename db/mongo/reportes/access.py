@@ -1,13 +1,51 @@
+import time
+from datetime import date
+
 import pandas as pd
 from typing import Dict, List
 
+from db.mongo.collections import ROLLUP_DIARIO, ROLLUP_ESTADO
+
+from .explain import MonitorConsultas
+from .ingesta import LOTE_DEFAULT, aggregate_columnar
 from .pipelines import (
     pipeline_devoluciones_detalle,
+    pipeline_devoluciones_rollup,
+    pipeline_rollup_diario_lectura,
     pipeline_devoluciones_resumen,
+    pipeline_devoluciones_resumen_pagina,
+    pipeline_tabla_pagina,
     pipeline_devolucion_articulos,
+    pipeline_marcas_por_dia,
+    filtro_fechas_texto,
+    MEDIDAS,
 )
 
 
+# Tipos de ingesta del detalle / rollup (ver ingesta.py)
+ESQUEMA_DETALLE = {
+    "fecha": "fecha",
+    "zona": "categoria",
+    "pasillo": "categoria",
+    "piezas": "int32",
+    "importe": "float64",
+    "devoluciones": "int32",
+}
+
+# Marca de un día sin devoluciones (ver marcas_por_dia)
+MARCA_DIA_VACIO = (0, None)
+
+COLUMNAS_RESUMEN = [
+    "id",
+    "fecha",
+    "folio",
+    "cliente",
+    "zona",
+    "estatus",
+    "total",
+]
+
+
 class ReportesAccess:
     """
     Ejecuta consultas especializadas para REPORTES.
@@ -26,41 +64,137 @@ class ReportesAccess:
     # ─────────────────────────────
     # INIT
     # ─────────────────────────────
-    def __init__(self, provider):
+    def __init__(
+        self,
+        provider,
+        *,
+        lote: int = LOTE_DEFAULT,
+        raw_bson: bool = False,
+        monitor: MonitorConsultas | None = None,
+    ):
         """
         provider: MongoClientProvider
+        lote: documentos por batch en la ingesta columnar
+        raw_bson: leer el cursor como RawBSONDocument
+        monitor: explain / log de consultas lentas (None = apagado)
         """
         self.provider = provider
+        self.lote = lote
+        self.raw_bson = raw_bson
+        self.monitor = monitor
 
         # Colecciones reales (PyMongo Collection)
         self.devoluciones = provider.get_collection("devoluciones")
         self.personas = provider.get_collection("personal")
         self.asignaciones = provider.get_collection("asignaciones")
+        self.rollup_diario = provider.get_collection(ROLLUP_DIARIO)
+        self.rollup_estado = provider.get_collection(ROLLUP_ESTADO)
 
     # ─────────────────────────────
     # DEVOLUCIONES (BASE ANALÍTICA)
     # ─────────────────────────────
-    def devoluciones_detalle(self, filtros: Dict) -> pd.DataFrame:
+    def devoluciones_detalle(
+        self,
+        filtros: Dict,
+        medidas: tuple | None = None,
+    ) -> pd.DataFrame:
         """
         Devuelve eventos base de devoluciones
         (UNA FILA POR ARTÍCULO).
+
+        medidas: medidas a proyectar (None = todas).
         """
-        pipeline = pipeline_devoluciones_detalle(filtros)
-        data = list(self.devoluciones.aggregate(pipeline))
+        pipeline = pipeline_devoluciones_detalle(filtros, medidas)
+        return self._leer_detalle("detalle", self.devoluciones, pipeline, medidas)
 
-        if not data:
-            return pd.DataFrame(
-                columns=[
-                    "fecha",
-                    "zona",
-                    "pasillo",
-                    "piezas",
-                    "importe",
-                    "devoluciones",
-                ]
-            )
+    # ─────────────────────────────
+    # DEVOLUCIONES (ROLLUP EN MONGO)
+    # ─────────────────────────────
+    def devoluciones_rollup(
+        self,
+        filtros: Dict,
+        medidas: tuple | None = None,
+    ) -> pd.DataFrame:
+        """
+        Devuelve el cubo ya agrupado en Mongo
+        (UNA FILA POR DÍA × ZONA × PASILLO).
 
-        return pd.DataFrame(data)
+        Mismas columnas que devoluciones_detalle
+        (medidas: igual que en devoluciones_detalle).
+        """
+        pipeline = pipeline_devoluciones_rollup(filtros, medidas)
+        return self._leer_detalle("rollup", self.devoluciones, pipeline, medidas)
+
+    # ─────────────────────────────
+    # DEVOLUCIONES (ROLLUP MATERIALIZADO)
+    # ─────────────────────────────
+    def devoluciones_rollup_diario(self, filtros: Dict) -> pd.DataFrame:
+        """
+        Lee la colección devoluciones_rollup_diario
+        (construida por scripts/construir_rollup.py).
+
+        Mismas columnas que devoluciones_detalle.
+        """
+        pipeline = pipeline_rollup_diario_lectura(filtros)
+        return self._leer_detalle("rollup_diario", self.rollup_diario, pipeline)
+
+    def marcas_rollup_diario(self, filtros: Dict) -> Dict[date, tuple]:
+        """
+        Marca con la que scripts/construir_rollup.py construyó cada
+        día del rango: { día: (total, max _id) }.
+
+        Un día construido sin devoluciones → MARCA_DIA_VACIO.
+        Días nunca construidos no aparecen.
+        """
+        filtro_fecha = filtros.get("fecha", {})
+        cursor = self.rollup_estado.find(
+            {"_id": filtro_fecha} if filtro_fecha else {}
+        )
+
+        return {
+            d["_id"].date(): (d["n"], d["ultimo"])
+            for d in cursor
+        }
+
+    def _leer_detalle(self, nombre, col, pipeline, medidas=None) -> pd.DataFrame:
+        """
+        Ingesta columnar de filas con columnas de detalle
+        (solo las medidas proyectadas por el pipeline).
+        """
+        esquema = {
+            c: t
+            for c, t in ESQUEMA_DETALLE.items()
+            if c not in MEDIDAS or medidas is None or c in medidas
+            or c == "devoluciones"
+        }
+
+        return self._agregar(
+            nombre,
+            col,
+            pipeline,
+            lambda: aggregate_columnar(
+                col,
+                pipeline,
+                esquema,
+                lote=self.lote,
+                raw_bson=self.raw_bson,
+            ),
+        )
+
+    def _agregar(self, nombre, col, pipeline, leer):
+        """
+        Ejecuta leer() (el aggregate de 'pipeline' sobre 'col')
+        y se lo reporta al monitor con su duración y filas.
+        """
+        if self.monitor is None:
+            return leer()
+
+        inicio = time.perf_counter()
+        resultado = leer()
+        ms = (time.perf_counter() - inicio) * 1000
+
+        self.monitor.observar(nombre, col, pipeline, ms, len(resultado))
+        return resultado
 
     # ─────────────────────────────
     # RESUMEN ADMINISTRATIVO
@@ -71,23 +205,75 @@ class ReportesAccess:
         (UNA FILA POR DEVOLUCIÓN).
         """
         pipeline = pipeline_devoluciones_resumen(filtros)
-        data = list(self.devoluciones.aggregate(pipeline))
+        data = self._agregar(
+            "resumen",
+            self.devoluciones,
+            pipeline,
+            lambda: list(self.devoluciones.aggregate(pipeline)),
+        )
 
         if not data:
-            return pd.DataFrame(
-                columns=[
-                    "id",
-                    "fecha",
-                    "folio",
-                    "cliente",
-                    "zona",
-                    "estatus",
-                    "total",
-                ]
-            )
+            return pd.DataFrame(columns=COLUMNAS_RESUMEN)
+
+        return pd.DataFrame(data)
+
+    # ─────────────────────────────
+    # RESUMEN PAGINADO (KEYSET)
+    # ─────────────────────────────
+    def devoluciones_resumen_pagina(
+        self,
+        filtros: Dict,
+        cursor: Dict | None = None,
+        limite: int = 50,
+    ) -> pd.DataFrame:
+        """
+        Una página del resumen ordenada por (fecha, folio) DESC.
+
+        Si en el rango quedan fechas String (sin migrar o migradas
+        con --shadow) se usa el prefiltro completo del resumen; si
+        no, el camino indexado sobre 'fecha' cruda. Nunca se omiten
+        devoluciones que el resumen sin paginar sí incluye.
+        """
+        pendientes = self.devoluciones.find_one(
+            filtro_fechas_texto(filtros), {"_id": 1}
+        )
+
+        pipeline = pipeline_devoluciones_resumen_pagina(
+            filtros,
+            cursor=cursor,
+            limite=limite,
+            normalizar_fecha=pendientes is not None,
+        )
+        data = self._agregar(
+            "resumen_pagina",
+            self.devoluciones,
+            pipeline,
+            lambda: list(self.devoluciones.aggregate(pipeline)),
+        )
+
+        if not data:
+            return pd.DataFrame(columns=COLUMNAS_RESUMEN)
 
         return pd.DataFrame(data)
 
+    # ─────────────────────────────
+    # TABLA PAGINADA (KEYSET)
+    # ─────────────────────────────
+    def devoluciones_tabla_pagina(
+        self,
+        filtros: Dict,
+        cursor: Dict | None = None,
+        limite: int = 200,
+    ) -> pd.DataFrame:
+        """
+        Una página del cubo día × zona × pasillo ordenada ASC.
+        Mismas columnas que devoluciones_detalle.
+        """
+        pipeline = pipeline_tabla_pagina(
+            filtros, cursor=cursor, limite=limite
+        )
+        return self._leer_detalle("tabla_pagina", self.devoluciones, pipeline)
+
     # ─────────────────────────────
     # ARTÍCULOS POR DEVOLUCIÓN
     # ─────────────────────────────
@@ -96,7 +282,12 @@ class ReportesAccess:
         Devuelve artículos de una devolución específica.
         """
         pipeline = pipeline_devolucion_articulos(devolucion_id)
-        data = list(self.devoluciones.aggregate(pipeline))
+        data = self._agregar(
+            "articulos",
+            self.devoluciones,
+            pipeline,
+            lambda: list(self.devoluciones.aggregate(pipeline)),
+        )
 
         if not data:
             return pd.DataFrame(
@@ -153,12 +344,55 @@ class ReportesAccess:
         return list(cursor)
 
     # ─────────────────────────────
-    # DEBUG DIRECTO (SIN PIPELINE)
+    # VERSIONES DE DIMENSIONES (PROBE BARATO)
     # ─────────────────────────────
-    def debug_find_devoluciones(self, filtros: Dict):
+    def version_personas(self) -> tuple:
         """
-        DEBUG PURO:
-        Acceso directo a Mongo para validar filtros.
+        Huella barata de 'personal': (activos, total, max _id).
+        Cambia al insertar, borrar o (des)activar personas.
         """
-        docs = list(self.devoluciones.find(filtros).limit(1))
-        return docs
+        return (
+            self.personas.count_documents({"activo": True}),
+            *self._huella(self.personas),
+        )
+
+    def version_asignaciones(self) -> tuple:
+        """
+        Huella barata de 'asignaciones': (total, max _id).
+        """
+        return self._huella(self.asignaciones)
+
+    def marcas_por_dia(self, filtros: Dict) -> Dict[date, tuple]:
+        """
+        Marca de agua POR DÍA de devoluciones en el rango:
+        { día: (total, max _id) }. Días sin devoluciones no aparecen.
+
+        Si en el rango quedan fechas String se normalizan; si no,
+        alcanza con el índice (fecha, _id).
+        """
+        pendientes = self.devoluciones.find_one(
+            filtro_fechas_texto(filtros), {"_id": 1}
+        )
+
+        pipeline = pipeline_marcas_por_dia(
+            filtros, normalizar_fecha=pendientes is not None
+        )
+        data = self._agregar(
+            "marcas",
+            self.devoluciones,
+            pipeline,
+            lambda: list(self.devoluciones.aggregate(pipeline)),
+        )
+
+        return {
+            d["_id"].date(): (d["n"], str(d["ultimo"]))
+            for d in data
+        }
+
+    def _huella(self, col, filtro: Dict | None = None) -> tuple:
+        filtro = filtro or {}
+        ultimo = col.find_one(filtro, {"_id": 1}, sort=[("_id", -1)])
+        return (
+            col.count_documents(filtro),
+            str(ultimo["_id"]) if ultimo else None,
+        )
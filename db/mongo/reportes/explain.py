@@ -0,0 +1,257 @@
+"""
+Diagnóstico de pipelines: explain("executionStats") y consultas lentas.
+
+RESPONSABILIDAD:
+- Correr explain de los aggregate que ejecuta ReportesAccess
+  (todos en modo debug; solo los lentos si hay umbral)
+- Resumir el plan: docs / claves examinados vs devueltos,
+  etapas (COLLSCAN / IXSCAN / ...) e índices usados
+- Registrar las consultas lentas en el log con su pipeline completo
+- Guardar las últimas N entradas para el endpoint de admin
+
+REGLAS:
+- El explain corre en segundo plano (un worker): no suma
+  latencia al request que ya se sirvió
+- La cola de explains pendientes es acotada ('max_cola'): lo que
+  no entra se descarta y se cuenta (bajo carga no crece sin límite)
+- explain("executionStats") VUELVE a ejecutar el pipeline;
+  por eso es opt-in
+- cerrar() (lifespan) cancela los pendientes: no demoran el apagado
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+try:
+    from bson import json_util
+except ImportError:
+    json_util = None
+
+
+logger = logging.getLogger(__name__)
+
+# Etapas del plan que interesan para diagnosticar
+ETAPAS_PLAN = ("COLLSCAN", "IXSCAN", "FETCH", "SORT", "EXPRESS_IXSCAN", "IDHACK")
+
+
+def _serializable(pipeline: list) -> list:
+    """
+    Copia JSON del pipeline (fechas / ObjectId en Extended JSON).
+    """
+    if json_util is None:
+        return json.loads(json.dumps(pipeline, default=str))
+    return json.loads(
+        json_util.dumps(pipeline, json_options=json_util.RELAXED_JSON_OPTIONS)
+    )
+
+
+def resumir_explain(explain: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extrae lo útil de un explain de aggregate (con o sin etapa
+    $cursor, SBE o clásico, con o sin shards).
+    """
+    etapas = set()
+    indices = set()
+    totales = {"docs_examinados": 0, "claves_examinadas": 0, "devueltos": 0}
+
+    def recorrer(nodo):
+        if isinstance(nodo, dict):
+            etapa = nodo.get("stage")
+            if isinstance(etapa, str):
+                etapas.add(etapa)
+
+            if isinstance(nodo.get("indexName"), str):
+                indices.add(nodo["indexName"])
+
+            stats = nodo.get("executionStats")
+            if isinstance(stats, dict):
+                totales["docs_examinados"] += stats.get("totalDocsExamined", 0) or 0
+                totales["claves_examinadas"] += stats.get("totalKeysExamined", 0) or 0
+                totales["devueltos"] += stats.get("nReturned", 0) or 0
+
+            for valor in nodo.values():
+                recorrer(valor)
+
+        elif isinstance(nodo, list):
+            for valor in nodo:
+                recorrer(valor)
+
+    recorrer(explain)
+
+    return {
+        **totales,
+        "plan": sorted(e for e in etapas if e in ETAPAS_PLAN),
+        "collscan": "COLLSCAN" in etapas,
+        "indices": sorted(indices),
+    }
+
+
+class MonitorConsultas:
+    """
+    Registro acotado de explains / consultas lentas (uno por proceso).
+
+    explain_todas: explain de CADA pipeline (modo debug)
+    umbral_ms: pipelines con duración ≥ umbral se loguean como lentos
+    (con su explain); None / 0 = sin log de lentas
+    max_entradas: tamaño del registro (las más viejas se descartan)
+    max_cola: explains pendientes como máximo (el resto se descarta)
+    """
+
+    def __init__(
+        self,
+        *,
+        explain_todas: bool = False,
+        umbral_ms: float | None = None,
+        max_entradas: int = 200,
+        max_cola: int = 20,
+    ):
+        self.explain_todas = explain_todas
+        self.umbral_ms = umbral_ms or None
+        self.max_entradas = max_entradas
+        self.max_cola = max_cola
+
+        self._lock = threading.Lock()
+        self._entradas: deque = deque(maxlen=max_entradas)
+        self._lentas = 0
+        self._errores = 0
+        self._pendientes = 0
+        self._descartadas = 0
+
+        # Un solo worker: los explains no compiten con los requests
+        self._executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="reportes-explain",
+        )
+
+    # ─────────────────────────────
+    # API
+    # ─────────────────────────────
+    def observar(
+        self,
+        nombre: str,
+        coleccion,
+        pipeline: list,
+        ms: float,
+        filas: int | None,
+    ) -> None:
+        """
+        Llamado por ReportesAccess tras cada aggregate.
+        Decide si hace falta explain y lo programa en segundo plano.
+        """
+        lenta = self.umbral_ms is not None and ms >= self.umbral_ms
+
+        if not (lenta or self.explain_todas):
+            return
+
+        with self._lock:
+            if self._pendientes >= self.max_cola:
+                self._descartadas += 1
+                return
+            self._pendientes += 1
+
+        try:
+            self._executor.submit(
+                self._explicar, nombre, coleccion, pipeline, ms, filas, lenta
+            )
+        except RuntimeError:
+            # Executor ya cerrado (apagado en curso)
+            with self._lock:
+                self._pendientes -= 1
+                self._descartadas += 1
+
+    def entradas(self, limite: int | None = None) -> List[Dict]:
+        """
+        Últimas entradas, la más reciente primero.
+        """
+        with self._lock:
+            entradas = list(self._entradas)
+        entradas.reverse()
+        return entradas[:limite] if limite else entradas
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+
+    def cerrar(self) -> None:
+        """
+        Cancela los explains pendientes sin esperar al que está
+        corriendo (llamado desde el lifespan al apagar).
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "explain_todas": self.explain_todas,
+                "umbral_ms": self.umbral_ms,
+                "max_entradas": self.max_entradas,
+                "max_cola": self.max_cola,
+                "entradas": len(self._entradas),
+                "lentas": self._lentas,
+                "errores_explain": self._errores,
+                "pendientes": self._pendientes,
+                "descartadas": self._descartadas,
+            }
+
+    # ─────────────────────────────
+    # INTERNOS
+    # ─────────────────────────────
+    def _explicar(self, nombre, coleccion, pipeline, ms, filas, lenta) -> None:
+        try:
+            self._registrar(nombre, coleccion, pipeline, ms, filas, lenta)
+        finally:
+            with self._lock:
+                self._pendientes -= 1
+
+    def _registrar(self, nombre, coleccion, pipeline, ms, filas, lenta) -> None:
+        entrada = {
+            "consulta": nombre,
+            "coleccion": coleccion.name,
+            "momento": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "duracion_ms": round(ms, 1),
+            "filas": filas,
+            "lenta": lenta,
+            "pipeline": _serializable(pipeline),
+        }
+
+        inicio = time.perf_counter()
+        try:
+            explain = coleccion.database.command(
+                "explain",
+                {"aggregate": coleccion.name, "pipeline": pipeline, "cursor": {}},
+                verbosity="executionStats",
+            )
+            entrada["explain"] = resumir_explain(explain)
+        except Exception as exc:
+            entrada["explain"] = None
+            entrada["error_explain"] = str(exc)
+            with self._lock:
+                self._errores += 1
+        entrada["explain_ms"] = round((time.perf_counter() - inicio) * 1000, 1)
+
+        with self._lock:
+            self._entradas.append(entrada)
+            if lenta:
+                self._lentas += 1
+
+        if lenta:
+            resumen = entrada["explain"] or {}
+            logger.warning(
+                "Consulta lenta %s (%.1f ms, %s filas): docs examinados=%s, "
+                "claves=%s, devueltos=%s, plan=%s, índices=%s, pipeline=%s",
+                nombre,
+                ms,
+                filas,
+                resumen.get("docs_examinados"),
+                resumen.get("claves_examinadas"),
+                resumen.get("devueltos"),
+                ",".join(resumen.get("plan", [])) or "?",
+                ",".join(resumen.get("indices", [])) or "-",
+                entrada["pipeline"],
+            )
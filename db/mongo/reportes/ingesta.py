@@ -0,0 +1,212 @@
+"""
+Ingesta columnar: cursor Mongo → DataFrame tipado.
+
+RESPONSABILIDAD:
+- Leer el cursor por lotes (batch_size) sin materializar una
+  lista de dicts con todas las filas
+- Convertir cada campo a un arreglo numpy tipado por lote
+  (solo los documentos del lote en curso viven como objetos Python)
+- Armar el DataFrame al final con los dtypes ya resueltos
+
+TIPOS DE COLUMNA:
+- "fecha"     → datetime64[ms] (precisión de BSON Date; None → NaT)
+- "int32"     → int32 (None → 0)
+- "float64"   → float64 (None → 0.0)
+- "categoria" → Categorical (un diccionario por columna; None → NaN)
+- "objeto"    → object (sin conversión)
+
+Los pipelines garantizan métricas no nulas; el 0 para None es
+solo una red de seguridad.
+"""
+
+from typing import Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+try:
+    from bson.codec_options import CodecOptions
+    from bson.raw_bson import RawBSONDocument
+except ImportError:
+    CodecOptions = None
+    RawBSONDocument = None
+
+
+# Documentos por lote (batch_size del cursor y tamaño de cada arreglo)
+LOTE_DEFAULT = 10_000
+
+_DTYPES = {
+    "fecha": "datetime64[ms]",
+    "int32": np.int32,
+    "float64": np.float64,
+    "categoria": np.int32,
+    "objeto": object,
+}
+
+
+# ─────────────────────────────
+# Columnas
+# ─────────────────────────────
+class _Columna:
+    """
+    Acumula un campo por lotes.
+
+    El buffer de un lote (a lo más 'lote' valores) se convierte de
+    una sola vez a un arreglo tipado y se descarta.
+    """
+
+    __slots__ = ("tipo", "lotes", "buffer", "codigos")
+
+    def __init__(self, tipo: str):
+        if tipo not in _DTYPES:
+            raise ValueError(f"Tipo de columna inválido: {tipo!r}")
+
+        self.tipo = tipo
+        self.lotes: List[np.ndarray] = []
+        self.buffer: list = []
+
+        # Solo "categoria": valor → código (diccionario de toda la columna)
+        self.codigos: Dict = {}
+
+    def cerrar_lote(self) -> None:
+        if self.buffer:
+            self.lotes.append(self._convertir(self.buffer))
+        self.buffer = []
+
+    def _convertir(self, valores: list) -> np.ndarray:
+        tipo = self.tipo
+
+        if tipo == "categoria":
+            locales, unicos = pd.factorize(
+                np.array(valores, dtype=object), use_na_sentinel=True
+            )
+            codigos = self.codigos
+            globales = np.array(
+                [codigos.setdefault(u, len(codigos)) for u in unicos],
+                dtype=np.int32,
+            )
+            if not len(globales):
+                return np.full(len(valores), -1, dtype=np.int32)
+            return np.where(locales < 0, -1, globales[locales]).astype(np.int32)
+
+        if tipo == "fecha":
+            # utc=True: fechas con zona (cliente tz_aware) → UTC naive
+            return (
+                pd.to_datetime(valores, errors="coerce", utc=True)
+                .tz_localize(None)
+                .as_unit("ms")
+                .to_numpy()
+            )
+
+        if tipo == "objeto":
+            arr = np.empty(len(valores), dtype=object)
+            arr[:] = valores
+            return arr
+
+        try:
+            arr = np.array(valores, dtype=_DTYPES[tipo])
+        except TypeError:
+            arr = np.array([v or 0 for v in valores], dtype=_DTYPES[tipo])
+
+        if tipo == "float64":
+            arr[np.isnan(arr)] = 0.0
+
+        return arr
+
+    def arreglo(self):
+        if self.lotes:
+            datos = (
+                self.lotes[0]
+                if len(self.lotes) == 1
+                else np.concatenate(self.lotes)
+            )
+        else:
+            datos = np.empty(0, dtype=_DTYPES[self.tipo])
+
+        if self.tipo == "categoria":
+            return pd.Categorical.from_codes(
+                datos,
+                categories=pd.Index(list(self.codigos), dtype=object),
+            )
+
+        return datos
+
+
+def _volcar(docs: list, columnas: Dict[str, _Columna]) -> None:
+    """
+    Pasa un lote de documentos a las columnas (una lista por campo,
+    convertida enseguida a arreglo tipado).
+    """
+    if not docs:
+        return
+
+    for nombre, col in columnas.items():
+        col.buffer = [d.get(nombre) for d in docs]
+        col.cerrar_lote()
+
+
+# ─────────────────────────────
+# API pública
+# ─────────────────────────────
+def leer_columnar(
+    documentos: Iterable,
+    esquema: Dict[str, str],
+    *,
+    lote: int = LOTE_DEFAULT,
+) -> pd.DataFrame:
+    """
+    Consume 'documentos' (cursor o cualquier iterable de mappings)
+    y devuelve un DataFrame con las columnas de 'esquema'.
+
+    esquema: { columna: tipo } (ver tipos en el docstring del módulo)
+    Campos ausentes en un documento se tratan como None.
+
+    Sin documentos → DataFrame vacío con las columnas y dtypes.
+    """
+    columnas = {nombre: _Columna(tipo) for nombre, tipo in esquema.items()}
+
+    lote_docs: list = []
+    for doc in documentos:
+        lote_docs.append(doc)
+
+        if len(lote_docs) == lote:
+            _volcar(lote_docs, columnas)
+            lote_docs = []
+
+    _volcar(lote_docs, columnas)
+
+    return pd.DataFrame(
+        {nombre: col.arreglo() for nombre, col in columnas.items()},
+        copy=False,
+    )
+
+
+def aggregate_columnar(
+    coleccion,
+    pipeline: list,
+    esquema: Dict[str, str],
+    *,
+    lote: int = LOTE_DEFAULT,
+    raw_bson: bool = False,
+) -> pd.DataFrame:
+    """
+    Ejecuta 'pipeline' sobre 'coleccion' e ingiere el cursor
+    con leer_columnar (batchSize = lote).
+
+    raw_bson=True pide los documentos como RawBSONDocument:
+    PyMongo no construye un dict por documento al recibir el lote.
+    """
+    if raw_bson and RawBSONDocument is not None:
+        coleccion = coleccion.with_options(
+            codec_options=CodecOptions(
+                document_class=RawBSONDocument,
+                tz_aware=coleccion.codec_options.tz_aware,
+            )
+        )
+
+    cursor = coleccion.aggregate(pipeline, batchSize=lote)
+
+    try:
+        return leer_columnar(cursor, esquema, lote=lote)
+    finally:
+        cursor.close()
@@ -7,33 +7,216 @@ REGLAS CLAVE:
 - El service NO calcula importes, solo agrega
 - Soporta fecha como Date o String (normalización interna)
 - El casteo de ObjectId SIEMPRE se hace en Python
+- El primer $match SIEMPRE va sobre campos indexados (fecha / fecha_dt)
 """
+from datetime import datetime, timedelta
+
+
+# Campo sombra escrito por scripts/migrar_fechas.py --shadow
+FECHA_SHADOW = "fecha_dt"
+
 
 # ─────────────────────────────────────────────
-# DETALLE ANALÍTICO (BASE DE REPORTES)
+# FILTRO DE FECHA (INDEX-FRIENDLY)
 # ─────────────────────────────────────────────
-def pipeline_devoluciones_detalle(filtros: dict) -> list:
-    filtro_fecha = filtros.get("fecha", {})
+def _prefiltro_fecha(filtro_fecha: dict) -> dict:
+    """
+    $match inicial que SÍ usa índices.
 
-    return [
-        # 1️⃣ Normalizar fecha
+    Cubre las tres formas en que puede venir la fecha:
+    - fecha como Date (IXSCAN sobre 'fecha')
+    - fecha_dt como Date (campo sombra migrado)
+    - fecha como String ISO (IXSCAN por rango de strings)
+
+    El rango de strings se amplía un día por lado para no perder
+    fechas con offset de zona horaria; el filtro exacto se aplica
+    después sobre '__fecha'.
+    """
+    return {
+        "$match": {
+            "$or": [
+                {"fecha": filtro_fecha},
+                {FECHA_SHADOW: filtro_fecha},
+                _rango_texto(filtro_fecha),
+            ]
+        }
+    }
+
+
+def _rango_texto(filtro_fecha: dict) -> dict:
+    """
+    Rama del prefiltro para 'fecha' guardada como String ISO
+    (un día extra por lado; sin límites → cualquier String).
+    """
+    inicio = filtro_fecha.get("$gte", filtro_fecha.get("$gt"))
+    fin = filtro_fecha.get("$lte", filtro_fecha.get("$lt"))
+
+    if isinstance(inicio, datetime) and isinstance(fin, datetime):
+        return {
+            "fecha": {
+                "$gte": (inicio - timedelta(days=1)).strftime("%Y-%m-%d"),
+                "$lt": (fin + timedelta(days=2)).strftime("%Y-%m-%d"),
+            }
+        }
+
+    return {"fecha": {"$type": "string"}}
+
+
+def filtro_fechas_texto(filtros: dict) -> dict:
+    """
+    Filtro find() de devoluciones del rango que aún guardan 'fecha'
+    como String (sin migrar, o migradas con --shadow). Usa el
+    índice de 'fecha'.
+    """
+    return _rango_texto(filtros.get("fecha", {}))
+
+
+def _etapas_fecha(filtro_fecha: dict) -> list:
+    """
+    Etapas comunes de filtrado por fecha:
+    1. Prefiltro indexado
+    2. Normalización a '__fecha' (solo sobre documentos ya filtrados)
+    3. Match exacto sobre '__fecha'
+    """
+    etapas = []
+
+    if filtro_fecha:
+        etapas.append(_prefiltro_fecha(filtro_fecha))
+
+    etapas += [
         {
             "$addFields": {
                 "__fecha": {
-                    "$cond": [
-                        {"$eq": [{"$type": "$fecha"}, "date"]},
-                        "$fecha",
-                        {"$dateFromString": {"dateString": "$fecha"}}
+                    "$ifNull": [
+                        f"${FECHA_SHADOW}",
+                        {
+                            "$cond": [
+                                {"$eq": [{"$type": "$fecha"}, "date"]},
+                                "$fecha",
+                                {"$dateFromString": {"dateString": "$fecha"}}
+                            ]
+                        }
                     ]
                 }
             }
         },
-
-        # 2️⃣ Match por fecha
         {"$match": {"__fecha": filtro_fecha}},
+    ]
+
+    return etapas
+
+
+def _dia(campo: str) -> dict:
+    """
+    Día (Date a medianoche) de un campo fecha.
+    """
+    return {
+        "$dateFromParts": {
+            "year": {"$year": campo},
+            "month": {"$month": campo},
+            "day": {"$dayOfMonth": campo},
+        }
+    }
 
-        # 3️⃣ Total piezas
+
+# ─────────────────────────────────────────────
+# MARCA DE AGUA POR DÍA
+# ─────────────────────────────────────────────
+def pipeline_marcas_por_dia(filtros: dict, normalizar_fecha: bool = False) -> list:
+    """
+    Marca de agua de cada día del rango: total y max _id.
+    Cambia al insertar (back-fill) o borrar devoluciones de ese día.
+
+    normalizar_fecha=False → solo 'fecha' Date: se resuelve con el
+    índice (fecha, _id) sin leer documentos. Usarlo solo si en el
+    rango no quedan fechas String (ver filtro_fechas_texto).
+    """
+    filtro_fecha = filtros.get("fecha", {})
+
+    if normalizar_fecha:
+        etapas = _etapas_fecha(filtro_fecha)
+        campo = "$__fecha"
+    else:
+        etapas = [{"$match": {"fecha": filtro_fecha}}] if filtro_fecha else []
+        campo = "$fecha"
+
+    return [
+        *etapas,
         {
+            "$group": {
+                "_id": _dia(campo),
+                "n": {"$sum": 1},
+                "ultimo": {"$max": "$_id"},
+            }
+        },
+        {"$sort": {"_id": 1}},
+    ]
+
+
+# ─────────────────────────────────────────────
+# DETALLE ANALÍTICO (BASE DE REPORTES)
+# ─────────────────────────────────────────────
+# Medidas que proyectan detalle / rollup.
+# 'devoluciones' es un literal y siempre se incluye.
+MEDIDAS = ("piezas", "importe", "devoluciones")
+
+
+def _medidas(medidas) -> tuple:
+    if medidas is None:
+        return MEDIDAS
+    return tuple(m for m in MEDIDAS if m in medidas or m == "devoluciones")
+
+
+def pipeline_devoluciones_detalle(filtros: dict, medidas=None) -> list:
+    """
+    medidas: subconjunto de MEDIDAS a proyectar (None = todas).
+    Las medidas omitidas no se calculan en Mongo.
+    """
+    filtro_fecha = filtros.get("fecha", {})
+    medidas = _medidas(medidas)
+
+    # Dimensiones sin null: zona faltante → '' (el mismo valor que le
+    # da normalizar_tipos) para que ordene y compare como String
+    # (cursores keyset de la tabla)
+    proyeccion = {
+        "_id": 0,
+        "fecha": "$__fecha",
+        "zona": {"$ifNull": ["$zona", ""]},
+        "pasillo": {"$ifNull": ["$items.pasillo", "—"]},
+    }
+
+    if "piezas" in medidas:
+        proyeccion["piezas"] = {"$toInt": {"$ifNull": ["$items.cantidad", 0]}}
+
+    if "importe" in medidas:
+        proyeccion["importe"] = {
+            "$cond": [
+                {"$gt": ["$total_piezas", 0]},
+                {
+                    "$multiply": [
+                        {
+                            "$divide": [
+                                {"$toDouble": {"$ifNull": ["$items.cantidad", 0]}},
+                                {"$toDouble": "$total_piezas"}
+                            ]
+                        },
+                        {"$toDouble": {"$ifNull": ["$total", 0]}}
+                    ]
+                },
+                0.0
+            ]
+        }
+
+    proyeccion["devoluciones"] = {"$literal": 1}
+
+    etapas = [
+        # 1️⃣ Match indexado + normalización de fecha
+        *_etapas_fecha(filtro_fecha),
+    ]
+
+    # 2️⃣ Total piezas (solo lo usa el prorrateo de importe)
+    if "importe" in medidas:
+        etapas.append({
             "$addFields": {
                 "total_piezas": {
                     "$sum": {
@@ -45,63 +228,144 @@ def pipeline_devoluciones_detalle(filtros: dict) -> list:
                     }
                 }
             }
-        },
+        })
+
+    return [
+        *etapas,
 
-        # 4️⃣ Unwind
+        # 3️⃣ Unwind
         {"$unwind": "$items"},
 
-        # 5️⃣ Proyección
+        # 4️⃣ Proyección
+        {"$project": proyeccion},
+    ]
+
+
+# ─────────────────────────────────────────────
+# ROLLUP DIARIO (CUBO DÍA × ZONA × PASILLO)
+# ─────────────────────────────────────────────
+def _etapas_rollup(medidas=None) -> list:
+    """
+    $group del detalle por (día, zona, pasillo).
+    Deja la clave compuesta en _id.
+    """
+    medidas = _medidas(medidas)
+
+    return [
+        {
+            "$group": {
+                "_id": {
+                    "fecha": _dia("$fecha"),
+                    "zona": "$zona",
+                    "pasillo": "$pasillo",
+                },
+                **{m: {"$sum": f"${m}"} for m in medidas},
+            }
+        },
+    ]
+
+
+def pipeline_devoluciones_rollup(filtros: dict, medidas=None) -> list:
+    """
+    Mismo cálculo que el detalle, pero agrupado DENTRO de Mongo.
+
+    Devuelve UNA FILA POR (día, zona, pasillo) con las mismas
+    columnas que el detalle, así que el service lo consume igual.
+    'devoluciones' suma 1 por artículo, igual que el detalle.
+    """
+    return [
+        *pipeline_devoluciones_detalle(filtros, medidas),
+        *_etapas_rollup(medidas),
+
         {
             "$project": {
                 "_id": 0,
-                "fecha": "$__fecha",
-                "zona": 1,
-                "pasillo": {"$ifNull": ["$items.pasillo", "—"]},
-                "piezas": {"$toInt": {"$ifNull": ["$items.cantidad", 0]}},
-                "importe": {
-                    "$cond": [
-                        {"$gt": ["$total_piezas", 0]},
-                        {
-                            "$multiply": [
-                                {
-                                    "$divide": [
-                                        {"$toDouble": {"$ifNull": ["$items.cantidad", 0]}},
-                                        {"$toDouble": "$total_piezas"}
-                                    ]
-                                },
-                                {"$toDouble": {"$ifNull": ["$total", 0]}}
-                            ]
-                        },
-                        0.0
-                    ]
-                },
-                "devoluciones": {"$literal": 1}
+                "fecha": "$_id.fecha",
+                "zona": "$_id.zona",
+                "pasillo": "$_id.pasillo",
+                **{m: 1 for m in _medidas(medidas)},
             }
-        }
+        },
+
+        {"$sort": {"fecha": 1, "zona": 1, "pasillo": 1}}
     ]
 
 
 # ─────────────────────────────────────────────
-# RESUMEN POR DEVOLUCIÓN
+# ROLLUP MATERIALIZADO (devoluciones_rollup_diario)
 # ─────────────────────────────────────────────
-def pipeline_devoluciones_resumen(filtros: dict) -> list:
+def pipeline_rollup_diario_merge(
+    filtros: dict,
+    coleccion: str,
+    actualizado,
+) -> list:
+    """
+    Construye el rollup diario de la ventana y lo escribe con $merge.
+
+    - _id = {fecha, zona, pasillo} → re-ejecutable (reemplaza)
+    - 'actualizado' marca la corrida, para purgar claves que ya
+      no existan en la ventana
+    """
+    return [
+        *pipeline_devoluciones_detalle(filtros),
+        *_etapas_rollup(),
+
+        {
+            "$project": {
+                "_id": 1,
+                "fecha": "$_id.fecha",
+                "zona": "$_id.zona",
+                "pasillo": "$_id.pasillo",
+                "piezas": 1,
+                "importe": 1,
+                "devoluciones": 1,
+                "actualizado": {"$literal": actualizado},
+            }
+        },
+
+        {
+            "$merge": {
+                "into": coleccion,
+                "on": "_id",
+                "whenMatched": "replace",
+                "whenNotMatched": "insert",
+            }
+        }
+    ]
+
+
+def pipeline_rollup_diario_lectura(filtros: dict) -> list:
+    """
+    Lee el rollup materializado (mismas columnas que el detalle).
+    'fecha' ya es Date y está indexada.
+    """
     filtro_fecha = filtros.get("fecha", {})
 
     return [
+        {"$match": {"fecha": filtro_fecha}},
         {
-            "$addFields": {
-                "__fecha": {
-                    "$cond": [
-                        {"$eq": [{"$type": "$fecha"}, "date"]},
-                        "$fecha",
-                        {"$dateFromString": {"dateString": "$fecha"}}
-                    ]
-                }
+            "$project": {
+                "_id": 0,
+                "fecha": 1,
+                "zona": 1,
+                "pasillo": 1,
+                "piezas": 1,
+                "importe": 1,
+                "devoluciones": 1,
             }
         },
+        {"$sort": {"fecha": 1, "zona": 1, "pasillo": 1}}
+    ]
 
-        {"$match": {"__fecha": filtro_fecha}},
 
+# ─────────────────────────────────────────────
+# RESUMEN POR DEVOLUCIÓN
+# ─────────────────────────────────────────────
+def _etapas_resumen() -> list:
+    """
+    Proyección del resumen (requiere '__fecha' ya calculado).
+    """
+    return [
         {
             "$addFields": {
                 "pasillos": {
@@ -144,11 +408,122 @@ def pipeline_devoluciones_resumen(filtros: dict) -> list:
                 "total": {"$toDouble": {"$ifNull": ["$total", 0]}}
             }
         },
+    ]
+
+
+def pipeline_devoluciones_resumen(filtros: dict) -> list:
+    filtro_fecha = filtros.get("fecha", {})
 
+    return [
+        *_etapas_fecha(filtro_fecha),
+        *_etapas_resumen(),
         {"$sort": {"fecha": -1}}
     ]
 
 
+# ─────────────────────────────────────────────
+# RESUMEN PAGINADO (KEYSET fecha DESC, folio DESC)
+# ─────────────────────────────────────────────
+def pipeline_devoluciones_resumen_pagina(
+    filtros: dict,
+    cursor: dict | None = None,
+    limite: int = 50,
+    normalizar_fecha: bool = False,
+) -> list:
+    """
+    Una página del resumen, ordenada por (fecha, folio) descendente.
+
+    - cursor: {"fecha": datetime, "folio": ...} de la última fila
+      de la página anterior
+    - normalizar_fecha=False: $match + $sort + $limit van PRIMERO
+      sobre 'fecha' / 'folio' crudos → los resuelve el índice
+      {fecha: -1, folio: -1} sin ordenar en memoria. Solo es
+      correcto si en el rango no quedan fechas String
+      (ver filtro_fechas_texto)
+    - normalizar_fecha=True: mismo prefiltro que el resumen sin
+      paginar (Date, String y 'fecha_dt'); ordena '__fecha' en
+      memoria (top-k acotado por 'limite')
+    """
+    filtro_fecha = filtros.get("fecha", {})
+    campo = "__fecha" if normalizar_fecha else "fecha"
+
+    condiciones = [{campo: filtro_fecha}]
+
+    if cursor:
+        condiciones.append({
+            "$or": [
+                {campo: {"$lt": cursor["fecha"]}},
+                {campo: cursor["fecha"], "folio": {"$lt": cursor["folio"]}},
+            ]
+        })
+
+    if normalizar_fecha:
+        # _etapas_fecha ya filtra '__fecha' por el rango
+        return [
+            *_etapas_fecha(filtro_fecha),
+            *([{"$match": {"$and": condiciones[1:]}}] if cursor else []),
+            {"$sort": {"__fecha": -1, "folio": -1}},
+            {"$limit": limite},
+            *_etapas_resumen(),
+        ]
+
+    return [
+        {"$match": {"$and": condiciones}},
+        {"$sort": {"fecha": -1, "folio": -1}},
+        {"$limit": limite},
+        {"$addFields": {"__fecha": "$fecha"}},
+        *_etapas_resumen(),
+    ]
+
+
+# ─────────────────────────────────────────────
+# TABLA PAGINADA (KEYSET fecha, zona, pasillo ASC)
+# ─────────────────────────────────────────────
+def pipeline_tabla_pagina(
+    filtros: dict,
+    cursor: dict | None = None,
+    limite: int = 200,
+) -> list:
+    """
+    Una página de la tabla detalle al grano (día, zona, pasillo).
+
+    - filtros: una VENTANA acotada de días; el service la amplía
+      hasta juntar 'limite' filas (ReportesService.tabla_pagina),
+      así cada consulta agrupa solo esa ventana y no el resto
+      del rango
+    - cursor: {"fecha", "zona", "pasillo"} de la última fila
+      de la página anterior
+    - Con cursor, la ventana se recorta desde el día del cursor
+    """
+    filtro_fecha = dict(filtros.get("fecha", {}))
+    etapas_cursor = []
+
+    if cursor:
+        inicio = filtro_fecha.get("$gte")
+        if inicio is None or cursor["fecha"] > inicio:
+            filtro_fecha["$gte"] = cursor["fecha"]
+
+        etapas_cursor.append({
+            "$match": {
+                "$or": [
+                    {"fecha": {"$gt": cursor["fecha"]}},
+                    {"fecha": cursor["fecha"], "zona": {"$gt": cursor["zona"]}},
+                    {
+                        "fecha": cursor["fecha"],
+                        "zona": cursor["zona"],
+                        "pasillo": {"$gt": cursor["pasillo"]},
+                    },
+                ]
+            }
+        })
+
+    return [
+        *pipeline_devoluciones_rollup({**filtros, "fecha": filtro_fecha}),
+        *etapas_cursor,
+        {"$limit": limite},
+    ]
+
+
 # ─────────────────────────────────────────────
 # ARTÍCULOS DE UNA DEVOLUCIÓN
 # ─────────────────────────────────────────────
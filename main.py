@@ -3,15 +3,27 @@ Punto de entrada del backend ReporteSurtido.
 
 RESPONSABILIDADES:
 - Crear la aplicación FastAPI
-- Configurar middlewares (CORS)
-- Registrar rutas de la API (solo reportes)
+- Configurar middlewares (CORS, métricas)
+- Registrar rutas de la API (reportes y admin)
+- Abrir / cerrar el pool de MongoDB (lifespan)
 - Exponer la app para Render / Uvicorn
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from api.routes import reportes
+from api.dependencies import (
+    get_reportes_cache,
+    get_cache_dias,
+    get_dimensiones,
+    get_cache_marcas,
+    get_monitor_consultas,
+)
+from api.metricas import MetricasMiddleware, metricas
+from api.routes import admin, reportes
+from db.factory import init_db, close_db, get_db
 
 
 # ─────────────────────────────────────────
@@ -35,6 +47,22 @@ else:
     ]
 
 
+# ─────────────────────────────────────────
+# LIFESPAN (POOL MONGO COMPARTIDO)
+# ─────────────────────────────────────────
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_db()
+    try:
+        yield
+    finally:
+        # Explains pendientes: se cancelan (no bloquean el apagado)
+        monitor = get_monitor_consultas()
+        if monitor is not None:
+            monitor.cerrar()
+        close_db()
+
+
 # ─────────────────────────────────────────
 # CREACIÓN DE LA APLICACIÓN
 # ─────────────────────────────────────────
@@ -43,6 +71,7 @@ def create_app() -> FastAPI:
         title="ReporteSurtido · Dashboard API",
         description="API de solo lectura para reportes y visualización de gráficas",
         version="2.0.0",
+        lifespan=lifespan,
     )
 
     # ─────────────────────────────────────────
@@ -56,6 +85,11 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # ─────────────────────────────────────────
+    # MÉTRICAS (latencia / bytes / en curso por endpoint)
+    # ─────────────────────────────────────────
+    app.add_middleware(MetricasMiddleware)
+
     # ─────────────────────────────────────────
     # REGISTRO DE RUTAS
     # ─────────────────────────────────────────
@@ -65,6 +99,12 @@ def create_app() -> FastAPI:
         tags=["Reportes"],
     )
 
+    app.include_router(
+        admin.router,
+        prefix="/api/admin",
+        tags=["Admin"],
+    )
+
     # ─────────────────────────────────────────
     # HEALTH CHECK
     # ─────────────────────────────────────────
@@ -75,6 +115,30 @@ def create_app() -> FastAPI:
             "mode": "local" if MODE == 0 else "render"
         }
 
+    @app.get("/api/health/db", tags=["Health"])
+    def health_db():
+        return {
+            "status": "ok",
+            "pool": get_db().pool_stats(),
+        }
+
+    @app.get("/api/metrics", tags=["Health"], include_in_schema=False)
+    def metrics():
+        return metricas()
+
+    @app.get("/api/health/cache", tags=["Health"])
+    def health_cache():
+        cache = get_reportes_cache()
+        cache_dias = get_cache_dias()
+        marcas = get_cache_marcas()
+        return {
+            "status": "ok" if cache or cache_dias else "disabled",
+            "cache": cache.stats() if cache else None,
+            "dias": cache_dias.stats() if cache_dias else None,
+            "dimensiones": get_dimensiones().stats(),
+            "marcas": marcas.stats() if marcas else None,
+        }
+
     return app
 
 
@@ -0,0 +1,196 @@
+"""
+Benchmark offline de ReportesService.generar (sin Mongo).
+
+OBJETIVO:
+- Medir cada optimización con datos sintéticos reproducibles
+- Tiempo de pared y pico de memoria POR ETAPA del pipeline
+  (carga, dataframe, normalización, cubo, cada sección)
+
+FUNCIONAMIENTO:
+- Genera devoluciones / artículos / personal / asignaciones
+  (db/memoria/sinteticos.py) para cada tamaño pedido
+- Las consultas las resuelve el backend en memoria
+  (ReportesAccessMemoria, sin red)
+- Cada etapa se mide envolviendo las funciones que usa el service
+- Tiempo: mejor de N repeticiones (sin tracemalloc)
+- Memoria: una corrida aparte con tracemalloc (pico por etapa)
+
+USO:
+    python -m scripts.benchmark_reportes
+    python -m scripts.benchmark_reportes --filas 10000,100000 --repeticiones 5
+    python -m scripts.benchmark_reportes --modo rollup --json bench.json
+"""
+
+import argparse
+import functools
+import json
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import date, timedelta
+
+import services.reportes.service as service_mod
+from db.memoria import MemoriaProvider, ReportesAccessMemoria, generar_datos
+from services.reportes.service import ReportesService
+
+
+AGRUPAR = ["Dia", "Semana", "Mes", "Anio"]
+
+# Funciones del service que se miden como etapas
+ETAPAS = [
+    "cargar_en_paralelo",
+    "obtener_dataframe",
+    "normalizar_dataframe",
+    "construir_cubo",
+    "calcular_kpis_globales",
+    "generar_serie",
+    "agrupa_por_zona",
+    "agrupa_por_pasillo",
+    "agrupar_por_persona",
+    "agrupar_personas_por_fecha",
+    "tabla_final",
+]
+
+
+# ─────────────────────────────────────────────
+# MEDICIÓN POR ETAPA
+# ─────────────────────────────────────────────
+class Medidor:
+    """
+    Envuelve las funciones de ETAPAS dentro del módulo del service.
+    """
+
+    def __init__(self):
+        self.tiempos = defaultdict(float)
+        self.picos = defaultdict(int)
+        self._originales = {}
+
+    def __enter__(self):
+        for nombre in ETAPAS:
+            original = getattr(service_mod, nombre)
+            self._originales[nombre] = original
+            setattr(service_mod, nombre, self._envolver(nombre, original))
+        return self
+
+    def __exit__(self, *exc):
+        for nombre, original in self._originales.items():
+            setattr(service_mod, nombre, original)
+
+    def reiniciar(self):
+        self.tiempos.clear()
+        self.picos.clear()
+
+    def _envolver(self, nombre, fn):
+        @functools.wraps(fn)
+        def medido(*args, **kwargs):
+            memoria = tracemalloc.is_tracing()
+            if memoria:
+                tracemalloc.reset_peak()
+
+            inicio = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.tiempos[nombre] += time.perf_counter() - inicio
+                if memoria:
+                    self.picos[nombre] = max(
+                        self.picos[nombre],
+                        tracemalloc.get_traced_memory()[1],
+                    )
+
+        return medido
+
+
+def medir(service, desde, hasta, agrupar, repeticiones: int) -> dict:
+    """
+    Corre generar() y devuelve tiempos (mejor corrida) y picos.
+    """
+    mejor = None
+
+    with Medidor() as medidor:
+        for _ in range(repeticiones):
+            medidor.reiniciar()
+            inicio = time.perf_counter()
+            service.generar(desde, hasta, agrupar)
+            total = time.perf_counter() - inicio
+
+            if mejor is None or total < mejor["total_s"]:
+                mejor = {"total_s": total, "etapas_s": dict(medidor.tiempos)}
+
+        medidor.reiniciar()
+        tracemalloc.start()
+        try:
+            service.generar(desde, hasta, agrupar)
+            pico_total = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    mejor["pico_total_mib"] = max([pico_total, *medidor.picos.values()]) / 2**20
+    mejor["etapas_pico_mib"] = {k: v / 2**20 for k, v in medidor.picos.items()}
+    return mejor
+
+
+# ─────────────────────────────────────────────
+# REPORTE
+# ─────────────────────────────────────────────
+def imprimir(filas: int, agrupar: str, r: dict) -> None:
+    print(
+        f"\n▶ {filas:,} artículos | {agrupar}: "
+        f"{r['total_s'] * 1000:,.1f} ms | pico {r['pico_total_mib']:,.1f} MiB"
+    )
+    for etapa in ETAPAS:
+        if etapa not in r["etapas_s"]:
+            continue
+        print(
+            f"    {etapa:<28} {r['etapas_s'][etapa] * 1000:>10,.1f} ms"
+            f" {r['etapas_pico_mib'].get(etapa, 0):>10,.1f} MiB"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark offline de ReportesService.generar"
+    )
+    parser.add_argument(
+        "--filas",
+        default="10000,100000,1000000",
+        help="Tamaños (artículos) separados por coma",
+    )
+    parser.add_argument("--dias", type=int, default=365)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--modo", choices=ReportesService.MODOS[:2], default="detalle")
+    parser.add_argument("--agrupar", default=",".join(AGRUPAR))
+    parser.add_argument("--json", default=None, help="Guardar resultados en JSON")
+
+    args = parser.parse_args()
+
+    desde = date(2025, 1, 1)
+    hasta = desde + timedelta(days=args.dias - 1)
+
+    resultados = []
+
+    for filas in [int(f) for f in args.filas.split(",") if f.strip()]:
+        inicio = time.perf_counter()
+        datos = generar_datos(filas, desde=desde, dias=args.dias)
+        queries = ReportesAccessMemoria(MemoriaProvider(datos))
+        print(
+            f"\n🧪 {filas:,} artículos / {len(datos['devoluciones']['fecha']):,} "
+            f"devoluciones generados en {time.perf_counter() - inicio:,.1f} s"
+        )
+
+        # Sin caches: cada corrida mide el cálculo completo
+        service = ReportesService(queries, modo=args.modo)
+
+        for agrupar in args.agrupar.split(","):
+            r = medir(service, desde, hasta, agrupar, args.repeticiones)
+            imprimir(filas, agrupar, r)
+            resultados.append({"filas": filas, "agrupar": agrupar, "modo": args.modo, **r})
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(resultados, f, indent=2)
+        print(f"\n💾 Resultados en {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Construye / actualiza la colección devoluciones_rollup_diario.
+
+OBJETIVO:
+- Agregar devoluciones por (día, zona, pasillo) con $merge
+- Re-ejecutable sobre cualquier ventana de fechas (incremental)
+- Servir reportes multi-mes / anuales sin $unwind de cada devolución
+
+FUNCIONAMIENTO:
+- Procesa la ventana en bloques de N días
+- Cada bloque hace $merge (replace por _id = {fecha, zona, pasillo})
+- Después purga las claves del bloque que no se tocaron en esta
+  corrida (por ejemplo, devoluciones borradas o movidas de pasillo)
+- Registra en devoluciones_rollup_estado la MARCA (total, max _id)
+  con la que se construyó cada día cerrado, leída ANTES del $merge;
+  el modo "materializado" solo lee del rollup los días cuya marca
+  sigue igual y agrupa en vivo el resto (hoy, días sin construir,
+  back-fills posteriores)
+
+USO:
+    python -m scripts.construir_rollup                       # últimos 3 días
+    python -m scripts.construir_rollup --dias 30
+    python -m scripts.construir_rollup --desde 2024-01-01 --hasta 2025-12-31
+"""
+
+import argparse
+from datetime import date, datetime, timedelta
+
+from pymongo import ReplaceOne
+
+from db.factory import get_db, close_db
+from db.mongo.collections import DEVOLUCIONES, ROLLUP_DIARIO, ROLLUP_ESTADO
+from db.mongo.reportes.access import MARCA_DIA_VACIO
+from db.mongo.reportes.pipelines import (
+    pipeline_marcas_por_dia,
+    pipeline_rollup_diario_merge,
+)
+from db.mongo.reportes.predicates import rango_fechas
+
+
+# ─────────────────────────────────────────────
+# HELPERS
+# ─────────────────────────────────────────────
+def bloques(desde: date, hasta: date, tam: int):
+    """
+    Divide [desde, hasta] en bloques de `tam` días.
+    """
+    inicio = desde
+    while inicio <= hasta:
+        fin = min(inicio + timedelta(days=tam - 1), hasta)
+        yield inicio, fin
+        inicio = fin + timedelta(days=1)
+
+
+def leer_marcas(devoluciones, filtros: dict) -> dict:
+    """
+    { día: (total, max _id) } de las devoluciones del bloque
+    (fechas Date o String).
+    """
+    return {
+        d["_id"].date(): (d["n"], str(d["ultimo"]))
+        for d in devoluciones.aggregate(
+            pipeline_marcas_por_dia(filtros, normalizar_fecha=True)
+        )
+    }
+
+
+def registrar_marcas(estado, desde: date, hasta: date, marcas: dict, corrida) -> int:
+    """
+    Guarda la marca de cada día construido de [desde, hasta].
+
+    Solo cuentan los días cerrados (< hoy): hoy sigue recibiendo
+    devoluciones y se agrupa siempre en vivo. Un día sin
+    devoluciones se guarda con MARCA_DIA_VACIO.
+    """
+    hasta = min(hasta, date.today() - timedelta(days=1))
+
+    operaciones = []
+    for d, _ in bloques(desde, hasta, 1):
+        n, ultimo = marcas.get(d, MARCA_DIA_VACIO)
+        operaciones.append(
+            ReplaceOne(
+                {"_id": datetime.combine(d, datetime.min.time())},
+                {"n": n, "ultimo": ultimo, "actualizado": corrida},
+                upsert=True,
+            )
+        )
+
+    if operaciones:
+        estado.bulk_write(operaciones, ordered=False)
+
+    return len(operaciones)
+
+
+# ─────────────────────────────────────────────
+# CONSTRUCCIÓN
+# ─────────────────────────────────────────────
+def construir(desde: date, hasta: date, *, bloque_dias: int = 31) -> None:
+    provider = get_db()
+    devoluciones = provider.get_collection(DEVOLUCIONES)
+    rollup = provider.get_collection(ROLLUP_DIARIO)
+    estado = provider.get_collection(ROLLUP_ESTADO)
+
+    rollup.create_index("fecha")
+    rollup.create_index("actualizado")
+
+    corrida = datetime.utcnow().replace(microsecond=0)
+
+    print(f"\n🧮 Rollup diario {desde} → {hasta} (bloques de {bloque_dias} días)")
+
+    for d1, d2 in bloques(desde, hasta, bloque_dias):
+        filtros = rango_fechas(d1, d2)
+
+        # Marca ANTES del $merge: un back-fill concurrente deja la
+        # marca vieja y el día se agrupa en vivo hasta la próxima corrida
+        marcas = leer_marcas(devoluciones, filtros)
+
+        devoluciones.aggregate(
+            pipeline_rollup_diario_merge(filtros, ROLLUP_DIARIO, corrida)
+        )
+
+        purgados = rollup.delete_many({
+            **filtros,
+            "actualizado": {"$lt": corrida},
+        }).deleted_count
+
+        escritos = rollup.count_documents({
+            **filtros,
+            "actualizado": corrida,
+        })
+
+        # Solo tras el $merge y la purga del bloque (una corrida
+        # cortada no deja días a medias como construidos)
+        dias = registrar_marcas(estado, d1, d2, marcas, corrida)
+
+        print(
+            f"  · {d1} → {d2}: {escritos} claves, {purgados} purgadas, "
+            f"{dias} días registrados"
+        )
+
+    print("✅ Rollup actualizado\n")
+
+
+# ─────────────────────────────────────────────
+# MAIN
+# ─────────────────────────────────────────────
+def main():
+    parser = argparse.ArgumentParser(
+        description="Construye devoluciones_rollup_diario con $merge"
+    )
+    parser.add_argument("--desde", type=date.fromisoformat, default=None)
+    parser.add_argument("--hasta", type=date.fromisoformat, default=None)
+    parser.add_argument(
+        "--dias",
+        type=int,
+        default=3,
+        help="Si no hay --desde: reconstruye los últimos N días",
+    )
+    parser.add_argument("--bloque-dias", type=int, default=31)
+
+    args = parser.parse_args()
+
+    hasta = args.hasta or date.today()
+    desde = args.desde or (hasta - timedelta(days=args.dias - 1))
+
+    if desde > hasta:
+        parser.error("--desde no puede ser mayor que --hasta")
+
+    try:
+        construir(desde, hasta, bloque_dias=args.bloque_dias)
+    finally:
+        close_db()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Migración de fechas en devoluciones (String → BSON Date).
+
+OBJETIVO:
+- Convertir 'fecha' guardada como String ISO a Date real
+- Permitir que el $match inicial de los pipelines use el índice 'fecha'
+
+MODOS:
+- En sitio (default): reescribe 'fecha' como Date
+- Sombra (--shadow): escribe 'fecha_dt' y deja 'fecha' intacto,
+  para que clientes legacy sigan leyendo el String original
+
+CARACTERÍSTICAS:
+- Procesa por lotes con bulk_write (ordered=False)
+- Reanudable: solo toma documentos pendientes y avanza por _id;
+  con --checkpoint guarda el último _id procesado
+- Idempotente: cada update exige que 'fecha' siga siendo el String leído
+
+USO:
+    python -m scripts.migrar_fechas --batch 2000
+    python -m scripts.migrar_fechas --shadow --checkpoint .migracion_fechas
+    python -m scripts.migrar_fechas --dry-run
+"""
+
+import argparse
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from db.factory import get_db, close_db
+from db.mongo.collections import DEVOLUCIONES
+from db.mongo.reportes.pipelines import FECHA_SHADOW
+
+
+# ─────────────────────────────────────────────
+# HELPERS
+# ─────────────────────────────────────────────
+def parsear_fecha(valor: str) -> datetime | None:
+    """
+    Convierte un String ISO a datetime naive en UTC
+    (misma convención con la que Mongo guarda Dates).
+    """
+    try:
+        dt = datetime.fromisoformat(valor.strip())
+    except (AttributeError, ValueError):
+        return None
+
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return dt
+
+
+def leer_checkpoint(path: Path | None):
+    if not path or not path.exists():
+        return None
+
+    ultimo = json.loads(path.read_text()).get("ultimo_id")
+
+    if ultimo and ObjectId.is_valid(ultimo):
+        return ObjectId(ultimo)
+
+    return ultimo
+
+
+def guardar_checkpoint(path: Path | None, ultimo_id) -> None:
+    if not path:
+        return
+
+    path.write_text(json.dumps({"ultimo_id": str(ultimo_id)}))
+
+
+def filtro_pendientes(shadow: bool, ultimo_id) -> dict:
+    query = {"fecha": {"$type": "string"}}
+
+    if shadow:
+        query[FECHA_SHADOW] = {"$exists": False}
+
+    if ultimo_id is not None:
+        query["_id"] = {"$gt": ultimo_id}
+
+    return query
+
+
+# ─────────────────────────────────────────────
+# MIGRACIÓN
+# ─────────────────────────────────────────────
+def migrar(
+    *,
+    batch: int = 1000,
+    shadow: bool = False,
+    dry_run: bool = False,
+    checkpoint: Path | None = None,
+) -> dict:
+    col = get_db().get_collection(DEVOLUCIONES)
+    destino = FECHA_SHADOW if shadow else "fecha"
+
+    ultimo_id = leer_checkpoint(checkpoint)
+
+    stats = {
+        "leidos": 0,
+        "actualizados": 0,
+        "invalidos": 0,
+    }
+
+    print(f"\n🗓️  Migrando 'fecha' → '{destino}' (lotes de {batch})")
+    if ultimo_id is not None:
+        print(f"↪️  Reanudando después de _id={ultimo_id}")
+
+    while True:
+        docs = list(
+            col.find(
+                filtro_pendientes(shadow, ultimo_id),
+                {"_id": 1, "fecha": 1},
+            )
+            .sort("_id", 1)
+            .limit(batch)
+        )
+
+        if not docs:
+            break
+
+        ops = []
+
+        for d in docs:
+            stats["leidos"] += 1
+            dt = parsear_fecha(d["fecha"])
+
+            if dt is None:
+                stats["invalidos"] += 1
+                continue
+
+            ops.append(
+                UpdateOne(
+                    {"_id": d["_id"], "fecha": d["fecha"]},
+                    {"$set": {destino: dt}},
+                )
+            )
+
+        if ops and not dry_run:
+            res = col.bulk_write(ops, ordered=False)
+            stats["actualizados"] += res.modified_count
+        elif dry_run:
+            stats["actualizados"] += len(ops)
+
+        ultimo_id = docs[-1]["_id"]
+
+        if not dry_run:
+            guardar_checkpoint(checkpoint, ultimo_id)
+
+        print(
+            f"  · leídos={stats['leidos']} "
+            f"actualizados={stats['actualizados']} "
+            f"inválidos={stats['invalidos']} "
+            f"(último _id={ultimo_id})"
+        )
+
+    print("✅ Migración terminada\n")
+    return stats
+
+
+# ─────────────────────────────────────────────
+# MAIN
+# ─────────────────────────────────────────────
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convierte 'fecha' String → Date en devoluciones"
+    )
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument(
+        "--shadow",
+        action="store_true",
+        help=f"Escribe en '{FECHA_SHADOW}' en lugar de reescribir 'fecha'",
+    )
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        default=None,
+        help="Archivo donde guardar / leer el último _id procesado",
+    )
+
+    args = parser.parse_args()
+
+    try:
+        migrar(
+            batch=args.batch,
+            shadow=args.shadow,
+            dry_run=args.dry_run,
+            checkpoint=args.checkpoint,
+        )
+    finally:
+        close_db()
+
+
+if __name__ == "__main__":
+    main()
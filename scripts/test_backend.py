@@ -10,15 +10,15 @@ NO:
 - Modifica BD
 - Crea registros
 - Usa mocks
+
+Para medir rendimiento sin Mongo ver scripts/benchmark_reportes.py.
 """
 
 import random
 from datetime import date, timedelta
 
-from db.factory import get_db
-from db.mongo.repos.devoluciones_repo import DevolucionesRepo
-from db.mongo.reportes.queries import ReportesQueries
-from services.personal_service import PersonalService
+from db.factory import get_db, close_db
+from db.mongo.reportes.access import ReportesAccess
 from services.reportes.service import ReportesService
 
 
@@ -39,13 +39,8 @@ def setup_services():
 
     provider = get_db()
 
-    devoluciones_repo = DevolucionesRepo(provider._db)
-    reportes_queries = ReportesQueries(devoluciones_repo)
-    personal_service = PersonalService(provider)
-
     service = ReportesService(
-        reportes_queries=reportes_queries,
-        personal_service=personal_service,
+        reportes_queries=ReportesAccess(provider),
     )
 
     print("✅ Services inicializados\n")
@@ -107,7 +102,7 @@ def test_reportes_noviembre(service):
         print(f"\n🔁 Iteración {i + 1}/{INTENTOS}")
 
         desde, hasta = rango_noviembre_aleatorio()
-        agrupar = random.choice(["Día", "Semana", "Mes"])
+        agrupar = random.choice(["Dia", "Semana", "Mes"])
 
         print(f"Rango: {desde} → {hasta}")
         print(f"Agrupar por: {agrupar}")
@@ -130,8 +125,11 @@ def test_reportes_noviembre(service):
 def main():
     print("\n========== INICIO TEST REPORTES (NOVIEMBRE | BD REAL) ==========")
 
-    service = setup_services()
-    test_reportes_noviembre(service)
+    try:
+        service = setup_services()
+        test_reportes_noviembre(service)
+    finally:
+        close_db()
 
     print("\n========== FIN TEST REPORTES ==========\n")
 
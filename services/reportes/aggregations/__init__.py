@@ -5,14 +5,18 @@ Este paquete expone funciones de agregación
 que operan sobre DataFrames normalizados.
 """
 
+from .cubo import construir_cubo
 from .general import agrupa_general
 from .zona import agrupa_por_zona
 from .pasillo import agrupa_por_pasillo
-from .tabla import tabla_final
+from .tabla import iterar_tabla, tabla_columnar, tabla_final
 
 __all__ = [
+    "construir_cubo",
     "agrupa_general",
     "agrupa_por_zona",
     "agrupa_por_pasillo",
+    "iterar_tabla",
+    "tabla_columnar",
     "tabla_final",
 ]
@@ -0,0 +1,57 @@
+import pandas as pd
+
+
+# Grano del cubo (las que existan en el DataFrame)
+DIMENSIONES_CUBO = ["fecha", "zona", "pasillo", "persona", "persona_id"]
+
+# Medidas aditivas
+MEDIDAS_CUBO = ["importe", "piezas", "devoluciones"]
+
+
+def construir_cubo(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Agrupa el DataFrame normalizado UNA sola vez al grano
+    (fecha, zona, pasillo, persona, persona_id).
+
+    RESPONSABILIDAD:
+    - Sumar medidas aditivas (importe, piezas, devoluciones)
+    - Conservar persona_nombre (constante por persona_id)
+    - Conservar el orden de primera aparición (sort=False)
+
+    El cubo tiene las MISMAS columnas que el DataFrame de entrada,
+    así que cualquier agregación (zona, pasillo, series, tabla,
+    personas) puede leerlo en lugar de las filas crudas: todas son
+    sumas, y sumar sumas parciales da el mismo resultado.
+    """
+    if df is None or df.empty:
+        return df
+
+    dims = [c for c in DIMENSIONES_CUBO if c in df.columns]
+    medidas = [c for c in MEDIDAS_CUBO if c in df.columns]
+
+    if not dims or not medidas:
+        return df
+
+    agg = {m: (m, "sum") for m in medidas}
+
+    if "persona_nombre" in df.columns:
+        agg["persona_nombre"] = ("persona_nombre", "first")
+
+    # observed=True: solo combinaciones presentes (dimensiones categóricas)
+    cubo = df.groupby(
+        dims,
+        dropna=False,
+        sort=False,
+        as_index=False,
+        observed=True,
+    ).agg(**agg)
+
+    # groupby(dropna=False) convierte None → NaN en claves
+    if "persona_id" in cubo.columns:
+        cubo["persona_id"] = (
+            cubo["persona_id"]
+            .astype(object)
+            .where(cubo["persona_id"].notna(), None)
+        )
+
+    return cubo
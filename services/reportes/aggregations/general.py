@@ -58,7 +58,7 @@ def agrupa_general(df, kpis):
     # ─────────────────────────────
     # Agrupación GENERAL por fecha
     # ─────────────────────────────
-    for fecha, df_fecha in df.groupby("fecha", dropna=False):
+    for fecha, df_fecha in df.groupby("fecha", dropna=False, observed=True):
 
         # ───────── KPIs globales
         kpis_globales = {}
@@ -71,7 +71,9 @@ def agrupa_general(df, kpis):
         # ───────── KPIs por persona
         personas = []
 
-        for persona_id, df_persona in df_fecha.groupby("persona_id", dropna=False):
+        for persona_id, df_persona in df_fecha.groupby(
+            "persona_id", dropna=False, observed=True
+        ):
 
             # Normalizar ID
             persona_id_norm = persona_id if persona_id else "SIN_ASIGNACION"
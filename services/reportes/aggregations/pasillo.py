@@ -1,83 +1,72 @@
+from services.reportes.normalization.tipos import a_categoria
+
+
+# Valores de pasillo que no cuentan como pasillo real
+PASILLOS_INVALIDOS = {"nan", "None", "—", "-", ""}
+
+
 def agrupa_por_pasillo(df, kpis):
     """
     Agrupación por pasillo.
 
     - Excluye registros sin pasillo válido
-    - Normaliza valores inválidos ('—', None, '')
+    - Normaliza valores inválidos ('—', None, '') sobre las
+      categorías, sin copiar el DataFrame
+    - Series de todos los pasillos en un solo groupby
+      (pasillo, fecha), repartidas por clave al final
     - Devuelve claves semánticas consistentes para el frontend
     """
     if df is None or df.empty or "pasillo" not in df.columns:
         return {}
 
     # ─────────────────────────
-    # Normalización de pasillo
+    # Normalización de pasillo (sobre categorías)
     # ─────────────────────────
-    df = df.copy()
-
-    df["pasillo"] = (
-        df["pasillo"]
-        .astype(str)
-        .str.strip()
-        .replace({
-            "nan": None,
-            "None": None,
-            "—": None,
-            "-": None,
-            "": None,
-        })
-    )
+    pasillos = a_categoria(df["pasillo"])
 
-    # Eliminar filas sin pasillo válido
-    df = df[df["pasillo"].notna()]
+    invalidos = [
+        c for c in pasillos.cat.categories
+        if c in PASILLOS_INVALIDOS
+    ]
+    if invalidos:
+        pasillos = pasillos.cat.remove_categories(invalidos)
 
-    if df.empty:
+    # Filas sin pasillo válido quedan en NaN y groupby las descarta
+    if not pasillos.notna().any():
         return {}
 
-    resultado = {}
+    medidas = [m for m in ("importe", "piezas", "devoluciones") if kpis.get(m)]
+    if not medidas:
+        return {}
 
     # ─────────────────────────
-    # Agrupación por pasillo
+    # Agrupación por pasillo (dos groupby para todos los pasillos)
     # ─────────────────────────
-    for pasillo, g in df.groupby("pasillo"):
-
-        resumen = {}
-
-        if kpis.get("importe"):
-            resumen["importe"] = float(g["importe"].sum())
-
-        if kpis.get("piezas"):
-            resumen["piezas"] = int(g["piezas"].sum())
+    totales = df.groupby(pasillos, observed=True)[medidas].sum()
 
-        if kpis.get("devoluciones"):
-            resumen["devoluciones"] = int(g["devoluciones"].sum())
-
-        # Definición de agregaciones por fecha
-        agg = {}
-
-        if kpis.get("importe"):
-            agg["importe"] = ("importe", "sum")
-
-        if kpis.get("piezas"):
-            agg["piezas"] = ("piezas", "sum")
-
-        if kpis.get("devoluciones"):
-            agg["devoluciones"] = ("devoluciones", "sum")
-
-        if not agg:
-            continue
+    resultado = {}
+    for pasillo, fila in zip(totales.index, totales.itertuples(index=False)):
+        resultado[str(pasillo)] = {
+            "series": [],
+            "resumen": {
+                m: float(v) if m == "importe" else int(v)
+                for m, v in zip(medidas, fila)
+            },
+        }
 
-        df_agg = (
-            g.groupby("fecha", as_index=False)
-            .agg(**agg)
-            .sort_values("fecha")
-        )
+    series = (
+        df.groupby([pasillos, "fecha"], observed=True)[medidas]
+        .sum()
+        .reset_index()
+    )
 
-        # Normalizar fecha a string ISO
-        df_agg["fecha"] = df_agg["fecha"].dt.strftime("%Y-%m-%d")
+    # Normalizar fecha a string ISO (una vez para todos los pasillos)
+    columnas = ["fecha", *medidas]
+    valores = [series["fecha"].dt.strftime("%Y-%m-%d").tolist()]
+    valores += [series[m].tolist() for m in medidas]
 
-        resultado[str(pasillo)] = {
-            "series": df_agg.to_dict(orient="records"),
-            "resumen": resumen,
-        }
+    # Filas ordenadas por (pasillo, fecha): se reparten por clave
+    for pasillo, *fila in zip(series["pasillo"].astype(str).tolist(), *valores):
+        resultado[pasillo]["series"].append(dict(zip(columnas, fila)))
 
     return resultado
@@ -1,15 +1,11 @@
-def tabla_final(df):
+def _agrupar_tabla(df):
     """
-    Tabla de detalle final.
+    Totales por fecha + dimensiones disponibles, ordenados.
 
-    RESPONSABILIDAD:
-    - Mostrar totales por fecha + dimensiones disponibles
-    - NO depende de 'periodo'
-    - NO calendariza
+    RETORNA:
+    (grp, dims) con grp = DataFrame agrupado y dims = dimensiones
+    de texto presentes (zona, pasillo, persona)
     """
-    if df is None or df.empty:
-        return []
-
     if "fecha" not in df.columns:
         raise ValueError("tabla_final requiere columna 'fecha'")
 
@@ -25,7 +21,7 @@ def tabla_final(df):
         group_cols.append("persona")
 
     grp = (
-        df.groupby(group_cols, as_index=False)
+        df.groupby(group_cols, as_index=False, observed=True)
         .agg(
             devoluciones=("devoluciones", "sum"),
             piezas=("piezas", "sum"),
@@ -34,26 +30,78 @@ def tabla_final(df):
         .sort_values(group_cols)
     )
 
-    grp["fecha"] = grp["fecha"].dt.strftime("%Y-%m-%d")
+    dims = [c for c in ("zona", "pasillo", "persona") if c in grp.columns]
+
+    return grp, dims
+
+
+def iterar_tabla(df):
+    """
+    Genera las filas de la tabla de detalle UNA a UNA.
+
+    RESPONSABILIDAD:
+    - Mostrar totales por fecha + dimensiones disponibles
+    - NO depende de 'periodo'
+    - NO calendariza
+    - NO materializa la lista completa de filas (streaming)
+    """
+    if df is None or df.empty:
+        return
+
+    grp, dims = _agrupar_tabla(df)
+    fechas = grp["fecha"].dt.strftime("%Y-%m-%d")
 
-    salida = []
-    for _, r in grp.iterrows():
+    for fecha, devs, piezas, importe, *valores in zip(
+        fechas,
+        grp["devoluciones"],
+        grp["piezas"],
+        grp["importe"],
+        *(grp[c] for c in dims),
+    ):
         row = {
-            "fecha": r["fecha"],
-            "devoluciones": int(r["devoluciones"]),
-            "piezas": int(r["piezas"]),
-            "importe": float(r["importe"]),
+            "fecha": fecha,
+            "devoluciones": int(devs),
+            "piezas": int(piezas),
+            "importe": float(importe),
         }
 
-        if "zona" in grp.columns:
-            row["zona"] = r.get("zona")
+        for col, valor in zip(dims, valores):
+            row[col] = valor
+
+        yield row
+
+
+def tabla_final(df):
+    """
+    Tabla de detalle final (lista completa).
+
+    Ver iterar_tabla para la versión en streaming.
+    """
+    return list(iterar_tabla(df))
+
+
+def tabla_columnar(df):
+    """
+    Tabla de detalle como COLUMNAS (formato columnar), armadas
+    directo del DataFrame agrupado, sin pasar por filas.
+
+    Mismas columnas y orden que las filas de iterar_tabla:
+    { "fecha": [...], "devoluciones": [...], "piezas": [...],
+      "importe": [...], "zona": [...], ... }
+    """
+    if df is None or df.empty:
+        return {}
 
-        if "pasillo" in grp.columns:
-            row["pasillo"] = r.get("pasillo")
+    grp, dims = _agrupar_tabla(df)
 
-        if "persona" in grp.columns:
-            row["persona"] = r.get("persona")
+    columnas = {
+        "fecha": grp["fecha"].dt.strftime("%Y-%m-%d").tolist(),
+        "devoluciones": grp["devoluciones"].astype("int64").tolist(),
+        "piezas": grp["piezas"].astype("int64").tolist(),
+        "importe": grp["importe"].astype("float64").tolist(),
+    }
 
-        salida.append(row)
+    for col in dims:
+        columnas[col] = grp[col].astype(object).tolist()
 
-    return salida
+    return columnas
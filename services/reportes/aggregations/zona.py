@@ -15,7 +15,8 @@ def agrupa_por_zona(df, kpis):
 
     resultado = {}
 
-    for zona, g in df.groupby("zona"):
+    # observed=True: solo zonas presentes (zona es categórica)
+    for zona, g in df.groupby("zona", observed=True):
         if not zona:
             continue
 
@@ -0,0 +1,147 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable
+
+
+logger = logging.getLogger(__name__)
+
+
+class CacheReportes:
+    """
+    Cache en proceso de resultados de reportes.
+
+    REGLAS:
+    - Clave: request canonicalizado (lo arma ReportesService)
+    - TTL: dentro del TTL el resultado se sirve tal cual
+    - Stale-while-revalidate: pasado el TTL (y dentro de la ventana
+      'stale') se sirve el valor viejo y se recalcula en segundo plano
+    - LRU: al superar 'max_entradas' se expulsa el menos usado
+    - Los valores se comparten entre requests: NO deben mutarse
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entradas: int = 128,
+        ttl: float = 60.0,
+        stale: float = 300.0,
+        workers: int = 2,
+        reloj: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self.stale = stale
+        self._reloj = reloj
+
+        self._entradas: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._en_curso: set = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="reportes-cache",
+        )
+
+        self._hits = 0
+        self._stale_hits = 0
+        self._misses = 0
+        self._expulsiones = 0
+        self._refrescos = 0
+        self._errores_refresco = 0
+
+    # ─────────────────────────────
+    # API PÚBLICA
+    # ─────────────────────────────
+    def obtener(self, clave: Hashable, calcular: Callable[[], Any]) -> Any:
+        """
+        Devuelve el valor en cache o lo calcula con `calcular()`.
+        """
+        ahora = self._reloj()
+
+        with self._lock:
+            entrada = self._entradas.get(clave)
+
+            if entrada is not None:
+                creado, valor = entrada
+                edad = ahora - creado
+
+                if edad <= self.ttl:
+                    self._entradas.move_to_end(clave)
+                    self._hits += 1
+                    return valor
+
+                if edad <= self.ttl + self.stale:
+                    self._entradas.move_to_end(clave)
+                    self._stale_hits += 1
+                    self._programar_refresco(clave, calcular)
+                    return valor
+
+                del self._entradas[clave]
+
+            self._misses += 1
+
+        valor = calcular()
+        self._guardar(clave, valor)
+        return valor
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            consultas = self._hits + self._stale_hits + self._misses
+            return {
+                "entradas": len(self._entradas),
+                "max_entradas": self.max_entradas,
+                "ttl_s": self.ttl,
+                "stale_s": self.stale,
+                "hits": self._hits,
+                "stale_hits": self._stale_hits,
+                "misses": self._misses,
+                "hit_ratio": (
+                    round((self._hits + self._stale_hits) / consultas, 4)
+                    if consultas else 0.0
+                ),
+                "expulsiones": self._expulsiones,
+                "refrescos": self._refrescos,
+                "errores_refresco": self._errores_refresco,
+                "refrescos_en_curso": len(self._en_curso),
+            }
+
+    # ─────────────────────────────
+    # INTERNOS
+    # ─────────────────────────────
+    def _guardar(self, clave: Hashable, valor: Any) -> None:
+        with self._lock:
+            self._entradas[clave] = (self._reloj(), valor)
+            self._entradas.move_to_end(clave)
+
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+                self._expulsiones += 1
+
+    def _programar_refresco(self, clave, calcular) -> None:
+        # Llamado con self._lock tomado
+        if clave in self._en_curso:
+            return
+
+        self._en_curso.add(clave)
+        self._executor.submit(self._refrescar, clave, calcular)
+
+    def _refrescar(self, clave, calcular) -> None:
+        try:
+            valor = calcular()
+        except Exception:
+            logger.exception("Error refrescando reporte en cache: %s", clave)
+            with self._lock:
+                self._errores_refresco += 1
+        else:
+            self._guardar(clave, valor)
+            with self._lock:
+                self._refrescos += 1
+        finally:
+            with self._lock:
+                self._en_curso.discard(clave)
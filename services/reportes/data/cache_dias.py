@@ -0,0 +1,200 @@
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Tuple
+
+import pandas as pd
+
+
+DIMENSIONES_DIA = ["fecha", "zona", "pasillo"]
+MEDIDAS_DIA = ["piezas", "importe", "devoluciones"]
+
+
+# ─────────────────────────────
+# Helpers internos
+# ─────────────────────────────
+def _rangos_contiguos(dias: List[date]) -> List[Tuple[date, date]]:
+    """
+    Agrupa días ordenados en rangos contiguos [(desde, hasta), ...].
+    """
+    rangos: List[Tuple[date, date]] = []
+
+    for d in dias:
+        if rangos and rangos[-1][1] + timedelta(days=1) == d:
+            rangos[-1] = (rangos[-1][0], d)
+        else:
+            rangos.append((d, d))
+
+    return rangos
+
+
+def _compactar(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reduce el detalle a (fecha, zona, pasillo) sumando medidas.
+
+    Se conserva la fecha EXACTA (no se trunca al día) y el pasillo
+    crudo: la atribución de persona se hace después con las
+    asignaciones vigentes, así que el cache no depende de ellas.
+    """
+    if df is None or df.empty:
+        return pd.DataFrame(columns=DIMENSIONES_DIA + MEDIDAS_DIA)
+
+    # 'df' viene recién leído de Mongo: se modifica en sitio
+    df["fecha"] = pd.to_datetime(df["fecha"], errors="coerce")
+
+    if "devoluciones" not in df.columns:
+        df["devoluciones"] = 1
+
+    dims = [c for c in DIMENSIONES_DIA if c in df.columns]
+    medidas = [c for c in MEDIDAS_DIA if c in df.columns]
+
+    return (
+        df.groupby(
+            dims, dropna=False, sort=False, as_index=False, observed=True
+        )[medidas]
+        .sum()
+    )
+
+
+class CacheDias:
+    """
+    Cache de agregados POR DÍA (fecha × zona × pasillo).
+
+    REGLAS:
+    - Un request solo consulta en Mongo los días que faltan,
+      agrupados en rangos contiguos
+    - Los días cerrados (< hoy) se guardan junto con su marca de
+      agua (total, max _id); si el request trae marcas y la del día
+      cambió (back-fill, borrado) el día se descarta y se vuelve a pedir
+    - 'Hoy' (y cualquier día futuro) es volátil: siempre se consulta
+    - LRU por número de días ('max_dias')
+    """
+
+    def __init__(
+        self,
+        *,
+        max_dias: int = 400,
+        hoy: Callable[[], date] = date.today,
+    ):
+        self.max_dias = max_dias
+        self._hoy = hoy
+
+        self._dias: "OrderedDict[date, tuple[pd.DataFrame, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._consultas = 0
+        self._invalidados = 0
+
+    # ─────────────────────────────
+    # API PÚBLICA
+    # ─────────────────────────────
+    def cargar(
+        self,
+        cargar_rango: Callable[[date, date], pd.DataFrame],
+        desde: date,
+        hasta: date,
+        marcas: Dict[date, Any] | None = None,
+    ) -> pd.DataFrame:
+        """
+        Devuelve el agregado diario de [desde, hasta].
+
+        cargar_rango(desde, hasta) ejecuta la query real (detalle o
+        rollup) para un rango contiguo de días.
+
+        marcas: { día: marca } actuales del rango (ver marcas_por_dia;
+        días sin devoluciones no aparecen). None → no se validan.
+        Deben leerse ANTES de cargar: si cambian en el medio, el
+        siguiente request vuelve a pedir el día.
+
+        Devuelve SIEMPRE un DataFrame nuevo (concat): el llamador
+        puede normalizarlo en sitio sin tocar los días guardados.
+        """
+        dias = [
+            desde + timedelta(days=i)
+            for i in range((hasta - desde).days + 1)
+        ]
+
+        partes: Dict[date, pd.DataFrame] = {}
+
+        with self._lock:
+            for d in dias:
+                entrada = self._dias.get(d)
+                if entrada is None:
+                    continue
+
+                parte, marca = entrada
+                if marcas is not None and marca != marcas.get(d):
+                    del self._dias[d]
+                    self._invalidados += 1
+                    continue
+
+                self._dias.move_to_end(d)
+                partes[d] = parte
+
+            self._hits += len(partes)
+            self._misses += len(dias) - len(partes)
+
+        faltantes = [d for d in dias if d not in partes]
+        hoy = self._hoy()
+
+        for a, b in _rangos_contiguos(faltantes):
+            compacto = _compactar(cargar_rango(a, b))
+
+            with self._lock:
+                self._consultas += 1
+
+            # Rango sin filas: 'fecha' vacía no es datetime
+            por_dia = {} if compacto.empty else {
+                k.date(): g
+                for k, g in compacto.groupby(
+                    compacto["fecha"].dt.normalize(), sort=False
+                )
+            }
+
+            vacio = compacto.iloc[0:0]
+            d = a
+            while d <= b:
+                parte = por_dia.get(d, vacio)
+                partes[d] = parte
+
+                if d < hoy:
+                    self._guardar(
+                        d, parte, None if marcas is None else marcas.get(d)
+                    )
+
+                d += timedelta(days=1)
+
+        no_vacias = [partes[d] for d in dias if not partes[d].empty]
+
+        if not no_vacias:
+            return pd.DataFrame(columns=DIMENSIONES_DIA + MEDIDAS_DIA)
+
+        return pd.concat(no_vacias, ignore_index=True)
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._dias.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "dias": len(self._dias),
+                "max_dias": self.max_dias,
+                "hits_dia": self._hits,
+                "misses_dia": self._misses,
+                "consultas_mongo": self._consultas,
+                "invalidados": self._invalidados,
+            }
+
+    # ─────────────────────────────
+    # INTERNOS
+    # ─────────────────────────────
+    def _guardar(self, dia: date, parte: pd.DataFrame, marca) -> None:
+        with self._lock:
+            self._dias[dia] = (parte, marca)
+            self._dias.move_to_end(dia)
+
+            while len(self._dias) > self.max_dias:
+                self._dias.popitem(last=False)
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
@@ -21,22 +22,85 @@ def _to_date(value):
         return None
 
 
-def _resolver_persona(pasillo, fecha, asignaciones):
+def indexar_asignaciones(asignaciones: list[dict]) -> dict:
     """
-    Dado un pasillo y una fecha, devuelve persona_id o None.
+    Construye el índice de intervalos por pasillo.
+
+    RETORNA:
+    { pasillo: [(desde, hasta, persona_id), ...] }
+
+    - Fechas como numpy.datetime64[D] (comparables en bloque)
+    - Se conserva el ORDEN ORIGINAL: gana la primera asignación
+      que cubra la fecha (misma regla que la resolución fila a fila)
+    - Asignaciones sin fecha_desde / fecha_hasta válidas se omiten
+      (nunca podían coincidir)
     """
-    for a in asignaciones:
-        if a["pasillo"] != pasillo:
-            continue
+    indice: dict = {}
 
+    for a in asignaciones or []:
         desde = _to_date(a.get("fecha_desde"))
         hasta = _to_date(a.get("fecha_hasta"))
-        f = _to_date(fecha)
 
-        if desde and hasta and f and desde <= f <= hasta:
-            return a.get("persona_id")
+        if not desde or not hasta or pd.isna(desde) or pd.isna(hasta):
+            continue
 
-    return None
+        indice.setdefault(a.get("pasillo"), []).append((
+            np.datetime64(desde, "D"),
+            np.datetime64(hasta, "D"),
+            a.get("persona_id"),
+        ))
+
+    return indice
+
+
+def _atribuir_personas(df: pd.DataFrame, indice: dict) -> pd.Series:
+    """
+    Asigna persona_id a TODAS las filas en una sola pasada.
+
+    - Agrupa filas por pasillo una sola vez (factorize + argsort)
+    - Para cada pasillo recorre sus intervalos con máscaras numpy
+    - Costo: O(filas + filas_del_pasillo × intervalos_del_pasillo)
+    """
+    resultado = np.full(len(df), None, dtype=object)
+
+    if not indice or "fecha" not in df.columns:
+        return pd.Series(resultado, index=df.index, dtype=object)
+
+    fechas = pd.to_datetime(df["fecha"], errors="coerce")
+    if fechas.dt.tz is not None:
+        fechas = fechas.dt.tz_localize(None)
+
+    dias = fechas.dt.normalize().to_numpy().astype("datetime64[D]")
+
+    codigos, pasillos = pd.factorize(df["pasillo"])
+    orden = np.argsort(codigos, kind="stable")
+    limites = np.searchsorted(
+        codigos[orden],
+        np.arange(len(pasillos) + 1),
+    )
+
+    for i, pasillo in enumerate(pasillos):
+        intervalos = indice.get(pasillo)
+        if not intervalos:
+            continue
+
+        pos = orden[limites[i]:limites[i + 1]]
+        d = dias[pos]
+
+        asignado = np.full(len(pos), None, dtype=object)
+        pendiente = np.ones(len(pos), dtype=bool)
+
+        for desde, hasta, persona_id in intervalos:
+            m = pendiente & (d >= desde) & (d <= hasta)
+            asignado[m] = persona_id
+            pendiente &= ~m
+
+            if not pendiente.any():
+                break
+
+        resultado[pos] = asignado
+
+    return pd.Series(resultado, index=df.index, dtype=object)
 
 
 # ─────────────────────────────
@@ -46,16 +110,23 @@ def obtener_dataframe(
     df_detalle,
     asignaciones: list[dict] | None = None,
     personas_map: dict | None = None,
+    indice: dict | None = None,
 ):
     """
     Normaliza y ENRIQUECE el DataFrame base para reportes.
+
+    indice: índice de asignaciones ya construido
+    (ver indexar_asignaciones); si no se pasa, se arma aquí.
+
+    Un DataFrame de entrada se enriquece EN SITIO (sin copia):
+    el llamador le cede la propiedad.
     """
     if df_detalle is None:
         return None
 
-    # Convertir a DataFrame
+    # Convertir a DataFrame (única copia posible: filas sueltas)
     df = (
-        df_detalle.copy()
+        df_detalle
         if isinstance(df_detalle, pd.DataFrame)
         else pd.DataFrame(df_detalle)
     )
@@ -72,13 +143,9 @@ def obtener_dataframe(
 
     # ───────── Enriquecimiento PERSONA (CLAVE)
     if asignaciones and "pasillo" in df.columns:
-        df["persona_id"] = df.apply(
-            lambda r: _resolver_persona(
-                r.get("pasillo"),
-                r.get("fecha"),
-                asignaciones
-            ),
-            axis=1
+        df["persona_id"] = _atribuir_personas(
+            df,
+            indice if indice is not None else indexar_asignaciones(asignaciones),
         )
     else:
         df["persona_id"] = None
@@ -0,0 +1,161 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+from services.reportes.data.dataframe import indexar_asignaciones
+
+
+class _Entrada:
+    __slots__ = ("valor", "version", "cargado_en", "verificado_en", "derivados")
+
+    def __init__(self, valor, version, ahora):
+        self.valor = valor
+        self.version = version
+        self.cargado_en = ahora
+        self.verificado_en = ahora
+        self.derivados: Dict[str, Any] = {}
+
+
+class CacheDimensiones:
+    """
+    Cache versionado de dimensiones (personal / asignaciones).
+
+    REGLAS:
+    - Dentro de 'ttl_version' segundos se sirve sin consultar Mongo
+    - Pasado ese tiempo se hace un probe barato (conteo + max _id);
+      solo si la versión cambió se recarga la colección
+    - Pasado 'ttl_max' se recarga siempre (cubre ediciones en sitio
+      que no cambian la huella)
+    - Guarda estructuras derivadas (índice pasillo → intervalos),
+      que se recalculan solo al recargar
+    - Los valores se comparten entre requests: NO deben mutarse
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_version: float = 30.0,
+        ttl_max: float = 3600.0,
+        reloj: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_version = ttl_version
+        self.ttl_max = ttl_max
+        self._reloj = reloj
+
+        self._entradas: Dict[str, _Entrada] = {}
+        self._locks = {
+            "personas": threading.Lock(),
+            "asignaciones": threading.Lock(),
+        }
+
+        self._cargas = 0
+        self._probes = 0
+        self._hits = 0
+
+    # ─────────────────────────────
+    # API PÚBLICA
+    # ─────────────────────────────
+    def personas(self, reportes_queries) -> Dict[str, str]:
+        """
+        Mapa { persona_id: nombre } de personas activas.
+        """
+        return self._obtener(
+            "personas",
+            reportes_queries.personas_activas,
+            reportes_queries.version_personas,
+        ).valor
+
+    def asignaciones(self, reportes_queries) -> List[Dict]:
+        """
+        Asignaciones crudas (sin lógica temporal).
+        """
+        return self._obtener(
+            "asignaciones",
+            reportes_queries.asignaciones_personal,
+            reportes_queries.version_asignaciones,
+        ).valor
+
+    def indice_asignaciones(self, reportes_queries) -> Dict:
+        """
+        Índice pasillo → intervalos (ver indexar_asignaciones),
+        precalculado una vez por versión de asignaciones.
+        """
+        entrada = self._obtener(
+            "asignaciones",
+            reportes_queries.asignaciones_personal,
+            reportes_queries.version_asignaciones,
+        )
+
+        indice = entrada.derivados.get("indice")
+        if indice is None:
+            indice = indexar_asignaciones(entrada.valor)
+            entrada.derivados["indice"] = indice
+
+        return indice
+
+    def version_personas(self, reportes_queries) -> tuple:
+        """
+        Versión de personal que sirve personas(): sin consultar
+        Mongo dentro de 'ttl_version' (la carga si aún no estaba).
+        """
+        return self._obtener(
+            "personas",
+            reportes_queries.personas_activas,
+            reportes_queries.version_personas,
+        ).version
+
+    def version_asignaciones(self, reportes_queries) -> tuple:
+        """
+        Versión de asignaciones que sirve asignaciones().
+        """
+        return self._obtener(
+            "asignaciones",
+            reportes_queries.asignaciones_personal,
+            reportes_queries.version_asignaciones,
+        ).version
+
+    def limpiar(self) -> None:
+        for nombre, lock in self._locks.items():
+            with lock:
+                self._entradas.pop(nombre, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cargas": self._cargas,
+            "probes": self._probes,
+            "hits": self._hits,
+            "versiones": {
+                nombre: e.version
+                for nombre, e in list(self._entradas.items())
+            },
+        }
+
+    # ─────────────────────────────
+    # INTERNOS
+    # ─────────────────────────────
+    def _obtener(self, nombre, cargar, version) -> _Entrada:
+        with self._locks[nombre]:
+            ahora = self._reloj()
+            entrada = self._entradas.get(nombre)
+
+            if entrada is not None:
+                if ahora - entrada.verificado_en <= self.ttl_version:
+                    self._hits += 1
+                    return entrada
+
+                if ahora - entrada.cargado_en <= self.ttl_max:
+                    self._probes += 1
+                    actual = version()
+
+                    if actual == entrada.version:
+                        entrada.verificado_en = ahora
+                        return entrada
+
+            # La versión se lee ANTES de cargar: si cambia entre ambas
+            # lecturas, el siguiente probe lo detecta y recarga.
+            actual = version()
+            entrada = _Entrada(cargar(), actual, ahora)
+            self._entradas[nombre] = entrada
+            self._cargas += 1
+
+            return entrada
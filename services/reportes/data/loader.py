@@ -1,8 +1,143 @@
-def cargar_devoluciones_detalle(reportes_queries, filtros):
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import pandas as pd
+
+from db.mongo.reportes.access import MARCA_DIA_VACIO
+from db.mongo.reportes.predicates import rango_fechas, combinar_filtros
+from services.reportes.utils.tiempos import contar, etapa
+
+
+# Pool acotado para consultas de I/O independientes (PyMongo es thread-safe)
+_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("REPORTES_CARGA_WORKERS", "8")),
+    thread_name_prefix="reportes-carga",
+)
+
+
+def cargar_en_paralelo(**tareas):
+    """
+    Ejecuta cargas independientes de forma concurrente.
+
+    tareas: nombre → callable sin argumentos
+
+    RETURN:
+    { nombre: resultado }
+
+    La latencia es la de la consulta más lenta, no la suma.
+    Si alguna falla, se propaga su excepción.
+
+    Cada tarea corre con una copia del contexto del request
+    y se mide como la etapa "carga_<nombre>".
+    """
+    futuros = {
+        nombre: _EXECUTOR.submit(
+            contextvars.copy_context().run, _cargar, nombre, fn
+        )
+        for nombre, fn in tareas.items()
+    }
+
+    return {
+        nombre: futuro.result()
+        for nombre, futuro in futuros.items()
+    }
+
+
+def _cargar(nombre, fn):
+    with etapa(f"carga_{nombre}") as e:
+        resultado = fn()
+        e.filas = contar(resultado)
+    return resultado
+
+
+def cargar_devoluciones_detalle(reportes_queries, filtros, medidas=None):
     """
     Ejecuta la query base de devoluciones detalle.
+
+    medidas: medidas a proyectar en Mongo (None = todas).
+    """
+    return reportes_queries.devoluciones_detalle(filtros, medidas=medidas)
+
+
+def cargar_devoluciones_rollup(reportes_queries, filtros, medidas=None):
+    """
+    Ejecuta la query base ya agrupada en Mongo
+    (día × zona × pasillo).
     """
-    return reportes_queries.devoluciones_detalle(filtros)
+    return reportes_queries.devoluciones_rollup(filtros, medidas=medidas)
+
+
+def cargar_devoluciones_materializado(
+    reportes_queries, desde, hasta, hoy, medidas=None, marcas=None
+):
+    """
+    Carga desde el rollup materializado los días cerrados (< hoy)
+    cuya marca de construcción (scripts/construir_rollup.py) sigue
+    siendo la marca actual de devoluciones, y agrupa en vivo
+    (rollup en Mongo) el resto: hoy, días futuros, días que el cron
+    todavía no cubre y días con back-fills posteriores al cron.
+
+    marcas: { día: marca } actuales (ver marcas_por_dia);
+    None → se consultan.
+
+    medidas solo aplica a la parte en vivo (el rollup ya está
+    materializado con todas).
+    """
+    filtros = combinar_filtros(rango_fechas(desde, hasta))
+
+    if marcas is None:
+        marcas = reportes_queries.marcas_por_dia(filtros)
+
+    materializados = {
+        d
+        for d, marca in reportes_queries.marcas_rollup_diario(filtros).items()
+        if d < hoy and marca == marcas.get(d, MARCA_DIA_VACIO)
+    }
+
+    partes = []
+    for d1, d2, materializado in _tramos_materializado(desde, hasta, materializados):
+        filtros = combinar_filtros(rango_fechas(d1, d2))
+
+        if materializado:
+            partes.append(reportes_queries.devoluciones_rollup_diario(filtros))
+        else:
+            partes.append(
+                reportes_queries.devoluciones_rollup(filtros, medidas=medidas)
+            )
+
+    no_vacias = [p for p in partes if p is not None and not p.empty]
+
+    if not no_vacias:
+        return partes[0] if partes else None
+
+    if len(no_vacias) == 1:
+        return no_vacias[0]
+
+    return pd.concat(no_vacias, ignore_index=True)
+
+
+def _tramos_materializado(desde, hasta, materializados):
+    """
+    Parte [desde, hasta] en tramos contiguos (d1, d2, materializado).
+
+    materializados: días que se leen del rollup.
+    """
+    tramos = []
+    d = desde
+
+    while d <= hasta:
+        materializado = d in materializados
+
+        if tramos and tramos[-1][2] == materializado:
+            tramos[-1] = (tramos[-1][0], d, materializado)
+        else:
+            tramos.append((d, d, materializado))
+
+        d += timedelta(days=1)
+
+    return tramos
 
 
 def cargar_asignaciones_activas(reportes_queries, desde, hasta):
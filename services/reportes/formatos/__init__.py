@@ -0,0 +1,12 @@
+"""
+Formatos alternativos de salida para reportes.
+
+El formato legacy (lista de puntos con claves repetidas) sigue
+siendo el default; estos formatos son opt-in desde la API.
+"""
+
+from .columnar import a_columnar
+
+__all__ = [
+    "a_columnar",
+]
@@ -0,0 +1,203 @@
+import math
+from typing import Any, Dict, List
+
+
+MEDIDAS = ("importe", "piezas", "devoluciones")
+
+SIN_ASIGNACION = "SIN_ASIGNACION"
+
+
+# ─────────────────────────────
+# Helpers internos
+# ─────────────────────────────
+def _centavos(valor) -> float:
+    """
+    Redondea importes a centavos (NaN / inf → 0.0).
+    """
+    valor = float(valor or 0.0)
+    if math.isnan(valor) or math.isinf(valor):
+        return 0.0
+    return round(valor, 2)
+
+
+def _columna(medida: str, valores: List) -> List:
+    if medida == "importe":
+        return [_centavos(v) for v in valores]
+    return [int(v or 0) for v in valores]
+
+
+def _id_persona(pid) -> str:
+    if pid is None or (isinstance(pid, float) and math.isnan(pid)) or pid == "":
+        return SIN_ASIGNACION
+    return str(pid)
+
+
+def _resumen(resumen: Dict) -> Dict:
+    return {
+        k: (_centavos(v) if k.startswith("importe") else v)
+        for k, v in (resumen or {}).items()
+    }
+
+
+# ─────────────────────────────
+# Series
+# ─────────────────────────────
+def _serie_general(general: Dict | None) -> Dict | None:
+    """
+    [{key, label, kpis, personas}, ...] → arreglos paralelos.
+
+    'personas' queda alineado al eje: 0 donde la persona
+    no tuvo movimiento en ese punto.
+    """
+    if general is None:
+        return None
+
+    serie = general.get("serie") or []
+    n = len(serie)
+
+    salida = {
+        "periodo": general.get("periodo"),
+        "key": [p["key"] for p in serie],
+        "label": [p["label"] for p in serie],
+    }
+
+    for m in MEDIDAS:
+        salida[m] = _columna(m, [p["kpis"].get(m, 0) for p in serie])
+
+    personas: Dict[str, Dict[str, Any]] = {}
+
+    for i, punto in enumerate(serie):
+        for persona in punto.get("personas") or []:
+            pid = _id_persona(persona.get("id"))
+
+            bloque = personas.get(pid)
+            if bloque is None:
+                bloque = {"nombre": persona.get("nombre")}
+                for m in MEDIDAS:
+                    bloque[m] = [0.0 if m == "importe" else 0] * n
+                personas[pid] = bloque
+
+            for m in MEDIDAS:
+                valor = persona["kpis"].get(m, 0)
+                bloque[m][i] = (
+                    _centavos(valor) if m == "importe" else int(valor)
+                )
+
+    salida["personas"] = personas
+    return salida
+
+
+def _serie_persona(bloque: Dict) -> Dict:
+    """
+    {nombre, series: [{key, label, kpis}]} → arreglos paralelos.
+    """
+    serie = bloque.get("series") or []
+
+    salida = {
+        "nombre": bloque.get("nombre"),
+        "key": [p["key"] for p in serie],
+    }
+
+    medidas = [m for m in MEDIDAS if serie and m in serie[0]["kpis"]]
+    for m in medidas:
+        salida[m] = _columna(m, [p["kpis"][m] for p in serie])
+
+    return salida
+
+
+def _bloque_dimension(bloque: Dict) -> Dict:
+    """
+    {series: [{fecha, importe, ...}], resumen} → arreglos paralelos.
+    """
+    serie = bloque.get("series") or []
+
+    salida = {"fecha": [p["fecha"] for p in serie]}
+
+    medidas = [m for m in MEDIDAS if serie and m in serie[0]]
+    for m in medidas:
+        salida[m] = _columna(m, [p[m] for p in serie])
+
+    salida["resumen"] = _resumen(bloque.get("resumen"))
+    return salida
+
+
+def _tabla(tabla: List[Dict] | Dict[str, List]) -> Dict[str, List]:
+    """
+    Lista de filas → columnas (orden de columnas de la primera fila).
+
+    Si ya viene en columnas (tabla_columnar) solo redondea importes.
+    """
+    if not tabla:
+        return {}
+
+    if isinstance(tabla, dict):
+        columnas = dict(tabla)
+    else:
+        columnas = {c: [] for c in tabla[0]}
+
+        for fila in tabla:
+            for c, valores in columnas.items():
+                valores.append(fila.get(c))
+
+    if "importe" in columnas:
+        columnas["importe"] = [_centavos(v) for v in columnas["importe"]]
+
+    return columnas
+
+
+# ─────────────────────────────
+# API pública
+# ─────────────────────────────
+def a_columnar(resultado: Dict) -> Dict:
+    """
+    Convierte el resultado de ReportesService.generar al formato
+    columnar (arreglos paralelos por serie).
+
+    - Las tablas (tabla, por_persona.tabla) ya llegan en columnas
+      desde el cubo (tabla_columnar); aquí solo se redondean
+    - Las series (general, zona, pasillo, personas) son chicas
+      (un punto por fecha) y se transponen desde el resultado
+    - Importes redondeados a centavos
+    - Mismas secciones que el resultado legacy
+    """
+    if resultado.get("error"):
+        return {**resultado, "formato": "columnar"}
+
+    salida = {
+        "formato": "columnar",
+        "kpis": resultado.get("kpis"),
+        "resumen": _resumen(resultado.get("resumen")),
+        "general": _serie_general(resultado.get("general")),
+        "por_zona": {
+            k: _bloque_dimension(v)
+            for k, v in (resultado.get("por_zona") or {}).items()
+        },
+        "por_pasillo": {
+            k: _bloque_dimension(v)
+            for k, v in (resultado.get("por_pasillo") or {}).items()
+        },
+        "personas": resultado.get("personas") or {},
+        "por_persona": {
+            pid: {
+                "resumen": _resumen(v.get("resumen")),
+                "tabla": _tabla(v.get("tabla") or []),
+                "series": {
+                    _id_persona(sid): _serie_persona(s)
+                    for sid, s in (v.get("series") or {}).items()
+                },
+            }
+            for pid, v in (resultado.get("por_persona") or {}).items()
+        },
+        "personas_series": {
+            _id_persona(pid): _serie_persona(v)
+            for pid, v in (resultado.get("personas_series") or {}).items()
+        },
+        "tabla": _tabla(resultado.get("tabla") or []),
+    }
+
+    # Solo las secciones presentes en el resultado (ver 'secciones')
+    return {
+        k: v
+        for k, v in salida.items()
+        if k == "formato" or k in resultado
+    }
@@ -1,9 +1,10 @@
 from .columnas import normalizar_columnas
 from .ids import normalizar_ids
-from .tipos import normalizar_tipos
+from .tipos import normalizar_tipos, a_categoria
 
 __all__ = [
     "normalizar_columnas",
     "normalizar_ids",
     "normalizar_tipos",
+    "a_categoria",
 ]
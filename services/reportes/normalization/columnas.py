@@ -13,12 +13,12 @@ def normalizar_columnas(df: pd.DataFrame, kpis: dict) -> pd.DataFrame:
     - zona
     - pasillo
     - persona (opcional)
+
+    Modifica 'df' EN SITIO (ver normalizar_dataframe).
     """
     if df is None or df.empty:
         return df
 
-    df = df.copy()
-
     # ───── piezas ─────
     if "piezas" not in df.columns:
         if "cantidad" in df.columns:
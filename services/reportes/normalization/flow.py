@@ -10,17 +10,24 @@ def normalizar_dataframe(df, kpis):
     RESPONSABILIDAD:
     - Normalizar IDs
     - Normalizar columnas según KPIs
-    - Normalizar tipos
     - Garantizar columnas mínimas
+    - Normalizar tipos (dimensiones categóricas, medidas int32/float64)
+
+    PROPIEDAD:
+    - El flujo es dueño de 'df' y lo transforma EN SITIO (sin copias);
+      quien lo llama no debe volver a usar el DataFrame original
+    - Reemplaza columnas completas (df[col] = ...), nunca escribe
+      dentro de un arreglo existente: un DataFrame que comparta
+      bloques con otro (p. ej. el cache diario) no se altera
     """
 
     df = normalizar_ids(df)
     df = normalizar_columnas(df, kpis)
-    df = normalizar_tipos(df)
 
     if "devoluciones" not in df.columns:
         df["devoluciones"] = 1
 
+    # Antes de normalizar_tipos: después ya es categórica
     if "persona_nombre" not in df.columns:
         df["persona_nombre"] = "Sin asignación"
     else:
@@ -29,4 +36,6 @@ def normalizar_dataframe(df, kpis):
             .fillna("Sin asignación")
         )
 
+    df = normalizar_tipos(df)
+
     return df
@@ -7,12 +7,12 @@ def normalizar_ids(df: pd.DataFrame) -> pd.DataFrame:
 
     - Convierte _id de Mongo a string
     - Asegura columna 'id' si existe '_id'
+
+    Modifica 'df' EN SITIO (ver normalizar_dataframe).
     """
     if df is None or df.empty:
         return df
 
-    df = df.copy()
-
     if "_id" in df.columns and "id" not in df.columns:
         df["id"] = df["_id"].astype(str)
 
@@ -1,40 +1,100 @@
+import numpy as np
 import pandas as pd
 
 
+# Dimensiones de texto → categóricas (limpieza str + strip)
+DIMENSIONES_TEXTO = ("zona", "pasillo", "persona")
+
+# Dimensiones de persona → categóricas SIN limpiar (faltante = sin asignación)
+DIMENSIONES_PERSONA = ("persona_id", "persona_nombre")
+
+
+def a_categoria(
+    serie: pd.Series,
+    *,
+    vacio: str | None = "",
+    limpiar: bool = True,
+) -> pd.Series:
+    """
+    Convierte una columna a categórica con categorías ORDENADAS.
+
+    - limpiar: str + strip aplicado a las CATEGORÍAS (una vez por
+      valor distinto, no por fila); categorías que quedan iguales
+      se fusionan
+    - vacio: valor para faltantes ('' → categoría ''; None → NaN)
+
+    Si la columna ya es categórica solo se recalculan códigos
+    (numpy), sin tocar los valores fila a fila.
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        cat = serie.array
+    else:
+        cat = pd.Categorical(serie)
+
+    codigos = np.asarray(cat.codes)
+    categorias = pd.Index(cat.categories, dtype=object)
+
+    if limpiar:
+        categorias = categorias.astype(str).str.strip()
+
+    if vacio is not None and (codigos < 0).any():
+        codigos = np.where(codigos < 0, len(categorias), codigos)
+        categorias = categorias.append(pd.Index([vacio], dtype=object))
+
+    unicas = pd.Index(categorias.unique(), dtype=object).sort_values()
+    remapeo = unicas.get_indexer(categorias)
+
+    nuevos = (
+        np.where(codigos >= 0, remapeo[codigos], -1)
+        if len(remapeo)
+        else codigos
+    )
+
+    return pd.Series(
+        pd.Categorical.from_codes(nuevos, categories=unicas),
+        index=serie.index,
+        name=serie.name,
+    )
+
+
 def normalizar_tipos(df: pd.DataFrame) -> pd.DataFrame:
     """
     Normaliza tipos de datos del DataFrame.
 
-    - Numéricos: importe, piezas, devoluciones
-    - Texto: zona, pasillo, persona
+    - Numéricos: importe (float64), piezas / devoluciones (int32)
+    - Texto: zona, pasillo, persona → categóricas limpias
+    - Persona: persona_id, persona_nombre → categóricas
+      (un solo diccionario por columna; los agregadores agrupan
+      sobre códigos con observed=True)
+
+    Modifica 'df' EN SITIO (ver normalizar_dataframe).
     """
     if df is None or df.empty:
         return df
 
-    df = df.copy()
-
     # ───── numéricos ─────
     if "importe" in df.columns:
-        df["importe"] = pd.to_numeric(
-            df["importe"], errors="coerce"
-        ).fillna(0.0)
+        df["importe"] = (
+            pd.to_numeric(df["importe"], errors="coerce")
+            .fillna(0.0)
+            .astype(np.float64)
+        )
 
     for col in ("piezas", "devoluciones"):
         if col in df.columns:
             df[col] = (
                 pd.to_numeric(df[col], errors="coerce")
                 .fillna(0)
-                .astype(int)
+                .astype(np.int32)
             )
 
     # ───── texto ─────
-    for col in ("zona", "pasillo", "persona"):
+    for col in DIMENSIONES_TEXTO:
         if col in df.columns:
-            df[col] = (
-                df[col]
-                .fillna("")
-                .astype(str)
-                .str.strip()
-            )
+            df[col] = a_categoria(df[col])
+
+    for col in DIMENSIONES_PERSONA:
+        if col in df.columns:
+            df[col] = a_categoria(df[col], vacio=None, limpiar=False)
 
     return df
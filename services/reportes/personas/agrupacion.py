@@ -1,8 +1,10 @@
+import numpy as np
 import pandas as pd
-from typing import Dict, Any, List
+from typing import Any, Callable, Dict, List
 from datetime import date
 
 from services.reportes.aggregations.tabla import tabla_final
+from services.reportes.normalization.tipos import a_categoria
 from services.reportes.personas.asignaciones import obtener_asignaciones_activas
 from services.reportes.personas.series import agrupar_personas_por_fecha
 
@@ -11,24 +13,28 @@ from services.reportes.personas.series import agrupar_personas_por_fecha
 # Agrupación principal
 # ─────────────────────────────
 def agrupar_por_persona(
-    reportes_queries,
+    asignaciones: List[Dict],
     df: pd.DataFrame,
     desde: date,
     hasta: date,
     kpis: Dict[str, bool],
+    tabla: Callable[[pd.DataFrame], Any] = tabla_final,
 ) -> Dict[str, Any]:
     """
     Agrupa devoluciones por persona usando asignaciones históricas.
 
+    tabla: arma la tabla de cada persona (tabla_final = filas,
+    tabla_columnar = columnas para el formato columnar).
+
     RESPONSABILIDAD:
-    - Cruza devoluciones (DataFrame ya normalizado)
+    - Cruza devoluciones (DataFrame normalizado o cubo agregado)
     - Aplica lógica temporal de asignaciones activas
     - Calcula KPIs y genera tablas finales
 
     REGLAS:
     - NO consulta Mongo directamente
     - NO construye pipelines
-    - Queries SOLO proveen datos crudos
+    - Recibe las asignaciones CRUDAS ya cargadas por el service
     """
 
     # ─────────────────────────────
@@ -43,11 +49,6 @@ def agrupar_por_persona(
     if not isinstance(desde, date) or not isinstance(hasta, date):
         raise ValueError("`desde` y `hasta` deben ser datetime.date")
 
-    # ─────────────────────────────
-    # Obtener asignaciones CRUDAS
-    # ─────────────────────────────
-    asignaciones: List[Dict] = reportes_queries.asignaciones_personal()
-
     if not asignaciones:
         return {}
 
@@ -64,20 +65,25 @@ def agrupar_por_persona(
         return {}
 
     # ─────────────────────────────
-    # Agrupar índices por persona
+    # Resolver persona por fila (vectorizado)
     # ─────────────────────────────
-    indices_por_persona: Dict[str, List[int]] = {}
-
-    for idx, row in df.iterrows():
-        pasillo = str(row.get("pasillo", "")).strip()
-        persona_id = pasillo_a_persona.get(pasillo)
-
-        if not persona_id:
-            continue
-
-        indices_por_persona.setdefault(persona_id, []).append(idx)
-
-    if not indices_por_persona:
+    # El mapeo se resuelve una vez por categoría de pasillo y se
+    # expande a las filas con los códigos (sin str por fila)
+    if "pasillo" in df.columns:
+        pasillos = a_categoria(df["pasillo"])
+        por_categoria = np.append(
+            pasillos.cat.categories.map(pasillo_a_persona).to_numpy(object),
+            None,
+        )
+        personas = pd.Series(
+            por_categoria[pasillos.cat.codes.to_numpy()],
+            index=df.index,
+            dtype=object,
+        )
+    else:
+        personas = pd.Series(None, index=df.index, dtype=object)
+
+    if not personas.notna().any():
         return {}
 
     # ─────────────────────────────
@@ -85,8 +91,10 @@ def agrupar_por_persona(
     # ─────────────────────────────
     resultado: Dict[str, Any] = {}
 
-    for persona_id, idxs in indices_por_persona.items():
-        df_persona = df.loc[idxs]
+    # sort=False → orden de primera aparición
+    for persona_id, df_persona in df.groupby(personas, sort=False):
+        if not persona_id:
+            continue
 
         resumen: Dict[str, Any] = {}
 
@@ -101,7 +109,7 @@ def agrupar_por_persona(
 
         resultado[persona_id] = {
             "resumen": resumen,
-            "tabla": tabla_final(df_persona),
+            "tabla": tabla(df_persona),
             "series": agrupar_personas_por_fecha(df_persona, kpis),
         }
 
@@ -25,40 +25,50 @@ def agrupar_personas_por_fecha(
         if kpis.get(c) and c in df.columns
     ]
 
-    resultado: Dict[str, Any] = {}
+    # Una sola agregación (persona, fecha) en lugar de un groupby
+    # por persona y otro por fecha dentro de cada persona
+    grupos = df.groupby(["persona_id", "fecha"], observed=True, sort=True)
 
-    for persona_id, df_persona in df.groupby("persona_id"):
-        if not persona_id:
-            continue
+    totales = (
+        grupos[kpi_cols].sum()
+        if kpi_cols
+        else grupos.size().to_frame()[[]]
+    )
 
-        nombre = (
-            df_persona["persona_nombre"].iloc[0]
-            if "persona_nombre" in df_persona.columns
-            else "Sin nombre"
-        )
+    nombres = (
+        df.groupby("persona_id", observed=True)["persona_nombre"].first()
+        if "persona_nombre" in df.columns
+        else None
+    )
 
-        series = []
+    columnas = [totales[c].to_numpy() for c in kpi_cols]
 
-        for fecha, df_fecha in df_persona.groupby("fecha"):
-            kpis_fecha = {
-                c: float(df_fecha[c].sum())
-                if c == "importe"
-                else int(df_fecha[c].sum())
-                for c in kpi_cols
-            }
+    resultado: Dict[str, Any] = {}
+    series = None
 
-            series.append({
-                "fecha": fecha,
-                "key": fecha.isoformat(),
-                "label": fecha.isoformat(),
-                "kpis": kpis_fecha,
-            })
+    for i, (persona_id, fecha) in enumerate(totales.index):
+        if not persona_id:
+            continue
 
-        series.sort(key=lambda x: x["fecha"])
+        if persona_id not in resultado:
+            series = []
+            resultado[persona_id] = {
+                "nombre": (
+                    nombres[persona_id]
+                    if nombres is not None
+                    else "Sin nombre"
+                ),
+                "series": series,
+            }
 
-        resultado[persona_id] = {
-            "nombre": nombre,
-            "series": series,
-        }
+        series.append({
+            "fecha": fecha,
+            "key": fecha.isoformat(),
+            "label": fecha.isoformat(),
+            "kpis": {
+                c: float(v[i]) if c == "importe" else int(v[i])
+                for c, v in zip(kpi_cols, columnas)
+            },
+        })
 
     return resultado
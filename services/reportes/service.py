@@ -1,8 +1,12 @@
+import hashlib
+import time
+
 import pandas as pd
+from datetime import date, timedelta
 
 from db.mongo.reportes.predicates import (rango_fechas,combinar_filtros,)
 
-from services.reportes.data.loader import (cargar_devoluciones_detalle,)
+from services.reportes.data.loader import (cargar_en_paralelo,cargar_devoluciones_detalle,cargar_devoluciones_rollup,cargar_devoluciones_materializado,)
 
 from services.reportes.data.dataframe import (obtener_dataframe,)
 
@@ -10,7 +14,9 @@ from services.reportes.normalization.flow import (normalizar_dataframe,)
 
 from services.reportes.kpis import (calcular_kpis_globales,)
 
-from services.reportes.aggregations import (agrupa_por_zona, agrupa_por_pasillo, tabla_final,)
+from services.reportes.aggregations import (construir_cubo, agrupa_por_zona, agrupa_por_pasillo, tabla_final, tabla_columnar, iterar_tabla,)
+
+from services.reportes.formatos import (a_columnar,)
 
 from services.reportes.personas import (agrupar_por_persona,)
 
@@ -22,91 +28,610 @@ from services.reportes.temporal.series import (generar_serie,)
 
 from services.reportes.utils.json import (resultado_vacio,resultado_error)
 
+from services.reportes.utils.cursor import (codificar_cursor,decodificar_cursor,)
+
+from services.reportes.utils.tiempos import (contar,etapa,)
+
+from services.reportes.utils.metricas import (REGISTRO,BUCKETS_BYTES,BUCKETS_FILAS,)
+
+
+# Métricas del service (expuestas en /api/metrics)
+_CONSULTA_SEGUNDOS = REGISTRO.histograma(
+    "reportes_consulta_segundos",
+    "Tiempo de cada consulta de devoluciones a la base",
+    ("modo",),
+)
+_CONSULTA_FILAS = REGISTRO.histograma(
+    "reportes_consulta_filas",
+    "Filas leídas por consulta de devoluciones",
+    ("modo",),
+    buckets=BUCKETS_FILAS,
+)
+_DATAFRAME_BYTES = REGISTRO.histograma(
+    "reportes_dataframe_bytes",
+    "Memoria del DataFrame normalizado por reporte",
+    buckets=BUCKETS_BYTES,
+)
+
 
 class ReportesService:
     """
     Servicio central de reportes (solo lectura).
+
+    MODOS DE CARGA:
+    - "detalle": una fila por artículo (agrupa en Python)
+    - "rollup": cubo día × zona × pasillo agrupado en Mongo
+    - "materializado": días cerrados ya construidos desde
+      devoluciones_rollup_diario; hoy y los días que el cron aún
+      no cubre, en vivo con el rollup
+
+    SECCIONES:
+    - Solo se calculan las secciones pedidas (default: todas)
+    - Sin secciones de personas no se carga personal / asignaciones
+      ni se atribuye persona a cada fila
+    - Un importe desactivado no se calcula en Mongo (sale en 0,
+      con o sin cache diario); piezas siempre se lee: la tabla la
+      emite aunque su KPI esté apagado
+
+    CACHE (opcional):
+    - Si se inyecta un CacheReportes, los resultados se reutilizan
+      por request canonicalizado (fechas, agrupar, kpis, secciones, modo)
+    - Si se inyecta un CacheDias, solo se consultan en Mongo los
+      días que no estén ya agregados o cuya marca de agua cambió
+      (debe ser uno por modo)
+    - Si se inyecta un CacheDimensiones, personal y asignaciones
+      solo se recargan cuando su versión cambia
+    - Si se inyecta un cache de marcas (TTL corto), la marca de agua
+      de un rango se reutiliza sin consultar Mongo
     """
 
-    def __init__(self, reportes_queries):
-        self.reportes_queries = reportes_queries
+    MODOS = ("detalle", "rollup", "materializado")
+
+    # Formatos de salida (ver services/reportes/formatos)
+    FORMATOS = ("legacy", "columnar")
+
+    # Secciones del reporte (orden de salida)
+    SECCIONES = (
+        "resumen",
+        "general",
+        "por_zona",
+        "por_pasillo",
+        "personas",
+        "por_persona",
+        "personas_series",
+        "tabla",
+    )
+
+    # Días de la primera ventana de tabla_pagina (se duplica
+    # hasta juntar la página)
+    VENTANA_TABLA_DIAS = 7
+
+    # Medidas que se leen aunque su KPI esté apagado (las emite la
+    # tabla); un importe apagado sale en 0 igual (normalizar_columnas)
+    MEDIDAS_SIEMPRE = ("piezas", "devoluciones")
+
+    # Días por ventana de generar_tabla (streaming)
+    VENTANA_STREAM_DIAS = 7
+
+    # Secciones que requieren personal / asignaciones
+    SECCIONES_PERSONAS = ("general", "personas", "por_persona", "personas_series")
+
+    def __init__(
+        self,
+        reportes_queries,
+        modo="detalle",
+        cache=None,
+        cache_dias=None,
+        dimensiones=None,
+        marcas=None,
+    ):
+        if modo not in self.MODOS:
+            raise ValueError(f"Modo de carga inválido: {modo!r}")
 
-    def generar(self, desde, hasta, agrupar="Mes", kpis=None):
+        self.reportes_queries = reportes_queries
+        self.modo = modo
+        self.cache = cache
+        self.cache_dias = cache_dias
+        self.dimensiones = dimensiones
+        self.marcas = marcas
+
+    def generar(
+        self,
+        desde,
+        hasta,
+        agrupar="Mes",
+        kpis=None,
+        marca=None,
+        secciones=None,
+        formato="legacy",
+        marcas=None,
+    ):
+        """
+        formato: "legacy" (puntos / filas) o "columnar" (arreglos
+        paralelos). El columnar arma las tablas directo del cubo y
+        se cachea aparte: un hit no vuelve a convertir nada.
+
+        marca: marca de agua de los datos (ver marca_agua). Si viene,
+        forma parte de la clave de cache: un back-fill en el rango
+        cambia la clave, y el recálculo vuelve a pedir los días cuya
+        marca cambió (CacheDias / rollup materializado).
+
+        marcas: { día: marca } ya consultadas en el request (ver
+        marcas_dias); se reutilizan al cargar en vez de volver a
+        pedirlas. None → se consultan si hacen falta.
+
+        secciones: subconjunto de SECCIONES a calcular (None = todas).
+        Las no pedidas no se calculan ni aparecen en el resultado.
+        """
+        if formato not in self.FORMATOS:
+            raise ValueError(f"Formato inválido: {formato!r}")
 
         kpis = self._normalizar_kpis(kpis)
+        secciones = self._normalizar_secciones(secciones)
 
         desde, hasta = self._normalizar_fechas(desde, hasta)
         if not desde or not hasta or desde > hasta:
-            return resultado_error(kpis, "Rango de fechas inválido")
+            return self._formatear(
+                self._recortar(
+                    resultado_error(kpis, "Rango de fechas inválido"), secciones
+                ),
+                formato,
+            )
+
+        def calcular():
+            return self._formatear(
+                self._generar(
+                    desde, hasta, agrupar, kpis, secciones, formato, marcas
+                ),
+                formato,
+            )
+
+        if self.cache is None:
+            return calcular()
+
+        return self.cache.obtener(
+            self._clave_cache(
+                desde, hasta, agrupar, kpis, marca, secciones, formato
+            ),
+            calcular,
+        )
 
-        filtros = combinar_filtros(
-            rango_fechas(desde, hasta)
+    def marcas_dias(self, desde, hasta):
+        """
+        { día: marca } de devoluciones del rango (ver marcas_por_dia).
+
+        La ruta las pide UNA vez por request y las pasa a marca_agua
+        y a generar (marcas=...): el agregado no se repite.
+
+        Rango inválido → None.
+        """
+        desde, hasta = self._normalizar_fechas(desde, hasta)
+        if not desde or not hasta or desde > hasta:
+            return None
+
+        return self._marcas_dias(desde, hasta)
+
+    def marca_agua(self, desde, hasta, marcas=None):
+        """
+        Huella barata de los datos que alimentan un reporte:
+        marcas por día de devoluciones del rango (resumidas) +
+        versiones de personal y asignaciones.
+
+        marcas: las de marcas_dias si ya se pidieron (None → se
+        consultan). Con caches inyectados no consulta Mongo dentro
+        de sus TTL (marcas / dimensiones).
+
+        Rango inválido → None.
+        """
+        desde, hasta = self._normalizar_fechas(desde, hasta)
+        if not desde or not hasta or desde > hasta:
+            return None
+
+        if marcas is None:
+            marcas = self._marcas_dias(desde, hasta)
+
+        return (
+            self._resumir_marcas(marcas),
+            *self._versiones_dimensiones(),
         )
 
-        raw = cargar_devoluciones_detalle(
-            self.reportes_queries,
-            filtros
+    def _generar(
+        self,
+        desde,
+        hasta,
+        agrupar,
+        kpis,
+        secciones=SECCIONES,
+        formato="legacy",
+        marcas=None,
+    ):
+        """
+        Cálculo del reporte (sin cache), solo de las secciones pedidas.
+        Recibe fechas, kpis y secciones ya normalizados.
+
+        formato="columnar": las tablas salen en columnas del cubo
+        (el resto lo convierte _formatear).
+        """
+        con_personas = any(s in secciones for s in self.SECCIONES_PERSONAS)
+
+        # I/O independiente → concurrente (una sola vez por request)
+        datos = cargar_en_paralelo(
+            raw=lambda: self._cargar_devoluciones(desde, hasta, kpis, marcas),
+            **(self._cargas_dimensiones() if con_personas else {}),
         )
 
+        raw = datos["raw"]
+
         if raw is None or raw.empty:
-            return resultado_vacio(kpis, desde, hasta, agrupar)
+            return self._recortar(
+                resultado_vacio(kpis, desde, hasta, agrupar), secciones
+            )
+
+        asignaciones = datos.get("asignaciones")
+        personas_map = datos.get("personas_map")
+
+        # Sin secciones de personas no se atribuye nada
+        with etapa("dataframe") as e:
+            df = obtener_dataframe(
+                raw,
+                asignaciones=asignaciones,
+                personas_map=personas_map,
+                indice=datos.get("indice"),
+            )
+            e.filas = contar(df)
+
+        if df is None or df.empty:
+            return self._recortar(
+                resultado_vacio(kpis, desde, hasta, agrupar), secciones
+            )
+
+        with etapa("normalizacion"):
+            df = normalizar_dataframe(df, kpis)
 
-        asignaciones = self.reportes_queries.asignaciones_personal()
-        personas_map = self.reportes_queries.personas_activas()
+        _DATAFRAME_BYTES.observe(int(df.memory_usage(deep=False).sum()))
 
-        df = obtener_dataframe(
-            raw,
-            asignaciones=asignaciones,
-            personas_map=personas_map,
+        # Filas crudas → cubo (única pasada sobre el detalle)
+        with etapa("cubo") as e:
+            cubo = construir_cubo(df)
+            e.filas = contar(cubo)
+
+        # Cada sección se evalúa solo si se pidió
+        periodo = map_periodo(agrupar)
+        tabla = tabla_columnar if formato == "columnar" else tabla_final
+
+        calculos = {
+            "resumen": lambda: calcular_kpis_globales(cubo, kpis),
+            "general": lambda: {
+                "periodo": periodo,
+                "serie": generar_serie(cubo, desde, hasta, periodo),
+            },
+            "por_zona": lambda: agrupa_por_zona(cubo, kpis),
+            "por_pasillo": lambda: agrupa_por_pasillo(cubo, kpis),
+            "personas": lambda: personas_map,
+            "por_persona": lambda: agrupar_por_persona(
+                asignaciones,
+                cubo,
+                desde,
+                hasta,
+                kpis,
+                tabla=tabla,
+            ),
+            "personas_series": lambda: agrupar_personas_por_fecha(cubo, kpis),
+            "tabla": lambda: tabla(cubo),
+        }
+
+        resultado = {"kpis": kpis}
+
+        for seccion in secciones:
+            with etapa(seccion) as e:
+                resultado[seccion] = calculos[seccion]()
+                e.filas = self._filas_seccion(seccion, resultado[seccion])
+
+        return resultado
+
+    def generar_tabla(self, desde, hasta, kpis=None):
+        """
+        Tabla de detalle como ITERADOR de filas (streaming).
+
+        Recorre el rango en ventanas de VENTANA_STREAM_DIAS días:
+        cada ventana se carga, normaliza, agrupa y emite antes de
+        consultar la siguiente (memoria acotada por ventana, no por
+        rango). Mismas filas y orden que tabla_final: la tabla
+        ordena primero por fecha.
+
+        No resuelve personas: la tabla no las usa.
+        Rango inválido o sin datos → iterador vacío.
+        """
+        kpis = self._normalizar_kpis(kpis)
+
+        desde, hasta = self._normalizar_fechas(desde, hasta)
+        if not desde or not hasta or desde > hasta:
+            return iter(())
+
+        return self._iterar_ventanas_tabla(desde, hasta, kpis)
+
+    def _iterar_ventanas_tabla(self, desde, hasta, kpis):
+        # Marcas del rango completo, una sola vez (no una por ventana)
+        marcas = (
+            self._marcas_dias(desde, hasta) if self._necesita_marcas() else None
         )
+        inicio = desde
 
-        if df is None or df.empty:
-            return resultado_vacio(kpis, desde, hasta, agrupar)
+        while inicio <= hasta:
+            fin = min(hasta, inicio + timedelta(days=self.VENTANA_STREAM_DIAS - 1))
 
-        df = normalizar_dataframe(df, kpis)
+            raw = self._cargar_devoluciones(inicio, fin, kpis, marcas)
+            df = None if raw is None or raw.empty else obtener_dataframe(raw)
 
-        resumen = calcular_kpis_globales(df, kpis)
+            if df is not None and not df.empty:
+                df = normalizar_dataframe(df, kpis)
+                _DATAFRAME_BYTES.observe(int(df.memory_usage(deep=False).sum()))
 
-        periodo = map_periodo(agrupar)
+                yield from iterar_tabla(construir_cubo(df))
 
-        general = generar_serie(
-            df,
-            desde,
-            hasta,
-            periodo
+            inicio = fin + timedelta(days=1)
+
+    # ─────────────────────────────
+    # PAGINACIÓN (KEYSET)
+    # ─────────────────────────────
+    def resumen_pagina(self, desde, hasta, cursor=None, limite=50):
+        """
+        Página del resumen administrativo (fecha, folio DESC).
+
+        RETORNA:
+        { "items": [...], "siguiente": str | None, "limite": int }
+
+        Cursor inválido → ValueError.
+        """
+        desde, hasta = self._normalizar_fechas(desde, hasta)
+        if not desde or not hasta or desde > hasta:
+            return {"items": [], "siguiente": None, "limite": limite}
+
+        df = self.reportes_queries.devoluciones_resumen_pagina(
+            combinar_filtros(rango_fechas(desde, hasta)),
+            cursor=decodificar_cursor(cursor, ("fecha", "folio")),
+            limite=limite + 1,
         )
 
-        por_persona = agrupar_por_persona(
-            self.reportes_queries,
-            df,
+        hay_mas = len(df) > limite
+        df = df.iloc[:limite]
+
+        siguiente = None
+        if hay_mas:
+            ultima = df.iloc[-1]
+            siguiente = codificar_cursor({
+                "fecha": pd.Timestamp(ultima["fecha"]).to_pydatetime(),
+                "folio": ultima["folio"],
+            })
+
+        return {
+            "items": df.to_dict(orient="records"),
+            "siguiente": siguiente,
+            "limite": limite,
+        }
+
+    def tabla_pagina(self, desde, hasta, cursor=None, limite=200, kpis=None):
+        """
+        Página de la tabla detalle al grano (día, zona, pasillo) ASC.
+
+        RETORNA:
+        { "items": [...], "siguiente": str | None, "limite": int }
+
+        Cursor inválido → ValueError.
+        """
+        kpis = self._normalizar_kpis(kpis)
+
+        desde, hasta = self._normalizar_fechas(desde, hasta)
+        if not desde or not hasta or desde > hasta:
+            return {"items": [], "siguiente": None, "limite": limite}
+
+        raw = self._tabla_ventanas(
             desde,
             hasta,
-            kpis,
+            decodificar_cursor(cursor, ("fecha", "zona", "pasillo")),
+            limite + 1,
         )
 
-        personas_series = agrupar_personas_por_fecha(
-            df,
-            kpis
-        )
+        if raw is None or raw.empty:
+            return {"items": [], "siguiente": None, "limite": limite}
+
+        hay_mas = len(raw) > limite
+        # Copia de la página (acotada por 'limite'): obtener_dataframe
+        # la modifica en sitio y no debe escribir sobre una vista
+        raw = raw.iloc[:limite].copy()
+
+        siguiente = None
+        if hay_mas:
+            ultima = raw.iloc[-1]
+            siguiente = codificar_cursor({
+                "fecha": pd.Timestamp(ultima["fecha"]).to_pydatetime(),
+                "zona": ultima["zona"],
+                "pasillo": ultima["pasillo"],
+            })
+
+        items = []
+        df = obtener_dataframe(raw)
+        if df is not None and not df.empty:
+            items = tabla_final(normalizar_dataframe(df, kpis))
 
         return {
-            "kpis": kpis,
-            "resumen": resumen,
-            "general": {
-                "periodo": periodo,
-                "serie": general,
-            },
-            "por_zona": agrupa_por_zona(df, kpis),
-            "por_pasillo": agrupa_por_pasillo(df, kpis),
-            "personas": personas_map,
-            "por_persona": por_persona,
-            "personas_series": personas_series,
-            "tabla": tabla_final(df),
+            "items": items,
+            "siguiente": siguiente,
+            "limite": limite,
         }
 
+    def _tabla_ventanas(self, desde, hasta, cursor, limite):
+        """
+        Hasta 'limite' filas de la tabla a partir del cursor.
+
+        Consulta ventanas de días consecutivas y crecientes
+        (VENTANA_TABLA_DIAS, luego ×2) hasta juntar 'limite' filas
+        o llegar a 'hasta': cada consulta agrupa solo su ventana,
+        así el costo de una página no depende del resto del rango.
+        """
+        inicio = max(desde, cursor["fecha"].date()) if cursor else desde
+        dias = self.VENTANA_TABLA_DIAS
+
+        partes = []
+        faltan = limite
+
+        while inicio <= hasta and faltan > 0:
+            fin = min(hasta, inicio + timedelta(days=dias - 1))
+
+            parte = self.reportes_queries.devoluciones_tabla_pagina(
+                combinar_filtros(rango_fechas(inicio, fin)),
+                cursor=cursor,
+                limite=faltan,
+            )
+
+            if parte is not None and not parte.empty:
+                partes.append(parte)
+                faltan -= len(parte)
+
+            inicio = fin + timedelta(days=1)
+            dias *= 2
+
+        if not partes:
+            return None
+
+        if len(partes) == 1:
+            return partes[0]
+
+        return pd.concat(partes, ignore_index=True)
+
     # ─────────────────────────────
     # HELPERS
     # ─────────────────────────────
+    def _cargas_dimensiones(self):
+        q = self.reportes_queries
+
+        if self.dimensiones is None:
+            return {
+                "asignaciones": q.asignaciones_personal,
+                "personas_map": q.personas_activas,
+            }
+
+        return {
+            "asignaciones": lambda: self.dimensiones.asignaciones(q),
+            "personas_map": lambda: self.dimensiones.personas(q),
+            "indice": lambda: self.dimensiones.indice_asignaciones(q),
+        }
+
+    def _versiones_dimensiones(self):
+        q = self.reportes_queries
+
+        if self.dimensiones is None:
+            return q.version_personas(), q.version_asignaciones()
+
+        return (
+            self.dimensiones.version_personas(q),
+            self.dimensiones.version_asignaciones(q),
+        )
+
+    def _marcas_dias(self, desde, hasta):
+        """
+        { día: marca } de devoluciones en [desde, hasta]
+        (cache de marcas si está inyectado).
+        """
+        def consultar():
+            return self.reportes_queries.marcas_por_dia(
+                combinar_filtros(rango_fechas(desde, hasta))
+            )
+
+        if self.marcas is None:
+            return consultar()
+
+        return self.marcas.obtener((desde, hasta), consultar)
+
+    def _resumir_marcas(self, marcas):
+        """
+        Marcas por día → (total, huella corta) para ETag / clave de cache.
+        """
+        huella = hashlib.sha256(repr(sorted(marcas.items())).encode())
+        return (
+            sum(n for n, _ in marcas.values()),
+            huella.hexdigest()[:16],
+        )
+
+    def _necesita_marcas(self):
+        return self.cache_dias is not None or self.modo == "materializado"
+
+    def _cargar_devoluciones(self, desde, hasta, kpis, marcas=None):
+        modo = self.modo
+
+        # El cache diario guarda todas las medidas (lo comparten
+        # requests con distintos kpis); sin él se omiten las
+        # apagadas que no cambian la salida (ver MEDIDAS_SIEMPRE).
+        medidas = (
+            None
+            if self.cache_dias is not None
+            else tuple(
+                k for k, v in kpis.items() if v or k in self.MEDIDAS_SIEMPRE
+            )
+        )
+
+        # Marcas por día: validan el cache diario y los días del
+        # rollup materializado (un back-fill los vuelve a pedir).
+        # Si el request ya las trae no se vuelven a consultar.
+        if marcas is None and self._necesita_marcas():
+            marcas = self._marcas_dias(desde, hasta)
+
+        if modo == "materializado":
+            def consultar(d1, d2):
+                return cargar_devoluciones_materializado(
+                    self.reportes_queries, d1, d2, date.today(),
+                    medidas=medidas,
+                    marcas=marcas,
+                )
+        else:
+            cargar = (
+                cargar_devoluciones_rollup
+                if modo == "rollup"
+                else cargar_devoluciones_detalle
+            )
+
+            def consultar(d1, d2):
+                filtros = combinar_filtros(
+                    rango_fechas(d1, d2)
+                )
+                return cargar(self.reportes_queries, filtros, medidas)
+
+        # Consulta a la base (con cache diario: solo los días faltantes)
+        def cargar_rango(d1, d2):
+            inicio = time.perf_counter()
+            with etapa("consulta") as e:
+                raw = consultar(d1, d2)
+                e.filas = filas = contar(raw)
+
+            _CONSULTA_SEGUNDOS.observe(time.perf_counter() - inicio, modo=modo)
+            _CONSULTA_FILAS.observe(filas or 0, modo=modo)
+            return raw
+
+        if self.cache_dias is None:
+            return cargar_rango(desde, hasta)
+
+        return self.cache_dias.cargar(cargar_rango, desde, hasta, marcas=marcas)
+
+    def _formatear(self, resultado, formato):
+        if formato != "columnar":
+            return resultado
+
+        with etapa("formato"):
+            return a_columnar(resultado)
+
+    def _filas_seccion(self, seccion, valor):
+        """
+        Filas de una sección para Server-Timing
+        (puntos de la serie general; nada para el resumen).
+        """
+        if seccion == "resumen":
+            return None
+        if seccion == "general":
+            return contar(valor.get("serie"))
+        if seccion == "tabla" and isinstance(valor, dict):
+            return contar(valor.get("fecha"))
+        return contar(valor)
+
     def _normalizar_kpis(self, kpis):
         if not kpis:
             return {
@@ -120,6 +645,53 @@ class ReportesService:
             "devoluciones": bool(kpis.get("devoluciones", True)),
         }
 
+    def _normalizar_secciones(self, secciones):
+        """
+        None / vacío → todas. Devuelve una tupla en orden de SECCIONES.
+        """
+        if not secciones:
+            return self.SECCIONES
+
+        invalidas = set(secciones) - set(self.SECCIONES)
+        if invalidas:
+            raise ValueError(f"Secciones inválidas: {sorted(invalidas)}")
+
+        return tuple(s for s in self.SECCIONES if s in secciones)
+
+    def _recortar(self, resultado, secciones):
+        """
+        Deja solo kpis / error y las secciones pedidas.
+        """
+        if secciones == self.SECCIONES:
+            return resultado
+
+        return {
+            k: v
+            for k, v in resultado.items()
+            if k in ("kpis", "error") or k in secciones
+        }
+
+    def _clave_cache(
+        self,
+        desde,
+        hasta,
+        agrupar,
+        kpis,
+        marca=None,
+        secciones=SECCIONES,
+        formato="legacy",
+    ):
+        return (
+            self.modo,
+            desde.isoformat(),
+            hasta.isoformat(),
+            agrupar,
+            tuple(sorted(kpis.items())),
+            marca,
+            secciones,
+            formato,
+        )
+
     def _normalizar_fechas(self, desde, hasta):
         d = pd.to_datetime(desde, errors="coerce")
         h = pd.to_datetime(hasta, errors="coerce")
@@ -18,32 +18,96 @@ def _punto_vacio(key: str, label: str) -> dict:
     }
 
 
-def _construir_punto(key: str, label: str, bloque: pd.DataFrame) -> dict:
-    personas = []
+_MEDIDAS = ["importe", "piezas", "devoluciones"]
 
-    for pid, p in bloque.groupby("persona_id", dropna=False):
-        personas.append({
-            "id": pid,
-            "nombre": p["persona_nombre"].iloc[0],
-            "kpis": {
-                "importe": float(p["importe"].sum()),
-                "piezas": int(p["piezas"].sum()),
-                "devoluciones": int(p["devoluciones"].sum()),
-            }
-        })
 
+def _punto(key: str, label: str, totales, personas: list) -> dict:
     return {
         "key": key,
         "label": label,
         "kpis": {
-            "importe": float(bloque["importe"].sum()),
-            "piezas": int(bloque["piezas"].sum()),
-            "devoluciones": int(bloque["devoluciones"].sum()),
+            "importe": float(totales[0]),
+            "piezas": int(totales[1]),
+            "devoluciones": int(totales[2]),
         },
         "personas": personas
     }
 
 
+def _fechas(df: pd.DataFrame) -> pd.Series:
+    """
+    Columna fecha sin zona horaria (las claves se comparan naive).
+    """
+    fechas = df["fecha"]
+    if fechas.dt.tz is not None:
+        fechas = fechas.dt.tz_localize(None)
+    return fechas
+
+
+def _serie_por_claves(
+    df: pd.DataFrame,
+    claves: pd.Series,
+    calendario: list[tuple],
+) -> list[dict]:
+    """
+    Construye la serie completa en UNA pasada sobre las filas.
+
+    - claves: bucket de cada fila (día / lunes / periodo / año)
+    - calendario: [(clave, key, label), ...] en orden de salida
+
+    Agrupa una vez por bucket y una vez por (bucket, persona_id);
+    los buckets sin datos del calendario salen como punto vacío.
+    """
+    claves = claves.rename("__bucket")
+
+    # groupby(...)[cols]: sin copiar las columnas a un DataFrame nuevo
+    totales = df.groupby(claves, observed=True)[_MEDIDAS].sum()
+    pos_totales = {k: i for i, k in enumerate(totales.index)}
+    valores_totales = totales.to_numpy()
+
+    por_persona = (
+        df.groupby([claves, "persona_id"], dropna=False, observed=True)
+        .agg(
+            nombre=("persona_nombre", "first"),
+            importe=("importe", "sum"),
+            piezas=("piezas", "sum"),
+            devoluciones=("devoluciones", "sum"),
+        )
+    )
+
+    personas: dict = {}
+    for (bucket, pid), nombre, importe, piezas, devs in zip(
+        por_persona.index,
+        por_persona["nombre"],
+        por_persona["importe"],
+        por_persona["piezas"],
+        por_persona["devoluciones"],
+    ):
+        personas.setdefault(bucket, []).append({
+            "id": pid,
+            "nombre": nombre,
+            "kpis": {
+                "importe": float(importe),
+                "piezas": int(piezas),
+                "devoluciones": int(devs),
+            }
+        })
+
+    salida = []
+
+    for clave, key, label in calendario:
+        i = pos_totales.get(clave)
+
+        if i is None:
+            salida.append(_punto_vacio(key, label))
+        else:
+            salida.append(
+                _punto(key, label, valores_totales[i], personas[clave])
+            )
+
+    return salida
+
+
 # ======================================================
 # GENERADOR CENTRAL (⬅️ NUEVO)
 # ======================================================
@@ -66,20 +130,14 @@ def serie_por_dia(df: pd.DataFrame, desde: date, hasta: date) -> list[dict]:
     if df is None or df.empty:
         return []
 
-    df = df.copy()
-    df["dia"] = df["fecha"].dt.date
+    claves = _fechas(df).dt.normalize()
 
-    salida = []
+    calendario = [
+        (d, str(d.date()), str(d.date()))
+        for d in pd.date_range(desde, hasta, freq="D")
+    ]
 
-    for d in pd.date_range(desde, hasta, freq="D").date:
-        bloque = df[df["dia"] == d]
-
-        if bloque.empty:
-            salida.append(_punto_vacio(str(d), str(d)))
-        else:
-            salida.append(_construir_punto(str(d), str(d), bloque))
-
-    return salida
+    return _serie_por_claves(df, claves, calendario)
 
 
 # ======================================================
@@ -90,11 +148,8 @@ def serie_por_semana(df: pd.DataFrame, desde: date, hasta: date) -> list[dict]:
     if df is None or df.empty:
         return []
 
-    df = df.copy()
-    df["semana"] = (
-        df["fecha"] -
-        pd.to_timedelta(df["fecha"].dt.weekday, unit="D")
-    ).dt.date
+    fechas = _fechas(df).dt.normalize()
+    claves = fechas - pd.to_timedelta(fechas.dt.weekday, unit="D")
 
     inicio = pd.to_datetime(desde) - pd.to_timedelta(
         pd.to_datetime(desde).weekday(), unit="D"
@@ -103,18 +158,12 @@ def serie_por_semana(df: pd.DataFrame, desde: date, hasta: date) -> list[dict]:
         6 - pd.to_datetime(hasta).weekday(), unit="D"
     )
 
-    salida = []
-
-    for s in pd.date_range(inicio, fin, freq="W-MON").date:
-        bloque = df[df["semana"] == s]
-        label = f"Semana {s}"
+    calendario = [
+        (s, str(s.date()), f"Semana {s.date()}")
+        for s in pd.date_range(inicio, fin, freq="W-MON")
+    ]
 
-        if bloque.empty:
-            salida.append(_punto_vacio(str(s), label))
-        else:
-            salida.append(_construir_punto(str(s), label, bloque))
-
-    return salida
+    return _serie_por_claves(df, claves, calendario)
 
 
 # ======================================================
@@ -125,21 +174,14 @@ def serie_por_mes(df: pd.DataFrame, desde: date, hasta: date) -> list[dict]:
     if df is None or df.empty:
         return []
 
-    df = df.copy()
-    df["mes"] = df["fecha"].dt.to_period("M")
+    claves = _fechas(df).dt.to_period("M")
 
-    salida = []
+    calendario = [
+        (m, str(m), str(m))
+        for m in pd.period_range(desde, hasta, freq="M")
+    ]
 
-    for m in pd.period_range(desde, hasta, freq="M"):
-        bloque = df[df["mes"] == m]
-        key = str(m)
-
-        if bloque.empty:
-            salida.append(_punto_vacio(key, key))
-        else:
-            salida.append(_construir_punto(key, key, bloque))
-
-    return salida
+    return _serie_por_claves(df, claves, calendario)
 
 
 # ======================================================
@@ -150,18 +192,11 @@ def serie_por_anio(df: pd.DataFrame, desde: date, hasta: date) -> list[dict]:
     if df is None or df.empty:
         return []
 
-    df = df.copy()
-    df["anio"] = df["fecha"].dt.year
+    claves = _fechas(df).dt.year
 
-    salida = []
+    calendario = [
+        (a, str(a), str(a))
+        for a in range(desde.year, hasta.year + 1)
+    ]
 
-    for a in range(desde.year, hasta.year + 1):
-        bloque = df[df["anio"] == a]
-        key = str(a)
-
-        if bloque.empty:
-            salida.append(_punto_vacio(key, key))
-        else:
-            salida.append(_construir_punto(key, key, bloque))
-
-    return salida
+    return _serie_por_claves(df, claves, calendario)
@@ -0,0 +1,58 @@
+# services/reportes/utils/cursor.py
+
+import base64
+import json
+from datetime import datetime
+
+
+# ======================================================
+# CURSORES OPACOS PARA PAGINACIÓN KEYSET
+# ======================================================
+
+def codificar_cursor(valores: dict) -> str:
+    """
+    Serializa la clave de la última fila en un token opaco
+    (base64 url-safe). Las fechas viajan como ISO.
+    """
+    plano = {
+        k: (v.isoformat() if isinstance(v, datetime) else v)
+        for k, v in valores.items()
+    }
+    # allow_nan=False: un NaN en la clave nunca sale como cursor
+    crudo = json.dumps(
+        plano, separators=(",", ":"), allow_nan=False
+    ).encode("utf-8")
+    return base64.urlsafe_b64encode(crudo).decode("ascii").rstrip("=")
+
+
+def decodificar_cursor(token: str | None, campos: tuple) -> dict | None:
+    """
+    Inverso de codificar_cursor.
+
+    - campos: claves obligatorias del cursor
+    - 'fecha' se reconvierte a datetime
+    - NaN / Infinity se rechazan: en Mongo {"$gt": NaN} no compara
+      contra Strings y la página siguiente perdería filas
+    - Token inválido → ValueError
+    """
+    if not token:
+        return None
+
+    try:
+        relleno = "=" * (-len(token) % 4)
+        plano = json.loads(
+            base64.urlsafe_b64decode(token + relleno),
+            parse_constant=_no_finito,
+        )
+        cursor = {c: plano[c] for c in campos}
+
+        if "fecha" in cursor:
+            cursor["fecha"] = datetime.fromisoformat(cursor["fecha"])
+    except (ValueError, KeyError, TypeError) as exc:
+        raise ValueError("Cursor de paginación inválido") from exc
+
+    return cursor
+
+
+def _no_finito(constante: str):
+    raise ValueError(f"Valor no finito en cursor: {constante}")
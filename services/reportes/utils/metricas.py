@@ -0,0 +1,240 @@
+# services/reportes/utils/metricas.py
+
+import bisect
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Tuple
+
+
+# ======================================================
+# REGISTRO DE MÉTRICAS (formato texto de Prometheus)
+# ======================================================
+#
+# Registro propio y mínimo (sin dependencia de prometheus_client):
+# - Contador:   solo sube (sufijo _total)
+# - Indicador:  valor instantáneo (sube / baja)
+# - Histograma: buckets acumulados + _sum + _count
+# - Recolector: función que entrega muestras al momento del
+#   scrape (p.ej. estadísticas de caches que ya se llevan aparte)
+#
+# Cada serie se identifica por los VALORES de sus etiquetas,
+# en el orden declarado al crear la métrica.
+
+# Segundos: de 5 ms a 1 min
+BUCKETS_SEGUNDOS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+# Filas: de 10 a 5 millones
+BUCKETS_FILAS = (
+    10, 100, 1_000, 5_000, 10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000,
+)
+
+# Bytes: de 1 KiB a 1 GiB (×4)
+BUCKETS_BYTES = tuple(1024 * 4 ** i for i in range(11))
+
+
+def _escapar(valor) -> str:
+    return (
+        str(valor)
+        .replace("\\", "\\\\")
+        .replace("\n", "\\n")
+        .replace('"', '\\"')
+    )
+
+
+def _etiquetas(nombres: Tuple[str, ...], valores: Tuple, extra: str = "") -> str:
+    partes = [f'{n}="{_escapar(v)}"' for n, v in zip(nombres, valores)]
+    if extra:
+        partes.append(extra)
+    return "{" + ",".join(partes) + "}" if partes else ""
+
+
+def _numero(valor: float) -> str:
+    if math.isinf(valor):
+        return "+Inf" if valor > 0 else "-Inf"
+    if float(valor).is_integer():
+        return str(int(valor))
+    return repr(float(valor))
+
+
+class _Metrica:
+    tipo = ""
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Iterable[str] = ()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple, object] = {}
+
+    def _clave(self, etiquetas: Dict) -> Tuple:
+        if set(etiquetas) != set(self.etiquetas):
+            raise ValueError(
+                f"{self.nombre}: etiquetas {sorted(etiquetas)} "
+                f"≠ {sorted(self.etiquetas)}"
+            )
+        return tuple(str(etiquetas[n]) for n in self.etiquetas)
+
+    def exponer(self) -> List[str]:
+        lineas = [
+            f"# HELP {self.nombre} {self.ayuda}",
+            f"# TYPE {self.nombre} {self.tipo}",
+        ]
+        with self._lock:
+            series = sorted(self._series.items())
+        for valores, serie in series:
+            lineas += self._lineas(valores, serie)
+        return lineas
+
+    def _lineas(self, valores, serie) -> List[str]:
+        return [f"{self.nombre}{_etiquetas(self.etiquetas, valores)} {_numero(serie)}"]
+
+
+class Contador(_Metrica):
+    tipo = "counter"
+
+    def inc(self, valor: float = 1, **etiquetas) -> None:
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._series[clave] = self._series.get(clave, 0) + valor
+
+
+class Indicador(_Metrica):
+    tipo = "gauge"
+
+    def set(self, valor: float, **etiquetas) -> None:
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._series[clave] = valor
+
+    def inc(self, valor: float = 1, **etiquetas) -> None:
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._series[clave] = self._series.get(clave, 0) + valor
+
+    def dec(self, valor: float = 1, **etiquetas) -> None:
+        self.inc(-valor, **etiquetas)
+
+
+class Histograma(_Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nombre, ayuda, etiquetas=(), buckets=BUCKETS_SEGUNDOS):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, valor: float, **etiquetas) -> None:
+        clave = self._clave(etiquetas)
+        # Primer bucket con límite ≥ valor (le = "menor o igual")
+        i = bisect.bisect_left(self.buckets, valor)
+
+        with self._lock:
+            serie = self._series.get(clave)
+            if serie is None:
+                # [conteos por bucket (+Inf al final), suma]
+                serie = self._series[clave] = [[0] * (len(self.buckets) + 1), 0.0]
+            serie[0][i] += 1
+            serie[1] += valor
+
+    def _lineas(self, valores, serie) -> List[str]:
+        conteos, suma = serie
+        base = self.nombre
+        lineas = []
+
+        acumulado = 0
+        for limite, n in zip((*self.buckets, math.inf), conteos):
+            acumulado += n
+            le = f'le="{_numero(limite)}"'
+            lineas.append(
+                f"{base}_bucket{_etiquetas(self.etiquetas, valores, le)} {acumulado}"
+            )
+
+        etiquetas = _etiquetas(self.etiquetas, valores)
+        lineas.append(f"{base}_sum{etiquetas} {_numero(suma)}")
+        lineas.append(f"{base}_count{etiquetas} {acumulado}")
+        return lineas
+
+
+class Registro:
+    """
+    Conjunto de métricas del proceso.
+
+    Las métricas se crean una vez (a nivel de módulo) y se
+    reutilizan: crear dos veces el mismo nombre devuelve la misma.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metricas: Dict[str, _Metrica] = {}
+        self._recolectores: List[Callable[[], List[str]]] = []
+
+    def _crear(self, clase, nombre, *args, **kwargs):
+        with self._lock:
+            metrica = self._metricas.get(nombre)
+            if metrica is None:
+                metrica = self._metricas[nombre] = clase(nombre, *args, **kwargs)
+            elif not isinstance(metrica, clase):
+                raise ValueError(f"Métrica {nombre!r} ya existe con otro tipo")
+            return metrica
+
+    def contador(self, nombre, ayuda, etiquetas=()) -> Contador:
+        return self._crear(Contador, nombre, ayuda, etiquetas)
+
+    def indicador(self, nombre, ayuda, etiquetas=()) -> Indicador:
+        return self._crear(Indicador, nombre, ayuda, etiquetas)
+
+    def histograma(self, nombre, ayuda, etiquetas=(), buckets=BUCKETS_SEGUNDOS) -> Histograma:
+        return self._crear(Histograma, nombre, ayuda, etiquetas, buckets=buckets)
+
+    def recolector(self, fn: Callable[[], List[str]]) -> None:
+        """
+        fn() → líneas de texto ya formateadas (ver muestras()).
+        Se llama en cada scrape; un error solo omite sus líneas.
+        """
+        with self._lock:
+            self._recolectores.append(fn)
+
+    def exponer(self) -> str:
+        """
+        Todas las métricas en formato texto de Prometheus (0.0.4).
+        """
+        with self._lock:
+            metricas = list(self._metricas.values())
+            recolectores = list(self._recolectores)
+
+        lineas = []
+        for metrica in metricas:
+            lineas += metrica.exponer()
+
+        for fn in recolectores:
+            try:
+                lineas += fn()
+            except Exception:
+                continue
+
+        return "\n".join(lineas) + "\n"
+
+
+def muestras(
+    nombre: str,
+    tipo: str,
+    ayuda: str,
+    valores: Iterable[Tuple[Dict, float]],
+) -> List[str]:
+    """
+    Líneas de una métrica calculada al vuelo (para recolectores).
+
+    valores: [(etiquetas, valor), ...]
+    """
+    lineas = [f"# HELP {nombre} {ayuda}", f"# TYPE {nombre} {tipo}"]
+    for etiquetas, valor in valores:
+        lineas.append(
+            f"{nombre}{_etiquetas(tuple(etiquetas), tuple(etiquetas.values()))} "
+            f"{_numero(valor)}"
+        )
+    return lineas
+
+
+# Registro compartido por el proceso
+REGISTRO = Registro()
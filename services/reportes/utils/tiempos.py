@@ -0,0 +1,137 @@
+# services/reportes/utils/tiempos.py
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+# ======================================================
+# TIEMPOS POR ETAPA (Server-Timing)
+# ======================================================
+#
+# Cada request que quiere medirse abre colectar(); las etapas
+# del service / loader se envuelven con etapa(nombre).
+#
+# Sin colector activo, etapa() no toma tiempos ni reserva
+# nada: solo consulta una ContextVar.
+
+_colector: ContextVar["Colector | None"] = ContextVar(
+    "reportes_tiempos", default=None
+)
+
+
+class _Etapa:
+    """
+    Etapa en curso. El código medido puede fijar 'filas'.
+    """
+
+    __slots__ = ("filas",)
+
+    def __init__(self):
+        self.filas = None
+
+
+# Etapa compartida cuando no se mide (asignar 'filas' no tiene efecto)
+_NULA = _Etapa()
+
+
+class Colector:
+    """
+    Tiempos (ms) y filas por etapa de UN request.
+
+    - Etapas repetidas (p.ej. varias cargas por rango) se suman
+    - Thread-safe: las cargas en paralelo escriben aquí
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inicio = time.perf_counter()
+        self.etapas: dict = {}   # nombre → [ms, filas | None]
+
+    def agregar(self, nombre: str, ms: float, filas: int | None = None) -> None:
+        with self._lock:
+            actual = self.etapas.setdefault(nombre, [0.0, None])
+            actual[0] += ms
+            if filas is not None:
+                actual[1] = (actual[1] or 0) + filas
+
+    def header(self) -> str:
+        """
+        Valor del header Server-Timing, en orden de registro:
+        nombre;dur=ms[;desc="N filas"]
+
+        Agrega 'total': tiempo desde colectar() hasta ahora.
+        """
+        with self._lock:
+            etapas = list(self.etapas.items())
+
+        partes = []
+        for nombre, (ms, filas) in etapas:
+            parte = f"{nombre};dur={ms:.1f}"
+            if filas is not None:
+                parte += f';desc="{filas} filas"'
+            partes.append(parte)
+
+        total = (time.perf_counter() - self._inicio) * 1000
+        partes.append(f"total;dur={total:.1f}")
+
+        return ", ".join(partes)
+
+
+@contextmanager
+def colectar(activo: bool = True):
+    """
+    Activa la medición en el contexto actual.
+
+    Entrega el Colector (o None si activo=False).
+    """
+    if not activo:
+        yield None
+        return
+
+    colector = Colector()
+    token = _colector.set(colector)
+    try:
+        yield colector
+    finally:
+        _colector.reset(token)
+
+
+@contextmanager
+def etapa(nombre: str):
+    """
+    Mide el bloque como la etapa 'nombre'.
+
+        with etapa("dataframe") as e:
+            df = obtener_dataframe(raw)
+            e.filas = len(df)
+
+    El tiempo se registra aunque el bloque falle.
+    """
+    colector = _colector.get()
+
+    if colector is None:
+        yield _NULA
+        return
+
+    actual = _Etapa()
+    inicio = time.perf_counter()
+    try:
+        yield actual
+    finally:
+        colector.agregar(
+            nombre,
+            (time.perf_counter() - inicio) * 1000,
+            actual.filas,
+        )
+
+
+def contar(valor) -> int | None:
+    """
+    Filas de un resultado (DataFrame, list, dict); None si no aplica.
+    """
+    try:
+        return len(valor)
+    except TypeError:
+        return None
@@ -0,0 +1,80 @@
+"""
+Diagnóstico: rutas de admin cerradas sin token y cola de
+explains acotada.
+"""
+
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.routes import admin
+from db.mongo.reportes.explain import MonitorConsultas
+from main import create_app
+
+
+@pytest.fixture
+def cliente():
+    return TestClient(create_app())
+
+
+def test_admin_sin_token_configurado_es_404(cliente, monkeypatch):
+    monkeypatch.setattr(admin, "REPORTES_ADMIN_TOKEN", "")
+
+    assert cliente.get("/api/admin/consultas").status_code == 404
+    assert cliente.delete("/api/admin/consultas").status_code == 404
+
+
+def test_admin_exige_token(cliente, monkeypatch):
+    monkeypatch.setattr(admin, "REPORTES_ADMIN_TOKEN", "secreto")
+
+    assert cliente.get("/api/admin/consultas").status_code == 401
+    assert cliente.get(
+        "/api/admin/consultas", headers={"X-Admin-Token": "otro"}
+    ).status_code == 401
+    assert cliente.get(
+        "/api/admin/consultas", headers={"X-Admin-Token": "secreto"}
+    ).status_code == 200
+
+
+class _Coleccion:
+    """
+    Colección falsa cuyo explain se bloquea hasta 'liberar'.
+    """
+
+    name = "devoluciones"
+
+    def __init__(self):
+        self.liberar = threading.Event()
+        self.explains = 0
+        self.database = self
+
+    def command(self, *args, **kwargs):
+        self.explains += 1
+        self.liberar.wait(5)
+        return {}
+
+
+def test_cola_de_explains_acotada_y_cerrar_no_espera():
+    monitor = MonitorConsultas(explain_todas=True, max_cola=3)
+    col = _Coleccion()
+
+    for _ in range(50):
+        monitor.observar("detalle", col, [], 1.0, 0)
+
+    stats = monitor.stats()
+    assert stats["pendientes"] == 3
+    assert stats["descartadas"] == 47
+
+    inicio = time.perf_counter()
+    monitor.cerrar()
+    assert time.perf_counter() - inicio < 1
+
+    col.liberar.set()
+    monitor._executor.shutdown(wait=True)
+
+    # A lo sumo el que ya corría llegó a ejecutarse
+    assert col.explains <= 1
+    monitor.observar("detalle", col, [], 1.0, 0)
+    assert monitor.stats()["descartadas"] == 48
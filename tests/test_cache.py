@@ -0,0 +1,120 @@
+"""
+CacheReportes: TTL, ventana stale-while-revalidate, LRU y
+errores de refresco (reloj inyectado).
+"""
+
+import threading
+import time
+
+import pytest
+
+from services.reportes.cache import CacheReportes
+
+
+class Reloj:
+    def __init__(self):
+        self.ahora = 0.0
+
+    def __call__(self):
+        return self.ahora
+
+
+@pytest.fixture
+def reloj():
+    return Reloj()
+
+
+def _cache(reloj, **kwargs):
+    return CacheReportes(reloj=reloj, **{"ttl": 10, "stale": 20, **kwargs})
+
+
+def _esperar_refrescos(cache, timeout=5.0):
+    limite = time.monotonic() + timeout
+    while cache.stats()["refrescos_en_curso"] and time.monotonic() < limite:
+        time.sleep(0.005)
+
+
+def test_dentro_del_ttl_no_recalcula(reloj):
+    cache = _cache(reloj)
+    llamadas = []
+
+    def calcular():
+        llamadas.append(1)
+        return len(llamadas)
+
+    assert cache.obtener("k", calcular) == 1
+    reloj.ahora = 10
+    assert cache.obtener("k", calcular) == 1
+
+    assert len(llamadas) == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_stale_devuelve_viejo_y_refresca_una_vez(reloj):
+    cache = _cache(reloj)
+    liberar = threading.Event()
+    refrescos = []
+
+    cache.obtener("k", lambda: "viejo")
+
+    def refrescar():
+        refrescos.append(1)
+        liberar.wait(5)
+        return "nuevo"
+
+    reloj.ahora = 15
+    assert cache.obtener("k", refrescar) == "viejo"
+    assert cache.obtener("k", refrescar) == "viejo"   # refresco en curso
+
+    liberar.set()
+    _esperar_refrescos(cache)
+
+    assert refrescos == [1]
+    assert cache.obtener("k", refrescar) == "nuevo"
+
+    s = cache.stats()
+    assert s["stale_hits"] == 2
+    assert s["refrescos"] == 1
+    assert s["refrescos_en_curso"] == 0
+
+
+def test_pasada_la_ventana_stale_recalcula(reloj):
+    cache = _cache(reloj)
+    cache.obtener("k", lambda: "viejo")
+
+    reloj.ahora = 30.5
+    assert cache.obtener("k", lambda: "nuevo") == "nuevo"
+    assert cache.stats()["misses"] == 2
+    assert cache.stats()["stale_hits"] == 0
+
+
+def test_lru_expulsa_el_menos_usado(reloj):
+    cache = _cache(reloj, max_entradas=2)
+
+    cache.obtener("a", lambda: "A")
+    cache.obtener("b", lambda: "B")
+    cache.obtener("a", lambda: "A2")   # hit: 'a' pasa a ser el más reciente
+    cache.obtener("c", lambda: "C")    # expulsa 'b'
+
+    assert cache.obtener("a", lambda: "A3") == "A"
+    assert cache.obtener("b", lambda: "B2") == "B2"
+    assert cache.stats()["expulsiones"] == 2
+
+
+def test_error_de_refresco_se_cuenta_y_conserva_el_valor(reloj):
+    cache = _cache(reloj)
+    cache.obtener("k", lambda: "viejo")
+
+    def falla():
+        raise RuntimeError("Mongo caído")
+
+    reloj.ahora = 15
+    assert cache.obtener("k", falla) == "viejo"
+    _esperar_refrescos(cache)
+
+    s = cache.stats()
+    assert s["errores_refresco"] == 1
+    assert s["refrescos"] == 0
+    assert s["refrescos_en_curso"] == 0
+    assert cache.obtener("k", falla) == "viejo"
@@ -0,0 +1,38 @@
+"""
+KPIs desactivados: la salida no depende de la configuración de
+cache (con cache diario se leen todas las medidas; sin él, solo
+las que cambian la salida).
+"""
+
+import pytest
+
+from db.memoria.access import ReportesAccessMemoria
+from db.memoria.provider import MemoriaProvider
+from services.reportes.data.cache_dias import CacheDias
+from services.reportes.service import ReportesService
+
+
+@pytest.fixture(scope="module")
+def queries():
+    return ReportesAccessMemoria(MemoriaProvider.sintetico(3000))
+
+
+@pytest.mark.parametrize("modo", ["detalle", "rollup"])
+@pytest.mark.parametrize(
+    "kpis",
+    [{"piezas": False}, {"importe": False}, {"piezas": False, "importe": False}],
+)
+def test_tabla_igual_con_y_sin_cache_dias(queries, modo, kpis):
+    fecha = queries.provider.fecha
+    desde = str(fecha[0].astype("datetime64[D]"))
+    hasta = str(fecha[-1].astype("datetime64[D]"))
+
+    sin_cache = ReportesService(queries, modo=modo).generar(
+        desde, hasta, "Mes", kpis, secciones=["tabla"]
+    )
+    con_cache = ReportesService(queries, modo=modo, cache_dias=CacheDias()).generar(
+        desde, hasta, "Mes", kpis, secciones=["tabla"]
+    )
+
+    assert sin_cache["tabla"] == con_cache["tabla"]
+    assert any(fila["piezas"] for fila in sin_cache["tabla"])
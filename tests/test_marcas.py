@@ -0,0 +1,145 @@
+"""
+Back-fills en días cerrados: la marca de agua por día invalida
+el cache diario y saca el día del rollup materializado.
+"""
+
+from datetime import date, datetime
+
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from api.dependencies import get_reportes_service
+from db.memoria.access import ReportesAccessMemoria
+from db.memoria.provider import MemoriaProvider
+from main import create_app
+from services.reportes.data.cache_dias import CacheDias
+from services.reportes.data.loader import cargar_devoluciones_materializado
+from services.reportes.service import ReportesService
+
+
+HOY = date(2025, 3, 10)
+D1 = date(2025, 3, 1)
+D2 = date(2025, 3, 2)
+
+
+def _filas(*filas):
+    return pd.DataFrame(
+        [
+            {"fecha": datetime(d.year, d.month, d.day, 12), "zona": "Z1",
+             "pasillo": "P1", "piezas": p, "importe": float(p),
+             "devoluciones": 1}
+            for d, p in filas
+        ]
+    )
+
+
+class _Rango:
+    """
+    cargar_rango de prueba: devuelve las filas vigentes y cuenta consultas.
+    """
+
+    def __init__(self, filas):
+        self.filas = filas
+        self.consultas = []
+
+    def __call__(self, desde, hasta):
+        self.consultas.append((desde, hasta))
+        return _filas(*[(d, p) for d, p in self.filas if desde <= d <= hasta])
+
+
+def test_cache_dias_recarga_dia_con_back_fill():
+    cache = CacheDias(hoy=lambda: HOY)
+    rango = _Rango([(D1, 1), (D2, 2)])
+    marcas = {D1: (1, "a"), D2: (1, "b")}
+
+    cache.cargar(rango, D1, D2, marcas=marcas)
+    cache.cargar(rango, D1, D2, marcas=marcas)
+    assert rango.consultas == [(D1, D2)]
+
+    # Back-fill en D1: solo ese día se vuelve a pedir
+    rango.filas.append((D1, 5))
+    df = cache.cargar(rango, D1, D2, marcas={**marcas, D1: (2, "c")})
+
+    assert rango.consultas == [(D1, D2), (D1, D1)]
+    assert df["piezas"].sum() == 8
+    assert cache.stats()["invalidados"] == 1
+
+
+def test_cache_dias_sin_marcas_no_valida():
+    cache = CacheDias(hoy=lambda: HOY)
+    rango = _Rango([(D1, 1)])
+
+    cache.cargar(rango, D1, D1)
+    rango.filas.append((D1, 5))
+
+    assert cache.cargar(rango, D1, D1)["piezas"].sum() == 1
+    assert len(rango.consultas) == 1
+
+
+class _Queries:
+    def __init__(self, marcas, construidas):
+        self.marcas = marcas
+        self.construidas = construidas
+        self.leidos = []
+
+    def marcas_por_dia(self, filtros):
+        return self.marcas
+
+    def marcas_rollup_diario(self, filtros):
+        return self.construidas
+
+    def devoluciones_rollup_diario(self, filtros):
+        self.leidos.append(("materializado", self._dias(filtros)))
+        return pd.DataFrame()
+
+    def devoluciones_rollup(self, filtros, medidas=None):
+        self.leidos.append(("vivo", self._dias(filtros)))
+        return pd.DataFrame()
+
+    def _dias(self, filtros):
+        return filtros["fecha"]["$gte"].date(), filtros["fecha"]["$lte"].date()
+
+
+def test_materializado_lee_en_vivo_dias_con_back_fill():
+    d3 = date(2025, 3, 3)
+    q = _Queries(
+        marcas={D1: (1, "a"), D2: (2, "c")},
+        construidas={D1: (1, "a"), D2: (1, "b"), d3: (0, None)},
+    )
+
+    cargar_devoluciones_materializado(q, D1, date(2025, 3, 4), HOY)
+
+    assert q.leidos == [
+        ("materializado", (D1, D1)),
+        ("vivo", (D2, D2)),            # marca cambió tras el cron
+        ("materializado", (d3, d3)),   # construido vacío, sigue vacío
+        ("vivo", (date(2025, 3, 4), date(2025, 3, 4))),  # sin construir
+    ]
+
+
+def test_ruta_consulta_marcas_una_vez_por_request():
+    queries = ReportesAccessMemoria(
+        MemoriaProvider.sintetico(500, desde=D1, dias=5)
+    )
+    consultas = []
+    marcas_por_dia = queries.marcas_por_dia
+
+    def contar(filtros):
+        consultas.append(filtros)
+        return marcas_por_dia(filtros)
+
+    queries.marcas_por_dia = contar
+
+    # Sin cache de marcas (REPORTES_MARCA_TTL=0) y con cache diario
+    app = create_app()
+    app.dependency_overrides[get_reportes_service] = lambda: ReportesService(
+        queries, cache_dias=CacheDias(hoy=lambda: HOY)
+    )
+    r = TestClient(app).post(
+        "/api/reportes",
+        json={"desde": "2025-03-01", "hasta": "2025-03-05", "agrupar": "Dia"},
+    )
+
+    assert r.status_code == 200
+    assert r.json()["tabla"]
+    assert len(consultas) == 1
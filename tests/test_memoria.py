@@ -0,0 +1,56 @@
+"""
+Backend en memoria: subconjunto de aggregate_devoluciones y
+import perezoso desde db.factory.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+from db.memoria.provider import MemoriaProvider
+
+
+@pytest.fixture(scope="module")
+def provider():
+    return MemoriaProvider.sintetico(2000)
+
+
+def test_aggregate_match_fecha_y_proyeccion(provider):
+    primero = provider.documento(0)["fecha"]
+    rango = {"$gte": primero, "$lte": primero.replace(hour=23, minute=59, second=59)}
+
+    docs = provider.aggregate_devoluciones([
+        {"$match": {"fecha": rango}},
+        {"$project": {"_id": 0, "folio": 1, "total": 1}},
+        {"$sort": {"total": -1}},
+        {"$limit": 2},
+    ])
+
+    esperados = sorted(
+        (provider.documento(i) for i in provider.buscar({"fecha": rango})),
+        key=lambda d: -d["total"],
+    )[:2]
+
+    assert docs == [{"folio": d["folio"], "total": d["total"]} for d in esperados]
+
+
+def test_aggregate_etapa_no_soportada(provider):
+    with pytest.raises(ValueError):
+        provider.aggregate_devoluciones([{"$group": {"_id": "$zona"}}])
+
+    with pytest.raises(ValueError):
+        provider.aggregate_devoluciones([{"$match": {"$or": []}}])
+
+    with pytest.raises(ValueError):
+        provider.aggregate_devoluciones([{"$project": {"total": "$importe"}}])
+
+    assert not hasattr(provider, "get_collection")
+
+
+def test_factory_no_importa_memoria():
+    codigo = (
+        "import sys, db.factory, api.dependencies; "
+        "sys.exit(any(m.startswith('db.memoria') for m in sys.modules))"
+    )
+    assert subprocess.run([sys.executable, "-c", codigo]).returncode == 0
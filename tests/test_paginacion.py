@@ -0,0 +1,206 @@
+"""
+Paginación keyset: cursores, ventanas de días de tabla_pagina y
+recorrido completo (sin huecos ni duplicados) sobre el backend en
+memoria.
+"""
+
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from api.dependencies import get_reportes_service
+from db.memoria.access import ReportesAccessMemoria
+from db.memoria.provider import MemoriaProvider
+from db.mongo.reportes.predicates import rango_fechas
+from main import create_app
+from services.reportes.service import ReportesService
+from services.reportes.utils.cursor import codificar_cursor, decodificar_cursor
+
+
+DESDE = date(2025, 1, 1)
+HASTA = date(2025, 1, 30)
+
+
+@pytest.fixture(scope="module")
+def queries():
+    return ReportesAccessMemoria(
+        MemoriaProvider.sintetico(800, desde=DESDE, dias=30)
+    )
+
+
+# ─────────────────────────────
+# CURSORES
+# ─────────────────────────────
+def test_cursor_ida_y_vuelta():
+    valores = {"fecha": datetime(2025, 1, 2, 3, 4, 5), "zona": "", "pasillo": "P01"}
+
+    token = codificar_cursor(valores)
+
+    assert "=" not in token
+    assert decodificar_cursor(token, ("fecha", "zona", "pasillo")) == valores
+    assert decodificar_cursor(None, ("fecha",)) is None
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        "no-es-base64!",
+        codificar_cursor({"fecha": "2025-01-01"}),      # falta 'folio'
+        codificar_cursor({"fecha": "ayer", "folio": "F1"}),
+        "eyJmZWNoYSI6TmFOfQ",                           # {"fecha":NaN}
+    ],
+)
+def test_cursor_invalido(token):
+    with pytest.raises(ValueError):
+        decodificar_cursor(token, ("fecha", "folio"))
+
+
+def test_cursor_nan_no_se_codifica():
+    with pytest.raises(ValueError):
+        codificar_cursor({"zona": float("nan")})
+
+
+def test_ruta_cursor_invalido_es_400(queries):
+    app = create_app()
+    app.dependency_overrides[get_reportes_service] = lambda: ReportesService(queries)
+    cliente = TestClient(app)
+
+    for ruta in ("/api/reportes/resumen", "/api/reportes/tabla"):
+        r = cliente.post(
+            ruta,
+            json={"desde": "2025-01-01", "hasta": "2025-01-30", "cursor": "xx!"},
+        )
+        assert r.status_code == 400
+
+
+# ─────────────────────────────
+# RECORRIDO COMPLETO
+# ─────────────────────────────
+# limite=1 recorre solo los primeros días (una consulta por fila)
+RECORRIDOS = [(1, DESDE + timedelta(days=9)), (37, HASTA), (500, HASTA)]
+
+
+def _recorrer(pagina, hasta, limite):
+    items, cursor = [], None
+
+    while True:
+        p = pagina(DESDE, hasta, cursor=cursor, limite=limite)
+        assert len(p["items"]) <= limite
+        items += p["items"]
+        cursor = p["siguiente"]
+        if cursor is None:
+            return items
+
+
+@pytest.mark.parametrize("limite, hasta", RECORRIDOS)
+def test_tabla_pagina_sin_huecos_ni_duplicados(queries, limite, hasta):
+    esperado = ReportesService(queries, modo="rollup").generar(
+        DESDE, hasta, secciones=["tabla"]
+    )["tabla"]
+
+    items = _recorrer(ReportesService(queries).tabla_pagina, hasta, limite)
+
+    assert len(items) > limite
+    assert items == esperado
+
+
+@pytest.mark.parametrize("limite, hasta", RECORRIDOS)
+def test_resumen_pagina_sin_huecos_ni_duplicados(queries, limite, hasta):
+    esperado = queries.devoluciones_resumen(rango_fechas(DESDE, hasta))
+
+    items = _recorrer(ReportesService(queries).resumen_pagina, hasta, limite)
+    folios = [i["folio"] for i in items]
+
+    assert len(folios) == len(set(folios)) == len(esperado)
+    assert set(folios) == set(esperado["folio"])
+
+    claves = [(i["fecha"], i["folio"]) for i in items]
+    assert claves == sorted(claves, reverse=True)
+
+
+# ─────────────────────────────
+# VENTANAS DE DÍAS (tabla_pagina)
+# ─────────────────────────────
+class _Ventanas:
+    """
+    devoluciones_tabla_pagina de prueba: una fila por día con datos
+    y registro de las ventanas consultadas.
+    """
+
+    def __init__(self, dias_con_datos):
+        self.dias = sorted(dias_con_datos)
+        self.ventanas = []
+
+    def devoluciones_tabla_pagina(self, filtros, cursor=None, limite=200):
+        d1 = filtros["fecha"]["$gte"].date()
+        d2 = filtros["fecha"]["$lte"].date()
+        self.ventanas.append((d1, d2, limite))
+
+        dias = [d for d in self.dias if d1 <= d <= d2][:limite]
+        return pd.DataFrame({
+            "fecha": pd.to_datetime(dias),
+            "zona": "Z1",
+            "pasillo": "P01",
+            "piezas": 1,
+            "importe": 1.0,
+            "devoluciones": 1,
+        })
+
+
+def test_ventanas_se_duplican_hasta_juntar_la_pagina():
+    desde = date(2025, 1, 1)
+    q = _Ventanas([desde + timedelta(days=i) for i in range(20, 60)])
+
+    raw = ReportesService(q)._tabla_ventanas(desde, date(2025, 12, 31), None, 10)
+
+    assert len(raw) == 10
+    # 7 → 14 → 28 días; la tercera ventana ya junta las 10 filas
+    assert q.ventanas == [
+        (date(2025, 1, 1), date(2025, 1, 7), 10),
+        (date(2025, 1, 8), date(2025, 1, 21), 10),
+        (date(2025, 1, 22), date(2025, 2, 18), 9),
+    ]
+
+
+def test_ventanas_no_pasan_de_hasta():
+    desde = date(2025, 1, 1)
+    q = _Ventanas([])
+
+    raw = ReportesService(q)._tabla_ventanas(desde, date(2025, 1, 10), None, 5)
+
+    assert raw is None
+    assert q.ventanas[-1][1] == date(2025, 1, 10)
+    assert len(q.ventanas) == 2
+
+
+# ─────────────────────────────
+# STREAMING (generar_tabla)
+# ─────────────────────────────
+def test_stream_por_ventanas_igual_a_tabla_completa(queries):
+    service = ReportesService(queries)
+    esperado = service.generar(DESDE, HASTA, secciones=["tabla"])["tabla"]
+
+    cargas = []
+    cargar = service._cargar_devoluciones
+
+    def contar(desde, hasta, *args, **kwargs):
+        cargas.append((desde, hasta))
+        return cargar(desde, hasta, *args, **kwargs)
+
+    service._cargar_devoluciones = contar
+    filas = service.generar_tabla(DESDE, HASTA)
+
+    assert cargas == []                 # nada se consulta antes de iterar
+    assert next(filas) == esperado[0]
+    assert len(cargas) == 1             # solo la primera ventana
+
+    assert [esperado[0], *filas] == esperado
+    assert cargas == [
+        (date(2025, 1, 1), date(2025, 1, 7)),
+        (date(2025, 1, 8), date(2025, 1, 14)),
+        (date(2025, 1, 15), date(2025, 1, 21)),
+        (date(2025, 1, 22), date(2025, 1, 28)),
+        (date(2025, 1, 29), date(2025, 1, 30)),
+    ]
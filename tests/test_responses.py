@@ -0,0 +1,114 @@
+"""
+Formato JSON de las respuestas de reportes (api/responses.py).
+
+Fija los BYTES que salen para los campos numéricos que consumen
+los clientes (importe, piezas, devoluciones): un cambio de
+serializador que altere el formato de floats debe notarse aquí.
+"""
+
+import json
+import math
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from api.responses import _dumps, ndjson_lineas
+from services.reportes.utils.json import limpiar_json
+
+orjson = pytest.importorskip("orjson")
+
+
+# Reporte mínimo con los tipos que produce el service
+REPORTE = {
+    "resumen": {
+        "importe": np.float64(1234.5),
+        "piezas": np.int64(3),
+        "devoluciones": 2,
+    },
+    "por_zona": {
+        "Z1": {
+            "series": [
+                {"fecha": "2025-01-01", "importe": 0.1 + 0.2, "piezas": 1},
+            ],
+            "resumen": {"importe": 100.0, "piezas": np.int32(1)},
+        },
+    },
+    "tabla": [
+        {
+            "fecha": "2025-01-01",
+            "importe": 123456789.125,
+            "piezas": 0,
+            "devoluciones": 1,
+        },
+    ],
+}
+
+
+def test_reporte_bytes_fijos():
+    assert _dumps(REPORTE) == (
+        b'{"resumen":{"importe":1234.5,"piezas":3,"devoluciones":2},'
+        b'"por_zona":{"Z1":{"series":[{"fecha":"2025-01-01",'
+        b'"importe":0.30000000000000004,"piezas":1}],'
+        b'"resumen":{"importe":100.0,"piezas":1}}},'
+        b'"tabla":[{"fecha":"2025-01-01","importe":123456789.125,'
+        b'"piezas":0,"devoluciones":1}]}'
+    )
+
+
+@pytest.mark.parametrize(
+    "valor, esperado",
+    [
+        (1234.5, b"1234.5"),
+        (100.0, b"100.0"),
+        (-0.0, b"-0.0"),
+        (0.1 + 0.2, b"0.30000000000000004"),
+        (1e-05, b"0.00001"),        # json estándar: 1e-05
+        (1e-07, b"1e-7"),           # json estándar: 1e-07
+        (1e16, b"1e16"),            # json estándar: 1e+16
+        (2.5e20, b"2.5e20"),        # json estándar: 2.5e+20
+        (np.float64(0.1), b"0.1"),
+        (np.float32(0.1), b"0.1"),  # json estándar: 0.10000000149011612
+        (float("nan"), b"null"),
+        (float("inf"), b"null"),
+        (np.int64(7), b"7"),
+    ],
+)
+def test_formato_float(valor, esperado):
+    assert _dumps({"importe": valor}) == b'{"importe":' + esperado + b"}"
+
+
+def test_equivalente_a_limpiar_json():
+    """
+    Mismos valores que el camino legacy (aunque no los mismos bytes).
+    """
+    contenido = {
+        "valores": [1e-05, 1e16, 0.1 + 0.2, np.float64(2.5), np.int64(4)],
+        "fecha": datetime(2025, 1, 2, 3, 4, 5),
+    }
+
+    nuevo = json.loads(_dumps(contenido))
+    legacy = json.loads(json.dumps(limpiar_json(contenido)))
+
+    assert nuevo == legacy
+
+
+def test_float32_no_byte_identico_al_legacy():
+    """
+    float32 se escribe con su repr corta; el legacy lo amplía a
+    float64. Mismo valor float32, distinto texto.
+    """
+    nuevo = json.loads(_dumps({"v": np.float32(0.1)}))["v"]
+    legacy = json.loads(json.dumps(limpiar_json({"v": np.float32(0.1)})))["v"]
+
+    assert nuevo != legacy
+    assert np.float32(nuevo) == np.float32(legacy)
+
+
+def test_ndjson_una_linea_por_fila():
+    filas = [{"importe": 1e-05}, {"importe": math.nan}]
+
+    assert list(ndjson_lineas(filas)) == [
+        b'{"importe":0.00001}\n',
+        b'{"importe":null}\n',
+    ]